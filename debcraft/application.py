@@ -27,6 +27,7 @@ METADATA = craft_application.AppMetadata(
     summary="Tool to create Debian Packages using a Craft workflow",
     source_ignore_patterns=["*.deb"],
     ProjectClass=models.Project,
+    ConfigModel=models.DebcraftConfig,
 )
 
 
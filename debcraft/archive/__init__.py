@@ -0,0 +1,69 @@
+#  This file is part of debcraft.
+#
+#  Copyright 2026 Canonical Ltd.
+#
+#  This program is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranties of MERCHANTABILITY,
+#  SATISFACTORY QUALITY, or FITNESS FOR A PARTICULAR PURPOSE.
+#  See the GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along
+#  with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Deb archive handling."""
+
+from .ar import ArWriter
+from .delta import apply_delta, create_delta, read_delta_header
+from .diff import (
+    Change,
+    ChangeKind,
+    FileEntry,
+    FileType,
+    diff_manifests,
+    read_manifest,
+)
+from .index import PackageIndex
+from .reader import (
+    ArMember,
+    iter_ar_members,
+    iter_deb_tarballs,
+    normalize_path,
+    open_decompressed,
+    open_seekable_data_tarball,
+    open_tarball,
+    parse_md5sums,
+    read_md5sums,
+)
+from .seekable import SeekableZstdReader, SeekableZstdWriter, read_seek_table
+from .verify import verify_deb
+
+__all__ = [
+    "ArMember",
+    "ArWriter",
+    "Change",
+    "ChangeKind",
+    "FileEntry",
+    "FileType",
+    "PackageIndex",
+    "SeekableZstdReader",
+    "SeekableZstdWriter",
+    "apply_delta",
+    "create_delta",
+    "diff_manifests",
+    "iter_ar_members",
+    "iter_deb_tarballs",
+    "normalize_path",
+    "open_decompressed",
+    "open_seekable_data_tarball",
+    "open_tarball",
+    "parse_md5sums",
+    "read_delta_header",
+    "read_manifest",
+    "read_md5sums",
+    "read_seek_table",
+    "verify_deb",
+]
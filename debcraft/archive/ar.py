@@ -0,0 +1,86 @@
+#  This file is part of debcraft.
+#
+#  Copyright 2026 Canonical Ltd.
+#
+#  This program is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranties of MERCHANTABILITY,
+#  SATISFACTORY QUALITY, or FITNESS FOR A PARTICULAR PURPOSE.
+#  See the GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along
+#  with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Writer for the ar archives used as the deb container format."""
+
+import pathlib
+import shutil
+from typing import BinaryIO
+
+from debcraft import errors
+
+AR_MAGIC = b"!<arch>\n"
+
+_COPY_BUFSIZE = 1024 * 1024
+
+# The member size is stored as a 10-digit decimal number.
+_MAX_MEMBER_SIZE = 10**10 - 1
+
+
+class ArWriter:
+    """Write members to an ar archive.
+
+    Members are written in the deterministic form used by dpkg-deb, with
+    zeroed timestamps and ownership and mode 0644.
+
+    :param fileobj: The file to write the archive to.
+    """
+
+    def __init__(self, fileobj: BinaryIO) -> None:
+        self._fileobj = fileobj
+        self._fileobj.write(AR_MAGIC)
+
+    def add_file(self, name: str, path: pathlib.Path) -> None:
+        """Add the contents of a file as an archive member.
+
+        :param name: The member name.
+        :param path: The file containing the member data.
+        """
+        with path.open("rb") as f:
+            size = f.seek(0, 2)
+            f.seek(0)
+            self._write_header(name, size)
+            shutil.copyfileobj(f, self._fileobj, _COPY_BUFSIZE)
+        self._write_padding(size)
+
+    def add_data(self, name: str, data: bytes) -> None:
+        """Add an archive member containing the given data.
+
+        :param name: The member name.
+        :param data: The member data.
+        """
+        self._write_header(name, len(data))
+        self._fileobj.write(data)
+        self._write_padding(len(data))
+
+    def _write_header(self, name: str, size: int) -> None:
+        if len(name) > 16 or "/" in name:  # noqa: PLR2004
+            raise ValueError(f"invalid ar member name {name!r}")
+
+        if size > _MAX_MEMBER_SIZE:
+            raise errors.DebcraftError(
+                f"ar member {name!r} is too large ({size} bytes)",
+                details=f"The ar format limits members to {_MAX_MEMBER_SIZE} bytes.",
+                resolution="Split the package contents into smaller packages.",
+            )
+
+        header = f"{name:<16}{0:<12}{0:<6}{0:<6}{0o100644:<8o}{size:<10}`\n"
+        self._fileobj.write(header.encode("ascii"))
+
+    def _write_padding(self, size: int) -> None:
+        # Member data is aligned to an even offset.
+        if size % 2:
+            self._fileobj.write(b"\n")
@@ -0,0 +1,30 @@
+#  This file is part of debcraft.
+#
+#  Copyright 2026 Canonical Ltd.
+#
+#  This program is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranties of MERCHANTABILITY,
+#  SATISFACTORY QUALITY, or FITNESS FOR A PARTICULAR PURPOSE.
+#  See the GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along
+#  with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Compression settings of the tarballs in deb packages."""
+
+import zstandard as zstd
+
+ZSTD_COMPRESSION_LEVEL = 3
+"""The zstd compression level of package tarballs."""
+
+# dpkg does not raise the zstd decoder window limit, so frames must not
+# require a window larger than ZSTD_WINDOWLOG_LIMIT_DEFAULT (128 MiB).
+ZSTD_MIN_WINDOW_LOG = zstd.WINDOWLOG_MIN
+"""The smallest zstd window size, as a power of 2."""
+
+ZSTD_MAX_WINDOW_LOG = 27
+"""The largest zstd window size that dpkg can decompress, as a power of 2."""
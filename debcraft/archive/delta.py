@@ -0,0 +1,708 @@
+#  This file is part of debcraft.
+#
+#  Copyright 2026 Canonical Ltd.
+#
+#  This program is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranties of MERCHANTABILITY,
+#  SATISFACTORY QUALITY, or FITNESS FOR A PARTICULAR PURPOSE.
+#  See the GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along
+#  with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Binary deltas between versions of a deb package.
+
+A delta reconstructs a package from a previous version of the package. The
+uncompressed data tarball of the new package is described as a sequence of
+ranges copied from the data tarball of the previous version, for files with
+the same digest in the md5sums files, and literal data for everything else.
+The data tarball is then compressed again with the parameters that were
+verified to reproduce the original compressed tarball when the delta was
+created. Other package members are stored as they are.
+
+A delta file starts with a magic string, followed by a zstd stream with the
+JSON header and the operations for each member of the new package.
+"""
+
+import dataclasses
+import hashlib
+import io
+import itertools
+import json
+import pathlib
+import shutil
+import struct
+import tarfile
+import tempfile
+from collections.abc import Callable, Iterator
+from typing import Any, BinaryIO, cast
+
+import zstandard as zstd
+from craft_cli import emit
+
+from debcraft import errors, util
+from debcraft.models.const import FsyncPolicy
+
+from .ar import AR_MAGIC
+from .compression import ZSTD_COMPRESSION_LEVEL
+from .reader import (
+    iter_ar_members,
+    normalize_path,
+    open_decompressed,
+    open_tarball,
+    read_md5sums,
+)
+from .seekable import SeekableZstdWriter, read_seek_table
+
+MAGIC = b"!<debcraft-delta>\n"
+
+_FORMAT_VERSION = 1
+_CHUNK_SIZE = 1024 * 1024
+_DELTA_COMPRESSION_LEVEL = 19
+_AR_HEADER_SIZE = 60
+
+_HEADER_SIZE = struct.Struct(">I")
+_LITERAL = struct.Struct(">cQ")
+_COPY = struct.Struct(">cQQ")
+_OP_LITERAL = b"L"
+_OP_COPY = b"C"
+_OP_END = b"E"
+
+# Seekable frames are ended at recorded positions, never by size.
+_MAX_FRAME_SIZE = 0xFFFFFFFF
+
+
+@dataclasses.dataclass(frozen=True)
+class _Member:
+    """A member of the new package."""
+
+    name: str
+    offset: int
+    size: int
+    header: bytes
+
+
+class _MismatchError(Exception):
+    """Recompressed data differs from the original data."""
+
+
+def create_delta(
+    old_deb: pathlib.Path,
+    new_deb: pathlib.Path,
+    delta_file: pathlib.Path,
+    *,
+    fsync: FsyncPolicy = "dir",
+) -> None:
+    """Create a delta that reconstructs a package from its previous version.
+
+    :param old_deb: The previous version of the package.
+    :param new_deb: The package to reconstruct.
+    :param delta_file: The delta file to write.
+    :param fsync: When to flush the delta file to permanent storage.
+    """
+    with (
+        tempfile.TemporaryFile() as old_data,
+        tempfile.TemporaryFile() as new_data,
+        new_deb.open("rb") as new_file,
+    ):
+        old_md5sums = _extract_data(old_deb, old_data)
+        old_files = _get_digests(old_data, old_md5sums)
+
+        members, new_md5sums = _read_members(new_file, new_data)
+        new_files = _get_digests(new_data, new_md5sums)
+
+        header: dict[str, Any] = {
+            "version": _FORMAT_VERSION,
+            "name": new_deb.name,
+            "old": _get_file_info(old_deb),
+            "new": _get_file_info(new_deb),
+            "members": [],
+        }
+
+        # Copy ranges for files found with the same contents in the old package.
+        old_by_digest = {
+            digest: (offset, size) for offset, size, digest in old_files.values()
+        }
+        copies: list[tuple[int, int, int]] = []
+        for new_offset, size, digest in new_files.values():
+            source = old_by_digest.get(digest)
+            if (
+                source
+                and source[1] == size
+                and _ranges_equal(old_data, source[0], new_data, new_offset, size)
+            ):
+                copies.append((new_offset, source[0], size))
+
+        plans: list[Iterator[tuple[bytes, int, int]]] = []
+        for member in members:
+            compression = None
+            if member.name == "data.tar.zst":
+                compression = _find_compression(new_file, member, new_data)
+
+            header["members"].append(
+                {"header": member.header.hex(), "compression": compression}
+            )
+            if compression is not None:
+                data_size = new_data.seek(0, io.SEEK_END)
+                plans.append(_plan_ops(copies, data_size))
+            else:
+                if member.name.startswith("data.tar"):
+                    emit.debug(f"Cannot reproduce {member.name}, storing it in full")
+                plans.append(iter([(_OP_LITERAL, member.offset, member.size)]))
+
+        with util.atomic_write(delta_file, fsync=fsync) as f:
+            f.write(MAGIC)
+            zcomp = zstd.ZstdCompressor(level=_DELTA_COMPRESSION_LEVEL)
+            with zcomp.stream_writer(f, closefd=False) as out:
+                header_data = json.dumps(header).encode("utf-8")
+                out.write(_HEADER_SIZE.pack(len(header_data)) + header_data)
+
+                for member_info, plan in zip(header["members"], plans):
+                    source = new_data if member_info["compression"] else new_file
+                    _write_ops(out, plan, source)
+
+
+def apply_delta(
+    old_deb: pathlib.Path,
+    delta_file: pathlib.Path,
+    output_file: pathlib.Path,
+    *,
+    fsync: FsyncPolicy = "dir",
+) -> None:
+    """Reconstruct a package from its previous version and a delta.
+
+    :param old_deb: The previous version of the package.
+    :param delta_file: The delta file.
+    :param output_file: The package file to write.
+    :param fsync: When to flush the package to permanent storage.
+    """
+    with delta_file.open("rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise errors.DebcraftError(f"{str(delta_file)!r} is not a delta file")
+
+        dctx = zstd.ZstdDecompressor()
+        with (
+            dctx.stream_reader(f, read_across_frames=True, closefd=False) as delta,
+            tempfile.TemporaryFile() as old_data,
+        ):
+            stream = cast(BinaryIO, delta)
+            header = _read_header(stream, delta_file)
+
+            if _get_file_info(old_deb) != header["old"]:
+                raise errors.DebcraftError(
+                    f"delta {delta_file.name} does not apply to {old_deb.name}",
+                    resolution="Use the package the delta was created from.",
+                )
+            _extract_data(old_deb, old_data)
+
+            with util.atomic_write(output_file, fsync=fsync) as output:
+                writer = _HashingWriter(output)
+                writer.write(AR_MAGIC)
+
+                for member in header["members"]:
+                    member_header = bytes.fromhex(member["header"])
+                    size = int(member_header[48:58])
+                    writer.write(member_header)
+                    start = writer.size
+
+                    if member["compression"] is None:
+                        _apply_ops(stream, old_data, writer.write)
+                    else:
+                        recompressor = _Recompressor(writer, member["compression"])
+                        _apply_ops(stream, old_data, recompressor.write)
+                        recompressor.close()
+
+                    if writer.size - start != size:
+                        raise _mismatch_error(header)
+                    if size % 2:
+                        writer.write(b"\n")
+
+                info = {"size": writer.size, "sha256": writer.hexdigest()}
+                if info != header["new"]:
+                    raise _mismatch_error(header)
+
+
+def _mismatch_error(header: dict[str, Any]) -> errors.DebcraftError:
+    """Create the error raised when a reconstructed package is not identical.
+
+    :param header: The delta header.
+
+    :returns: The error to raise.
+    """
+    return errors.DebcraftError(
+        f"reconstructed package does not match {header['name']}",
+        resolution=(
+            "Make sure the zstandard library version matches the one used to "
+            "create the delta."
+        ),
+    )
+
+
+def read_delta_header(delta_file: pathlib.Path) -> dict[str, Any]:
+    """Read the header of a delta file.
+
+    :param delta_file: The delta file.
+
+    :returns: The delta header, including the name and the size and digest of
+        the old and new packages.
+    """
+    with delta_file.open("rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise errors.DebcraftError(f"{str(delta_file)!r} is not a delta file")
+
+        dctx = zstd.ZstdDecompressor()
+        with dctx.stream_reader(f, read_across_frames=True, closefd=False) as delta:
+            return _read_header(cast(BinaryIO, delta), delta_file)
+
+
+def _read_header(stream: BinaryIO, delta_file: pathlib.Path) -> dict[str, Any]:
+    """Read the header of a delta after the magic string.
+
+    :param stream: The decompressed delta stream.
+    :param delta_file: The delta file, used in error messages.
+
+    :returns: The delta header.
+    """
+    (size,) = _HEADER_SIZE.unpack(_read_exact(stream, _HEADER_SIZE.size))
+    header = json.loads(_read_exact(stream, size))
+    if header.get("version") != _FORMAT_VERSION:
+        raise errors.DebcraftError(
+            f"unsupported delta format version in {str(delta_file)!r}"
+        )
+    return cast(dict[str, Any], header)
+
+
+def _get_file_info(path: pathlib.Path) -> dict[str, Any]:
+    """Get the size and SHA256 digest of a file.
+
+    :param path: The file.
+
+    :returns: A dictionary with the file size and digest.
+    """
+    sha256 = hashlib.sha256()
+    size = 0
+    with path.open("rb") as f:
+        while chunk := f.read(_CHUNK_SIZE):
+            sha256.update(chunk)
+            size += len(chunk)
+    return {"size": size, "sha256": sha256.hexdigest()}
+
+
+def _extract_data(deb: pathlib.Path, data_file: BinaryIO) -> dict[str, str] | None:
+    """Decompress the data tarball of a package and read its md5sums.
+
+    :param deb: The package.
+    :param data_file: The file to write the uncompressed data tarball to.
+
+    :returns: The md5sums of the package, or None if it has no md5sums file.
+    """
+    md5sums = None
+    with deb.open("rb") as f:
+        for member, stream in iter_ar_members(f):
+            if member.name.startswith("control.tar"):
+                with open_tarball(member.name, stream) as tar:
+                    md5sums = read_md5sums(tar)
+            elif member.name.startswith("data.tar"):
+                with open_decompressed(member.name, stream) as data:
+                    shutil.copyfileobj(data, data_file, _CHUNK_SIZE)
+    return md5sums
+
+
+def _read_members(
+    fileobj: BinaryIO, data_file: BinaryIO
+) -> tuple[list[_Member], dict[str, str] | None]:
+    """Read the members of the new package.
+
+    :param fileobj: The new package file.
+    :param data_file: The file to write the uncompressed data tarball to.
+
+    :returns: The package members and the md5sums of the package.
+    """
+    md5sums = None
+    members = []
+    for member, stream in iter_ar_members(fileobj):
+        offset = fileobj.tell()
+        members.append(_Member(member.name, offset, member.size, b""))
+        if member.name.startswith("control.tar"):
+            with open_tarball(member.name, stream) as tar:
+                md5sums = read_md5sums(tar)
+        elif member.name == "data.tar.zst":
+            with open_decompressed(member.name, stream) as data:
+                shutil.copyfileobj(data, data_file, _CHUNK_SIZE)
+
+    for i, member in enumerate(members):
+        fileobj.seek(member.offset - _AR_HEADER_SIZE)
+        header = fileobj.read(_AR_HEADER_SIZE)
+        members[i] = dataclasses.replace(member, header=header)
+
+    return members, md5sums
+
+
+def _get_digests(
+    data_file: BinaryIO, md5sums: dict[str, str] | None
+) -> dict[str, tuple[int, int, str]]:
+    """Get the location and digest of the regular files in a data tarball.
+
+    Digests are taken from the md5sums file, and only computed for files that
+    are not listed in it.
+
+    :param data_file: The uncompressed data tarball.
+    :param md5sums: The md5sums of the package.
+
+    :returns: A map of paths to the data offset, size and MD5 digest of files.
+    """
+    locations: dict[str, tuple[int, int]] = {}
+    if data_file.seek(0, io.SEEK_END) == 0:
+        return {}
+
+    data_file.seek(0)
+    with tarfile.open(fileobj=data_file, mode="r:") as tar:
+        for tarinfo in tar:
+            if tarinfo.isreg() and not tarinfo.issparse() and tarinfo.size:
+                path = normalize_path(tarinfo.name)
+                locations[path] = (tarinfo.offset_data, tarinfo.size)
+
+    files = {}
+    for path, (offset, size) in locations.items():
+        digest = (md5sums or {}).get(path)
+        if digest is None:
+            md5 = hashlib.md5()  # noqa: S324
+            for chunk in _iter_range(data_file, offset, size):
+                md5.update(chunk)
+            digest = md5.hexdigest()
+        files[path] = (offset, size, digest)
+    return files
+
+
+def _iter_range(fileobj: BinaryIO, offset: int, size: int) -> Iterator[bytes]:
+    """Read a range of a file in chunks.
+
+    :param fileobj: The file to read.
+    :param offset: The start of the range.
+    :param size: The size of the range.
+
+    :returns: An iterator of the data chunks.
+    """
+    fileobj.seek(offset)
+    while size > 0:
+        chunk = fileobj.read(min(size, _CHUNK_SIZE))
+        if not chunk:
+            raise errors.DebcraftError("unexpected end of file")
+        size -= len(chunk)
+        yield chunk
+
+
+def _ranges_equal(
+    file_a: BinaryIO, offset_a: int, file_b: BinaryIO, offset_b: int, size: int
+) -> bool:
+    """Compare ranges of two files.
+
+    :returns: Whether the ranges have the same contents.
+    """
+    pos_b = offset_b
+    for chunk in _iter_range(file_a, offset_a, size):
+        file_b.seek(pos_b)
+        if file_b.read(len(chunk)) != chunk:
+            return False
+        pos_b += len(chunk)
+    return True
+
+
+def _find_compression(
+    fileobj: BinaryIO, member: _Member, data_file: BinaryIO
+) -> dict[str, Any] | None:
+    """Find the compression parameters that reproduce a zstd data tarball.
+
+    The tarball is compressed again with the parameters that the makedeb
+    helper may have used, and the output is compared with the original.
+
+    :param fileobj: The package file.
+    :param member: The data tarball member.
+    :param data_file: The uncompressed data tarball.
+
+    :returns: The compression parameters, or None if the tarball could not
+        be reproduced.
+    """
+    fileobj.seek(member.offset)
+    try:
+        window_size = zstd.get_frame_parameters(fileobj.read(18)).window_size
+    except zstd.ZstdError:
+        return None
+
+    seek_table = read_seek_table(fileobj, offset=member.offset, size=member.size)
+    frames = [size for _, size in seek_table] if seek_table else None
+
+    window_log = window_size.bit_length() - 1
+    level = ZSTD_COMPRESSION_LEVEL
+    candidates: list[dict[str, Any]] = [{"level": level}]
+    candidates.extend(
+        {"level": level, "window_log": log, "ldm": ldm}
+        for log, ldm in itertools.product((0, window_log), (False, True))
+    )
+
+    for candidate in candidates:
+        compression = {**candidate, "frames": frames}
+        fileobj.seek(member.offset)
+        sink = _CompareWriter(fileobj, member.size)
+        try:
+            recompressor = _Recompressor(sink, compression)
+            data_file.seek(0)
+            while chunk := data_file.read(_CHUNK_SIZE):
+                recompressor.write(chunk)
+            recompressor.close()
+            if sink.complete:
+                return compression
+        except _MismatchError:
+            continue
+
+    return None
+
+
+def _plan_ops(
+    copies: list[tuple[int, int, int]], size: int
+) -> Iterator[tuple[bytes, int, int]]:
+    """Plan the operations that reconstruct a data tarball.
+
+    :param copies: The new offset, old offset and size of ranges to copy.
+    :param size: The size of the data tarball.
+
+    :returns: An iterator of operations with the offset in the source file
+        (the old data for copies, the new data for literals) and size.
+    """
+    pos = 0
+    pending: tuple[int, int] | None = None
+
+    for new_offset, old_offset, length in sorted(copies):
+        if pending and new_offset == pos and old_offset == sum(pending):
+            # Merge ranges that are contiguous in both tarballs.
+            pending = (pending[0], pending[1] + length)
+            pos += length
+            continue
+
+        if pending:
+            yield _OP_COPY, *pending
+            pending = None
+        if new_offset > pos:
+            yield _OP_LITERAL, pos, new_offset - pos
+
+        pending = (old_offset, length)
+        pos = new_offset + length
+
+    if pending:
+        yield _OP_COPY, *pending
+    if size > pos:
+        yield _OP_LITERAL, pos, size - pos
+
+
+def _write_ops(
+    out: BinaryIO, ops: Iterator[tuple[bytes, int, int]], source: BinaryIO
+) -> None:
+    """Write the operations for a member to the delta.
+
+    :param out: The delta stream.
+    :param ops: The operations to write.
+    :param source: The file containing the data for literal operations.
+    """
+    for op, offset, size in ops:
+        if op == _OP_COPY:
+            out.write(_COPY.pack(op, offset, size))
+            continue
+
+        out.write(_LITERAL.pack(op, size))
+        for chunk in _iter_range(source, offset, size):
+            out.write(chunk)
+
+    out.write(_OP_END)
+
+
+def _apply_ops(
+    stream: BinaryIO, old_data: BinaryIO, write: Callable[[bytes], object]
+) -> None:
+    """Apply the operations for a member from the delta.
+
+    :param stream: The delta stream.
+    :param old_data: The uncompressed data tarball of the old package.
+    :param write: The function called with the reconstructed data.
+    """
+    while True:
+        op = _read_exact(stream, 1)
+        if op == _OP_END:
+            return
+
+        if op == _OP_COPY:
+            _, offset, size = _COPY.unpack(op + _read_exact(stream, _COPY.size - 1))
+            for chunk in _iter_range(old_data, offset, size):
+                write(chunk)
+        elif op == _OP_LITERAL:
+            _, size = _LITERAL.unpack(op + _read_exact(stream, _LITERAL.size - 1))
+            while size > 0:
+                chunk = _read_exact(stream, min(size, _CHUNK_SIZE))
+                size -= len(chunk)
+                write(chunk)
+        else:
+            raise errors.DebcraftError("invalid delta: unknown operation")
+
+
+def _read_exact(stream: BinaryIO, size: int) -> bytes:
+    """Read exactly the given number of bytes from a stream.
+
+    :param stream: The stream to read.
+    :param size: The number of bytes to read.
+
+    :returns: The data read.
+    """
+    data = bytearray()
+    while len(data) < size:
+        chunk = stream.read(size - len(data))
+        if not chunk:
+            raise errors.DebcraftError("invalid delta: unexpected end of data")
+        data += chunk
+    return bytes(data)
+
+
+class _Recompressor:
+    """Compress a data tarball the same way as the makedeb helper.
+
+    Input is split into fixed-size chunks so the compressed output only
+    depends on the data, not on how it is passed to :meth:`write`.
+
+    :param sink: The file to write the compressed data to.
+    :param compression: The compression parameters.
+    """
+
+    def __init__(
+        self, sink: "_CompareWriter | _HashingWriter", compression: dict[str, Any]
+    ) -> None:
+        if "window_log" in compression:
+            params = zstd.ZstdCompressionParameters.from_level(
+                compression["level"],
+                window_log=compression["window_log"],
+                enable_ldm=compression["ldm"],
+            )
+            zcomp = zstd.ZstdCompressor(compression_params=params)
+        else:
+            zcomp = zstd.ZstdCompressor(level=compression["level"])
+
+        self._writer: SeekableZstdWriter | zstd.ZstdCompressionWriter
+        frames: list[int] | None = compression["frames"]
+        if frames is None:
+            self._writer = zcomp.stream_writer(sink, closefd=False)
+            self._seekable = None
+            self._boundaries: list[int] = []
+        else:
+            self._seekable = SeekableZstdWriter(
+                cast(BinaryIO, sink),
+                zcomp,
+                frame_size=1,
+                max_frame_size=_MAX_FRAME_SIZE,
+            )
+            self._writer = self._seekable
+            self._boundaries = list(itertools.accumulate(frames))
+        self._buffer = bytearray()
+        self._pos = 0
+        self._next_boundary = 0
+
+    def write(self, data: bytes) -> None:
+        """Add data to compress.
+
+        :param data: The data to compress.
+        """
+        self._buffer += data
+        while len(self._buffer) >= _CHUNK_SIZE:
+            self._write_chunk(bytes(self._buffer[:_CHUNK_SIZE]))
+            del self._buffer[:_CHUNK_SIZE]
+
+    def close(self) -> None:
+        """Compress the remaining data and end the stream."""
+        if self._buffer:
+            self._write_chunk(bytes(self._buffer))
+            self._buffer.clear()
+        self._writer.close()
+
+    def _write_chunk(self, chunk: bytes) -> None:
+        """Compress a chunk, ending seekable frames at the recorded positions."""
+        view = memoryview(chunk)
+        while view:
+            size = len(view)
+            if self._next_boundary < len(self._boundaries):
+                size = min(size, self._boundaries[self._next_boundary] - self._pos)
+
+            self._writer.write(view[:size])
+            self._pos += size
+            view = view[size:]
+
+            if (
+                self._seekable
+                and self._next_boundary < len(self._boundaries)
+                and self._pos == self._boundaries[self._next_boundary]
+            ):
+                self._seekable.mark_boundary()
+                self._next_boundary += 1
+
+
+class _CompareWriter:
+    """A file-like sink that compares written data with a file range.
+
+    :param expected: The file positioned at the start of the expected data.
+    :param size: The size of the expected data.
+    """
+
+    def __init__(self, expected: BinaryIO, size: int) -> None:
+        self._expected = expected
+        self._remaining = size
+
+    @property
+    def complete(self) -> bool:
+        """Whether all the expected data was written."""
+        return self._remaining == 0
+
+    def write(self, data: bytes) -> int:
+        """Compare data with the next bytes of the expected range.
+
+        :param data: The written data.
+
+        :returns: The number of bytes written.
+        """
+        if len(data) > self._remaining or self._expected.read(len(data)) != data:
+            raise _MismatchError
+        self._remaining -= len(data)
+        return len(data)
+
+    def flush(self) -> None:
+        """Do nothing, for compatibility with file objects."""
+
+
+class _HashingWriter:
+    """A file-like wrapper that computes the SHA256 digest of written data.
+
+    :param fileobj: The file to write to.
+    """
+
+    def __init__(self, fileobj: BinaryIO) -> None:
+        self._fileobj = fileobj
+        self._sha256 = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data: bytes) -> int:
+        """Write data to the file.
+
+        :param data: The data to write.
+
+        :returns: The number of bytes written.
+        """
+        self._fileobj.write(data)
+        self._sha256.update(data)
+        self.size += len(data)
+        return len(data)
+
+    def flush(self) -> None:
+        """Flush the underlying file."""
+        self._fileobj.flush()
+
+    def hexdigest(self) -> str:
+        """Return the digest of the data written so far."""
+        return self._sha256.hexdigest()
@@ -0,0 +1,289 @@
+#  This file is part of debcraft.
+#
+#  Copyright 2026 Canonical Ltd.
+#
+#  This program is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranties of MERCHANTABILITY,
+#  SATISFACTORY QUALITY, or FITNESS FOR A PARTICULAR PURPOSE.
+#  See the GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along
+#  with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Contents comparison of deb packages and prime directories."""
+
+import dataclasses
+import enum
+import hashlib
+import pathlib
+import stat
+import tarfile
+from typing import BinaryIO
+
+from debcraft import util
+
+from .reader import iter_deb_tarballs, normalize_path, read_md5sums
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class FileType(str, enum.Enum):
+    """The type of a file in a package."""
+
+    FILE = "file"
+    DIRECTORY = "directory"
+    SYMLINK = "symlink"
+    HARDLINK = "hardlink"
+    OTHER = "other"
+
+
+class ChangeKind(str, enum.Enum):
+    """The kind of difference between two versions of a file."""
+
+    ADDED = "added"
+    REMOVED = "removed"
+    CHANGED = "changed"
+
+
+@dataclasses.dataclass
+class FileEntry:
+    """The metadata of a file in a package manifest."""
+
+    type: FileType
+    """The file type."""
+
+    mode: int
+    """The permission bits of the file."""
+
+    size: int = 0
+    """The size of regular files in bytes."""
+
+    linkname: str = ""
+    """The target of symbolic and hard links."""
+
+    digest: str | None = None
+    """The MD5 digest of regular files, if known."""
+
+    source: pathlib.Path | None = dataclasses.field(default=None, compare=False)
+    """The file on disk, used to compute the digest when needed."""
+
+    def get_digest(self) -> str | None:
+        """Get the digest of the file contents, computing it if needed.
+
+        :returns: The MD5 digest, or None if the file is not a regular file.
+        """
+        if self.digest is None and self.source is not None:
+            with self.source.open("rb") as f:
+                self.digest = _md5(f)
+        return self.digest
+
+
+@dataclasses.dataclass(frozen=True)
+class Change:
+    """A difference between two package manifests."""
+
+    path: str
+    """The file path, relative to the root."""
+
+    kind: ChangeKind
+    """The kind of change."""
+
+    old: FileEntry | None
+    """The old file metadata, or None if the file was added."""
+
+    new: FileEntry | None
+    """The new file metadata, or None if the file was removed."""
+
+    @property
+    def size_delta(self) -> int:
+        """The difference of the file size in bytes."""
+        old_size = self.old.size if self.old else 0
+        new_size = self.new.size if self.new else 0
+        return new_size - old_size
+
+    def describe(self) -> list[str]:
+        """Describe the differences of a changed file.
+
+        :returns: A list of the differences, such as mode and size changes.
+        """
+        if not (self.old and self.new):
+            return []
+
+        details = []
+        if self.old.type != self.new.type:
+            details.append(f"type {self.old.type.value} -> {self.new.type.value}")
+        if self.old.mode != self.new.mode:
+            details.append(f"mode {self.old.mode:04o} -> {self.new.mode:04o}")
+        if self.old.linkname != self.new.linkname:
+            details.append(f"target {self.old.linkname} -> {self.new.linkname}")
+        if self.old.size != self.new.size:
+            details.append(f"size {self.old.size} -> {self.new.size}")
+        elif self.old.type == self.new.type == FileType.FILE:
+            details.append("contents")
+        return details
+
+
+def read_manifest(path: pathlib.Path) -> dict[str, FileEntry]:
+    """Read the manifest of a deb package or a prime directory.
+
+    :param path: The deb package file or directory.
+
+    :returns: A map of relative paths to file metadata.
+    """
+    if path.is_dir():
+        return read_directory_manifest(path)
+
+    with path.open("rb") as f:
+        return read_deb_manifest(f)
+
+
+def read_deb_manifest(fileobj: BinaryIO) -> dict[str, FileEntry]:
+    """Read the manifest of a deb package.
+
+    The package is read as a stream. File digests are taken from the md5sums
+    file, and only computed from the contents of files not listed in it. Hard
+    links are recorded as copies of the file they link to, as they would
+    appear in a directory.
+
+    :param fileobj: The deb package file.
+
+    :returns: A map of relative paths to file metadata.
+    """
+    manifest: dict[str, FileEntry] = {}
+    md5sums: dict[str, str] = {}
+
+    for kind, tar in iter_deb_tarballs(fileobj):
+        if kind == "control":
+            md5sums = read_md5sums(tar) or {}
+            continue
+
+        for tarinfo in tar:
+            path = normalize_path(tarinfo.name)
+            if not path:
+                continue
+
+            entry = _entry_from_tarinfo(tarinfo)
+            if entry.type == FileType.HARDLINK and entry.linkname in manifest:
+                entry = dataclasses.replace(manifest[entry.linkname])
+            elif entry.type == FileType.FILE:
+                entry.digest = md5sums.get(path)
+                data = tar.extractfile(tarinfo) if entry.digest is None else None
+                if data is not None:
+                    entry.digest = _md5(data)
+            manifest[path] = entry
+
+    return manifest
+
+
+def read_directory_manifest(root: pathlib.Path) -> dict[str, FileEntry]:
+    """Read the manifest of a directory such as a prime directory.
+
+    File digests are only computed when needed to compare files.
+
+    :param root: The directory.
+
+    :returns: A map of relative paths to file metadata.
+    """
+    manifest: dict[str, FileEntry] = {}
+    # Walk the tree in the same order as the data tarball is written.
+    for filename, path in util.iter_tree(root):
+        source = pathlib.Path(filename)
+        st = source.lstat()
+        mode = stat.S_IMODE(st.st_mode)
+        if stat.S_ISLNK(st.st_mode):
+            target = str(source.readlink())
+            manifest[path] = FileEntry(FileType.SYMLINK, mode, linkname=target)
+        elif stat.S_ISDIR(st.st_mode):
+            manifest[path] = FileEntry(FileType.DIRECTORY, mode)
+        elif stat.S_ISREG(st.st_mode):
+            manifest[path] = FileEntry(
+                FileType.FILE, mode, size=st.st_size, source=source
+            )
+        else:
+            manifest[path] = FileEntry(FileType.OTHER, mode)
+    return manifest
+
+
+def diff_manifests(
+    old: dict[str, FileEntry], new: dict[str, FileEntry]
+) -> list[Change]:
+    """Compare two manifests.
+
+    Metadata is compared first, and file contents are only compared when the
+    sizes match and a digest is not already known.
+
+    :param old: The manifest of the old version.
+    :param new: The manifest of the new version.
+
+    :returns: The changes, sorted by path.
+    """
+    changes = []
+    for path in sorted(old.keys() | new.keys()):
+        old_entry = old.get(path)
+        new_entry = new.get(path)
+        if old_entry is None:
+            changes.append(Change(path, ChangeKind.ADDED, None, new_entry))
+        elif new_entry is None:
+            changes.append(Change(path, ChangeKind.REMOVED, old_entry, None))
+        elif _is_changed(old_entry, new_entry):
+            changes.append(Change(path, ChangeKind.CHANGED, old_entry, new_entry))
+    return changes
+
+
+def _is_changed(old: FileEntry, new: FileEntry) -> bool:
+    """Check whether two versions of a file differ.
+
+    :param old: The old file metadata.
+    :param new: The new file metadata.
+
+    :returns: Whether the file changed.
+    """
+    if (old.type, old.mode, old.size, old.linkname) != (
+        new.type,
+        new.mode,
+        new.size,
+        new.linkname,
+    ):
+        return True
+
+    if old.type != FileType.FILE:
+        return False
+
+    return old.get_digest() != new.get_digest()
+
+
+def _entry_from_tarinfo(tarinfo: tarfile.TarInfo) -> FileEntry:
+    """Create a manifest entry from a tarball member.
+
+    :param tarinfo: The tarball member.
+
+    :returns: The file metadata.
+    """
+    mode = stat.S_IMODE(tarinfo.mode)
+    if tarinfo.isreg():
+        return FileEntry(FileType.FILE, mode, size=tarinfo.size)
+    if tarinfo.isdir():
+        return FileEntry(FileType.DIRECTORY, mode)
+    if tarinfo.issym():
+        return FileEntry(FileType.SYMLINK, mode, linkname=tarinfo.linkname)
+    if tarinfo.islnk():
+        linkname = normalize_path(tarinfo.linkname)
+        return FileEntry(FileType.HARDLINK, mode, linkname=linkname)
+    return FileEntry(FileType.OTHER, mode)
+
+
+def _md5(data: BinaryIO) -> str:
+    """Compute the MD5 digest of a stream.
+
+    :param data: The stream to hash.
+
+    :returns: The hexadecimal digest.
+    """
+    md5 = hashlib.md5()  # noqa: S324
+    while chunk := data.read(_HASH_CHUNK_SIZE):
+        md5.update(chunk)
+    return md5.hexdigest()
@@ -0,0 +1,276 @@
+#  This file is part of debcraft.
+#
+#  Copyright 2026 Canonical Ltd.
+#
+#  This program is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranties of MERCHANTABILITY,
+#  SATISFACTORY QUALITY, or FITNESS FOR A PARTICULAR PURPOSE.
+#  See the GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along
+#  with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""APT package index generation for flat repositories."""
+
+import dataclasses
+import email.utils
+import hashlib
+import io
+import pathlib
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+
+import zstandard as zstd
+from craft_cli import emit
+
+from debcraft import control, errors, util
+from debcraft.models.const import FsyncPolicy
+
+from .reader import iter_deb_tarballs, normalize_path
+
+PACKAGES = "Packages"
+PACKAGES_ZST = "Packages.zst"
+RELEASE = "Release"
+
+_ZSTD_COMPRESSION_LEVEL = 19
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+# Release fields regenerated on every update.
+_RELEASE_GENERATED_FIELDS = ("Date", "MD5Sum", "SHA1", "SHA256", "SHA512")
+
+
+@dataclasses.dataclass(frozen=True)
+class _Entry:
+    """A package in the index."""
+
+    package: str
+    """The package name, used to sort the index."""
+
+    size: int
+    """The size of the package file in bytes."""
+
+    stanza: str
+    """The encoded Packages stanza, without the separating empty line."""
+
+
+class PackageIndex:
+    """The package index of a flat APT repository.
+
+    The index is loaded from the ``Packages`` file in the repository directory,
+    so updating it only reads the packages that were added or changed.
+
+    :param repo_dir: The repository directory containing the packages.
+    """
+
+    def __init__(self, repo_dir: pathlib.Path) -> None:
+        self._repo_dir = repo_dir
+        self._entries: dict[str, _Entry] = {}
+        self._index_mtime_ns = 0
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(
+        self, debs: Iterable[pathlib.Path], *, max_workers: int | None = None
+    ) -> None:
+        """Add packages to the index, replacing entries for the same files.
+
+        :param debs: The packages to add, which must be in the repository
+            directory.
+        :param max_workers: The number of packages to read in parallel.
+        """
+        paths = list(debs)
+        filenames = [self._get_filename(path) for path in paths]
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            entries = executor.map(_read_entry, paths, filenames)
+            for filename, entry in zip(filenames, entries):
+                emit.debug(f"Index package {filename}")
+                self._entries[filename] = entry
+
+    def refresh(self, *, max_workers: int | None = None) -> list[pathlib.Path]:
+        """Synchronize the index with the packages in the repository directory.
+
+        Entries for missing packages are removed, and packages that are new or
+        were modified after the index was written are read.
+
+        :param max_workers: The number of packages to read in parallel.
+
+        :returns: The packages that were read.
+        """
+        changed: list[pathlib.Path] = []
+        found: set[str] = set()
+
+        for path in sorted(self._repo_dir.rglob("*.deb")):
+            filename = self._get_filename(path)
+            found.add(filename)
+            entry = self._entries.get(filename)
+            stat = path.stat()
+            if (
+                entry is None
+                or entry.size != stat.st_size
+                or stat.st_mtime_ns > self._index_mtime_ns
+            ):
+                changed.append(path)
+
+        for filename in self._entries.keys() - found:
+            emit.debug(f"Remove missing package {filename} from index")
+            del self._entries[filename]
+
+        self.add(changed, max_workers=max_workers)
+        return changed
+
+    def write(self, *, fsync: FsyncPolicy = "dir") -> None:
+        """Write the Packages, Packages.zst and Release files.
+
+        Each file is replaced atomically, and the Release file is written last
+        so that it only references complete indexes.
+
+        :param fsync: When to flush the written files to permanent storage.
+        """
+        entries = sorted(
+            self._entries.items(), key=lambda item: (item[1].package, item[0])
+        )
+        packages = "\n".join(entry.stanza for _, entry in entries).encode("utf-8")
+        packages_zst = zstd.ZstdCompressor(level=_ZSTD_COMPRESSION_LEVEL).compress(
+            packages
+        )
+
+        indexes = {PACKAGES: packages, PACKAGES_ZST: packages_zst}
+        for name, data in indexes.items():
+            with util.atomic_write(self._repo_dir / name, fsync=fsync) as f:
+                f.write(data)
+
+        release = self._read_release()
+        release["Date"] = email.utils.formatdate(usegmt=True)
+        for field, algorithm in (("MD5Sum", "md5"), ("SHA256", "sha256")):
+            lines = [
+                f"{hashlib.new(algorithm, data).hexdigest()} {len(data)} {name}"
+                for name, data in indexes.items()
+            ]
+            release[field] = "\n" + "\n".join(lines)
+
+        with util.atomic_write(self._repo_dir / RELEASE, fsync=fsync) as f:
+            text = io.StringIO()
+            control.Encoder(text).encode_fields(release)
+            f.write(text.getvalue().encode("utf-8"))
+
+        self._index_mtime_ns = (self._repo_dir / PACKAGES).stat().st_mtime_ns
+
+    def _load(self) -> None:
+        """Load the entries from an existing Packages file."""
+        packages_file = self._repo_dir / PACKAGES
+        try:
+            text = packages_file.read_text(encoding="utf-8")
+            self._index_mtime_ns = packages_file.stat().st_mtime_ns
+        except FileNotFoundError:
+            return
+
+        for stanza in text.split("\n\n"):
+            if not stanza.strip():
+                continue
+
+            fields = control.parse_fields(stanza)
+            try:
+                entry = _Entry(
+                    package=fields["Package"],
+                    size=int(fields["Size"]),
+                    stanza=stanza.strip("\n") + "\n",
+                )
+                self._entries[fields["Filename"]] = entry
+            except (KeyError, ValueError) as err:
+                raise errors.DebcraftError(
+                    f"invalid package index {str(packages_file)!r}",
+                    resolution=f"Remove {PACKAGES!r} to recreate the index.",
+                ) from err
+
+    def _read_release(self) -> dict[str, str]:
+        """Read the fields of an existing Release file that are kept on update.
+
+        :returns: The Release fields, without the generated fields.
+        """
+        try:
+            text = (self._repo_dir / RELEASE).read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return {}
+
+        fields = control.parse_fields(text)
+        return {k: v for k, v in fields.items() if k not in _RELEASE_GENERATED_FIELDS}
+
+    def _get_filename(self, path: pathlib.Path) -> str:
+        """Get the Filename field for a package in the repository.
+
+        :param path: The package path.
+
+        :returns: The package path relative to the repository directory.
+        """
+        try:
+            return path.absolute().relative_to(self._repo_dir.absolute()).as_posix()
+        except ValueError as err:
+            raise errors.DebcraftError(
+                f"package {str(path)!r} is not in the repository directory"
+            ) from err
+
+
+def _read_entry(path: pathlib.Path, filename: str) -> _Entry:
+    """Create the index entry for a package.
+
+    :param path: The package file.
+    :param filename: The value of the Filename field.
+
+    :returns: The index entry.
+    """
+    md5 = hashlib.md5()  # noqa: S324
+    sha256 = hashlib.sha256()
+    size = 0
+
+    with path.open("rb") as f:
+        fields = _read_control(f, path)
+        f.seek(0)
+        while chunk := f.read(_HASH_CHUNK_SIZE):
+            md5.update(chunk)
+            sha256.update(chunk)
+            size += len(chunk)
+
+    description = fields.pop("Description", None)
+    fields["Filename"] = filename
+    fields["Size"] = str(size)
+    fields["MD5sum"] = md5.hexdigest()
+    fields["SHA256"] = sha256.hexdigest()
+    if description is not None:
+        fields["Description"] = description
+
+    text = io.StringIO()
+    control.Encoder(text).encode_fields(fields)
+    return _Entry(package=fields["Package"], size=size, stanza=text.getvalue())
+
+
+def _read_control(fileobj: io.BufferedReader, path: pathlib.Path) -> dict[str, str]:
+    """Read the control fields of a package.
+
+    Only the control tarball is read, which comes before the data tarball.
+
+    :param fileobj: The package file.
+    :param path: The package path, used in error messages.
+
+    :returns: The control fields.
+    """
+    for kind, tar in iter_deb_tarballs(fileobj):
+        if kind != "control":
+            continue
+
+        for tarinfo in tar:
+            data = tar.extractfile(tarinfo) if tarinfo.isreg() else None
+            if data is not None and normalize_path(tarinfo.name) == "control":
+                fields = control.parse_fields(data.read().decode("utf-8"))
+                if "Package" not in fields:
+                    break
+                return fields
+        break
+
+    raise errors.DebcraftError(f"package {str(path)!r} has no valid control file")
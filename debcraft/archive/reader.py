@@ -0,0 +1,370 @@
+#  This file is part of debcraft.
+#
+#  Copyright 2026 Canonical Ltd.
+#
+#  This program is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranties of MERCHANTABILITY,
+#  SATISFACTORY QUALITY, or FITNESS FOR A PARTICULAR PURPOSE.
+#  See the GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along
+#  with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Streaming reader for deb packages.
+
+Packages are read sequentially, so they can be inspected from pipes and
+without extracting them to disk. File contents are streamed through the
+decompression buffers, but tarfile keeps the header of every member read, so
+memory use grows with the number of files in the package.
+
+Corrupt tarballs are reported as Debcraft errors, both when members are listed
+and when their contents are read.
+"""
+
+import contextlib
+import dataclasses
+import gzip
+import io
+import lzma
+import tarfile
+import zlib
+from collections.abc import Iterator
+from typing import Any, BinaryIO, cast
+
+import zstandard as zstd
+
+from debcraft import errors
+
+from .ar import AR_MAGIC
+from .seekable import SeekableZstdReader, read_seek_table
+
+_AR_HEADER_SIZE = 60
+_AR_HEADER_END = b"`\n"
+_SKIP_BUFSIZE = 1024 * 1024
+
+# Tarball compressions accepted by dpkg-deb.
+_TAR_SUFFIXES = (".tar", ".tar.gz", ".tar.xz", ".tar.zst")
+
+# Errors raised by tarfile and the decompressors when reading corrupt data.
+_CORRUPT_DATA_ERRORS = (
+    tarfile.TarError,
+    zstd.ZstdError,
+    lzma.LZMAError,
+    EOFError,
+    zlib.error,
+)
+
+
+@dataclasses.dataclass(frozen=True)
+class ArMember:
+    """A member of an ar archive."""
+
+    name: str
+    """The member name."""
+
+    size: int
+    """The size of the member data in bytes."""
+
+
+def iter_ar_members(fileobj: BinaryIO) -> Iterator[tuple[ArMember, BinaryIO]]:
+    """Iterate over the members of an ar archive.
+
+    Each member stream is only valid until the next member is requested, and
+    any unread data is skipped.
+
+    :param fileobj: The archive file, which does not need to be seekable.
+
+    :returns: An iterator of the members and their data streams.
+    """
+    if fileobj.read(len(AR_MAGIC)) != AR_MAGIC:
+        raise errors.DebcraftError("invalid ar archive: bad magic")
+
+    while True:
+        header = fileobj.read(_AR_HEADER_SIZE)
+        if not header:
+            return
+        if len(header) != _AR_HEADER_SIZE or header[58:] != _AR_HEADER_END:
+            raise errors.DebcraftError("invalid ar archive: bad member header")
+
+        try:
+            name = header[:16].decode("ascii").rstrip().removesuffix("/")
+            size = int(header[48:58])
+        except ValueError as err:
+            raise errors.DebcraftError("invalid ar archive: bad member header") from err
+
+        stream = _MemberReader(fileobj, size)
+        yield ArMember(name=name, size=size), stream
+        stream.skip()
+
+        if size % 2:
+            fileobj.read(1)
+
+
+@contextlib.contextmanager
+def open_decompressed(name: str, fileobj: BinaryIO) -> Iterator[BinaryIO]:
+    """Open a decompressed stream of a tarball.
+
+    :param name: The tarball file name, used to select the decompressor.
+    :param fileobj: The compressed tarball stream.
+
+    :returns: A context manager yielding the decompressed stream. Errors
+        raised when reading corrupt data from it are reported as Debcraft
+        errors.
+    """
+    suffix = next((s for s in _TAR_SUFFIXES if name.endswith(s)), None)
+    if suffix is None:
+        raise errors.DebcraftError(f"unsupported tarball compression: {name!r}")
+
+    with _check_corrupt_data(_describe_tarball(name)):
+        if suffix == ".tar":
+            yield fileobj
+        elif suffix == ".tar.zst":
+            # Decompress all frames, including those of seekable tarballs.
+            with zstd.ZstdDecompressor().stream_reader(
+                fileobj, read_across_frames=True, closefd=False
+            ) as stream:
+                yield cast(BinaryIO, stream)
+        elif suffix == ".tar.xz":
+            with lzma.LZMAFile(fileobj) as stream:
+                yield cast(BinaryIO, stream)
+        else:
+            with gzip.GzipFile(fileobj=fileobj) as stream:
+                yield cast(BinaryIO, stream)
+
+
+@contextlib.contextmanager
+def open_tarball(name: str, fileobj: BinaryIO) -> Iterator[tarfile.TarFile]:
+    """Open a compressed tarball for sequential reading.
+
+    :param name: The tarball file name, used to select the decompressor.
+    :param fileobj: The compressed tarball stream.
+
+    :returns: A context manager yielding the tarball in stream mode.
+    """
+    with (
+        open_decompressed(name, fileobj) as stream,
+        _TarFile.open(
+            fileobj=stream, mode="r|", description=_describe_tarball(name)
+        ) as tar,
+    ):
+        yield tar
+
+
+def iter_deb_tarballs(fileobj: BinaryIO) -> Iterator[tuple[str, tarfile.TarFile]]:
+    """Iterate over the control and data tarballs of a deb package.
+
+    Tarballs are read in stream mode, so each tarball and its members can only
+    be read once and in order.
+
+    :param fileobj: The deb package file, which does not need to be seekable.
+
+    :returns: An iterator of the tarball kind ("control" or "data") and the
+        tarball contents.
+    """
+    members = iter_ar_members(fileobj)
+    member, stream = next(members, (None, None))
+    if member is None or stream is None or member.name != "debian-binary":
+        raise errors.DebcraftError("invalid deb package: missing debian-binary")
+
+    version = stream.read(member.size).decode("ascii", errors="replace").strip()
+    if not version.startswith("2."):
+        raise errors.DebcraftError(f"unsupported deb format version {version!r}")
+
+    for member, stream in members:
+        kind = member.name.partition(".")[0]
+        # Members starting with an underscore are reserved for extensions.
+        if member.name.startswith("_") or kind not in ("control", "data"):
+            continue
+
+        with open_tarball(member.name, stream) as tar:
+            yield kind, tar
+
+
+@contextlib.contextmanager
+def open_seekable_data_tarball(
+    fileobj: BinaryIO,
+) -> Iterator[tarfile.TarFile | None]:
+    """Open the data tarball of a deb package for random access.
+
+    If the data tarball is a seekable zstd stream, its members are located by
+    seeking from one tar header to the next, so only the frames containing
+    headers and the data being read are decompressed.
+
+    :param fileobj: The deb package file, which must be seekable.
+
+    :returns: A context manager yielding the data tarball, or None if it is
+        not a seekable zstd stream.
+    """
+    for member, _ in iter_ar_members(fileobj):
+        if member.name.startswith("data."):
+            break
+    else:
+        yield None
+        return
+
+    offset = fileobj.tell()
+    frames = None
+    if member.name == "data.tar.zst":
+        frames = read_seek_table(fileobj, offset=offset, size=member.size)
+    if frames is None:
+        yield None
+        return
+
+    # Buffer the reader so that headers spanning two frames are read whole.
+    reader = io.BufferedReader(SeekableZstdReader(fileobj, frames, offset=offset))
+    with _TarFile.open(
+        fileobj=reader, mode="r:", description=_describe_tarball(member.name)
+    ) as tar:
+        yield tar
+
+
+def read_md5sums(tar: tarfile.TarFile) -> dict[str, str] | None:
+    """Read the md5sums file from a control tarball.
+
+    :param tar: The control tarball.
+
+    :returns: A map of paths to MD5 digests, or None if there is no md5sums file.
+    """
+    for tarinfo in tar:
+        data = tar.extractfile(tarinfo) if tarinfo.isreg() else None
+        if data is not None and normalize_path(tarinfo.name) == "md5sums":
+            return parse_md5sums(data.read().decode("utf-8"))
+    return None
+
+
+def parse_md5sums(text: str) -> dict[str, str]:
+    """Parse the contents of an md5sums file.
+
+    :param text: The md5sums file contents.
+
+    :returns: A map of paths to MD5 digests.
+    """
+    md5sums = {}
+    for line in text.splitlines():
+        digest, _, path = line.partition("  ")
+        if path:
+            md5sums[normalize_path(path)] = digest
+    return md5sums
+
+
+def normalize_path(name: str) -> str:
+    """Normalize a tarball member name to a path relative to the root.
+
+    :param name: The member name, such as ``./usr/bin/hello``.
+
+    :returns: The relative path, such as ``usr/bin/hello``.
+    """
+    return name.removeprefix("./").strip("/")
+
+
+def _describe_tarball(name: str) -> str:
+    """Describe a tarball in error messages.
+
+    :param name: The tarball file name, such as ``data.tar.zst``.
+
+    :returns: A description such as ``data tarball``.
+    """
+    return f"{name.partition('.')[0]} tarball"
+
+
+@contextlib.contextmanager
+def _check_corrupt_data(description: str) -> Iterator[None]:
+    """Convert the errors raised when reading corrupt data to Debcraft errors.
+
+    :param description: The description of the tarball being read.
+    """
+    try:
+        yield
+    except _CORRUPT_DATA_ERRORS as err:
+        raise errors.DebcraftError(f"corrupt {description}: {err}") from err
+
+
+class _TarFile(tarfile.TarFile):
+    """A tarball that reports corrupt data as Debcraft errors.
+
+    :param description: The description of the tarball in error messages.
+    """
+
+    def __init__(
+        self,
+        *args: Any,
+        description: str = "tarball",
+        **kwargs: Any,
+    ) -> None:
+        # Set before the first member is read by the base class.
+        self._description = description
+        with _check_corrupt_data(description):
+            super().__init__(*args, **kwargs)
+
+    def next(self) -> tarfile.TarInfo | None:
+        """Read the next member of the tarball.
+
+        :returns: The member, or None at the end of the tarball.
+        """
+        with _check_corrupt_data(self._description):
+            return super().next()
+
+    def extractfile(self, member: str | tarfile.TarInfo) -> BinaryIO | None:  # type: ignore[override]
+        """Open the contents of a member.
+
+        :param member: The member name or information.
+
+        :returns: The member contents, or None if it is not a file.
+        """
+        with _check_corrupt_data(self._description):
+            data = super().extractfile(member)
+        if data is None:
+            return None
+        reader = _CheckedReader(cast(BinaryIO, data), self._description)
+        return cast(BinaryIO, io.BufferedReader(reader))
+
+
+class _CheckedReader(io.RawIOBase):
+    """Read the contents of a tarball member, reporting corrupt data."""
+
+    def __init__(self, data: BinaryIO, description: str) -> None:
+        super().__init__()
+        self._data = data
+        self._description = description
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: memoryview) -> int:  # type: ignore[override]
+        with _check_corrupt_data(self._description):
+            return self._data.readinto(buffer)  # type: ignore[attr-defined]
+
+
+class _MemberReader(io.RawIOBase):
+    """Read an ar member without reading past its end."""
+
+    def __init__(self, fileobj: BinaryIO, size: int) -> None:
+        super().__init__()
+        self._fileobj = fileobj
+        self._remaining = size
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: memoryview) -> int:  # type: ignore[override]
+        size = min(len(buffer), self._remaining)
+        if size == 0:
+            return 0
+
+        data = self._fileobj.read(size)
+        if not data:
+            raise errors.DebcraftError("invalid ar archive: truncated member")
+
+        buffer[: len(data)] = data
+        self._remaining -= len(data)
+        return len(data)
+
+    def skip(self) -> None:
+        """Skip the unread member data."""
+        while self._remaining:
+            if not self.read(min(self._remaining, _SKIP_BUFSIZE)):
+                break
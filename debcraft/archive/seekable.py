@@ -0,0 +1,293 @@
+#  This file is part of debcraft.
+#
+#  Copyright 2026 Canonical Ltd.
+#
+#  This program is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranties of MERCHANTABILITY,
+#  SATISFACTORY QUALITY, or FITNESS FOR A PARTICULAR PURPOSE.
+#  See the GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along
+#  with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Seekable zstd streams.
+
+A seekable zstd stream is a sequence of independent zstd frames followed by
+a seek table stored in a skippable frame, as described in the zstd seekable
+format specification. Regular zstd decoders, including the one used by dpkg,
+decompress the frames in sequence and ignore the seek table, while readers
+aware of the format can decompress only the frames they need.
+"""
+
+import bisect
+import io
+import itertools
+import struct
+from typing import BinaryIO
+
+import zstandard as zstd
+from typing_extensions import Self
+
+from debcraft import errors
+
+_SKIPPABLE_MAGIC = 0x184D2A5E
+_SEEKABLE_MAGIC = 0x8F92EAB1
+_SEEK_TABLE_FOOTER = struct.Struct("<IBI")
+_SKIPPABLE_HEADER = struct.Struct("<II")
+_ENTRY = struct.Struct("<II")
+_ENTRY_WITH_CHECKSUM = struct.Struct("<III")
+_CHECKSUM_FLAG = 0x80
+
+# Frame sizes are stored as 32-bit values in the seek table.
+_MAX_FRAME_SIZE_LIMIT = 0xFFFFFFFF
+
+
+class SeekableZstdWriter:
+    """Write data as a seekable zstd stream.
+
+    Frames are ended when :meth:`mark_boundary` is called after at least
+    ``frame_size`` bytes were written to the current frame, or when a frame
+    reaches ``max_frame_size`` bytes. The seek table is written when the
+    writer is closed.
+
+    :param fileobj: The file to write the compressed stream to.
+    :param compressor: The compressor used to create each frame.
+    :param frame_size: The minimum uncompressed size of a frame ended at a
+        boundary.
+    :param max_frame_size: The maximum uncompressed size of a frame.
+    """
+
+    def __init__(
+        self,
+        fileobj: BinaryIO,
+        compressor: zstd.ZstdCompressor,
+        *,
+        frame_size: int,
+        max_frame_size: int,
+    ) -> None:
+        if not 0 < frame_size <= max_frame_size <= _MAX_FRAME_SIZE_LIMIT:
+            raise ValueError("invalid seekable zstd frame sizes")
+
+        self._fileobj = fileobj
+        self._compressor = compressor
+        self._frame_size = frame_size
+        self._max_frame_size = max_frame_size
+        self._cobj: zstd.ZstdCompressionObj | None = None
+        self._frame_in = 0
+        self._frame_out = 0
+        self._pos = 0
+        self._frames: list[tuple[int, int]] = []
+        self._closed = False
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    @property
+    def frames(self) -> list[tuple[int, int]]:
+        """The compressed and decompressed sizes of the frames written so far."""
+        return list(self._frames)
+
+    def tell(self) -> int:
+        """Return the number of uncompressed bytes written."""
+        return self._pos
+
+    def write(self, data: bytes) -> int:
+        """Compress and write data to the current frame.
+
+        :param data: The data to write.
+        :returns: The number of bytes written.
+        """
+        view = memoryview(data).cast("B")
+        while view:
+            if self._cobj is None:
+                self._cobj = self._compressor.compressobj()
+
+            size = min(len(view), self._max_frame_size - self._frame_in)
+            self._write_compressed(self._cobj.compress(view[:size]))
+            self._frame_in += size
+            self._pos += size
+            view = view[size:]
+
+            if self._frame_in >= self._max_frame_size:
+                self._end_frame()
+
+        return len(data)
+
+    def flush(self) -> None:
+        """Flush the underlying file."""
+        self._fileobj.flush()
+
+    def mark_boundary(self) -> None:
+        """Mark a point where a new frame may start.
+
+        The current frame is ended if it is larger than the target frame size.
+        """
+        if self._frame_in >= self._frame_size:
+            self._end_frame()
+
+    def close(self) -> None:
+        """End the current frame and write the seek table."""
+        if self._closed:
+            return
+
+        self._end_frame()
+
+        entries = b"".join(_ENTRY.pack(*frame) for frame in self._frames)
+        footer = _SEEK_TABLE_FOOTER.pack(len(self._frames), 0, _SEEKABLE_MAGIC)
+        header = _SKIPPABLE_HEADER.pack(_SKIPPABLE_MAGIC, len(entries) + len(footer))
+        self._fileobj.write(header + entries + footer)
+        self._closed = True
+
+    def _write_compressed(self, data: bytes) -> None:
+        if data:
+            self._fileobj.write(data)
+            self._frame_out += len(data)
+
+    def _end_frame(self) -> None:
+        if self._cobj is None:
+            return
+
+        self._write_compressed(self._cobj.flush())
+        self._frames.append((self._frame_out, self._frame_in))
+        self._cobj = None
+        self._frame_in = 0
+        self._frame_out = 0
+
+
+def read_seek_table(
+    fileobj: BinaryIO, *, offset: int = 0, size: int | None = None
+) -> list[tuple[int, int]] | None:
+    """Read the seek table of a seekable zstd stream.
+
+    :param fileobj: A seekable file containing the zstd stream.
+    :param offset: The position of the zstd stream in the file.
+    :param size: The size of the zstd stream, or None if it extends to the
+        end of the file.
+
+    :returns: A list containing the compressed and decompressed sizes of
+        each frame, or None if the stream has no seek table.
+    """
+    if size is None:
+        size = fileobj.seek(0, io.SEEK_END) - offset
+
+    if size < _SKIPPABLE_HEADER.size + _SEEK_TABLE_FOOTER.size:
+        return None
+
+    fileobj.seek(offset + size - _SEEK_TABLE_FOOTER.size)
+    num_frames, descriptor, magic = _SEEK_TABLE_FOOTER.unpack(
+        fileobj.read(_SEEK_TABLE_FOOTER.size)
+    )
+    if magic != _SEEKABLE_MAGIC:
+        return None
+
+    entry = _ENTRY_WITH_CHECKSUM if descriptor & _CHECKSUM_FLAG else _ENTRY
+    table_size = num_frames * entry.size + _SEEK_TABLE_FOOTER.size
+    table_offset = offset + size - table_size - _SKIPPABLE_HEADER.size
+    if table_offset < offset:
+        raise errors.DebcraftError("invalid zstd seek table: table too large")
+
+    fileobj.seek(table_offset)
+    magic, frame_size = _SKIPPABLE_HEADER.unpack(fileobj.read(_SKIPPABLE_HEADER.size))
+    if magic != _SKIPPABLE_MAGIC or frame_size != table_size:
+        raise errors.DebcraftError("invalid zstd seek table: bad skippable frame")
+
+    data = fileobj.read(num_frames * entry.size)
+    frames = [(values[0], values[1]) for values in entry.iter_unpack(data)]
+
+    if sum(compressed for compressed, _ in frames) != table_offset - offset:
+        raise errors.DebcraftError("invalid zstd seek table: frame sizes mismatch")
+
+    return frames
+
+
+class SeekableZstdReader(io.RawIOBase):
+    """A read-only, seekable view of the decompressed data in a seekable stream.
+
+    Only the frames containing the requested data are decompressed. The most
+    recently used frame is kept in memory, so sequential reads decompress each
+    frame once.
+
+    :param fileobj: A seekable file containing the zstd stream.
+    :param frames: The seek table of the stream, as returned by
+        :func:`read_seek_table`.
+    :param offset: The position of the zstd stream in the file.
+    """
+
+    def __init__(
+        self, fileobj: BinaryIO, frames: list[tuple[int, int]], *, offset: int = 0
+    ) -> None:
+        super().__init__()
+        self._fileobj = fileobj
+        self._frames = frames
+        self._comp_offsets = list(
+            itertools.accumulate((c for c, _ in frames), initial=offset)
+        )
+        self._offsets = list(itertools.accumulate((d for _, d in frames), initial=0))
+        self._size = self._offsets[-1]
+        self._pos = 0
+        self._dctx = zstd.ZstdDecompressor()
+        self._cached_frame = -1
+        self._cached_data = b""
+
+    def readable(self) -> bool:
+        """Return whether the stream can be read."""
+        return True
+
+    def seekable(self) -> bool:
+        """Return whether the stream supports random access."""
+        return True
+
+    def tell(self) -> int:
+        """Return the current decompressed stream position."""
+        return self._pos
+
+    def seek(self, pos: int, whence: int = io.SEEK_SET) -> int:
+        """Change the decompressed stream position.
+
+        :param pos: The position offset.
+        :param whence: The reference point for the offset.
+        :returns: The new absolute position.
+        """
+        if whence == io.SEEK_CUR:
+            pos += self._pos
+        elif whence == io.SEEK_END:
+            pos += self._size
+        if pos < 0:
+            raise ValueError("negative seek position")
+        self._pos = pos
+        return pos
+
+    def readinto(self, buffer: bytearray | memoryview) -> int:  # type: ignore[override]
+        """Read decompressed data into a buffer.
+
+        :param buffer: The buffer to fill.
+        :returns: The number of bytes read.
+        """
+        if self._pos >= self._size:
+            return 0
+
+        index = bisect.bisect_right(self._offsets, self._pos) - 1
+        data = self._read_frame(index)
+        start = self._pos - self._offsets[index]
+        chunk = data[start : start + len(buffer)]
+        buffer[: len(chunk)] = chunk
+        self._pos += len(chunk)
+        return len(chunk)
+
+    def _read_frame(self, index: int) -> bytes:
+        if index != self._cached_frame:
+            compressed_size, decompressed_size = self._frames[index]
+            self._fileobj.seek(self._comp_offsets[index])
+            self._cached_data = self._dctx.decompress(
+                self._fileobj.read(compressed_size),
+                max_output_size=decompressed_size,
+            )
+            self._cached_frame = index
+        return self._cached_data
@@ -0,0 +1,324 @@
+#  This file is part of debcraft.
+#
+#  Copyright 2026 Canonical Ltd.
+#
+#  This program is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranties of MERCHANTABILITY,
+#  SATISFACTORY QUALITY, or FITNESS FOR A PARTICULAR PURPOSE.
+#  See the GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along
+#  with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Integrity verification for deb packages."""
+
+import collections
+import contextlib
+import hashlib
+import os
+import posixpath
+import tarfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import BinaryIO
+
+from debcraft.control import parse_fields
+
+from .reader import iter_deb_tarballs, normalize_path, parse_md5sums
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+_MAX_PENDING_CHUNKS = 16
+_MAX_SYMLINK_DEPTH = 40
+
+
+def verify_deb(
+    fileobj: BinaryIO, *, hasher: ThreadPoolExecutor | None = None
+) -> list[str]:
+    """Verify the file digests and installed size of a deb package.
+
+    The package is read as a stream. Member data is hashed on a pool of worker
+    threads while the data tarball is being decompressed, several members at
+    a time, with a bounded number of chunks in flight so memory use does not
+    depend on the file sizes.
+
+    :param fileobj: The deb package file.
+    :param hasher: The executor used for hashing, which can be shared between
+        packages verified in parallel. By default, a pool with one thread per
+        CPU is created for the package.
+
+    :returns: A list of problems found, empty if the package is valid.
+
+    :raises DebcraftError: If the package cannot be read or is corrupt.
+    """
+    problems: list[str] = []
+    control: dict[str, str] | None = None
+    md5sums: dict[str, str] | None = None
+    digests: dict[str, Future[str]] = {}
+    sizes = _SizeCollector()
+
+    with contextlib.ExitStack() as stack:
+        if hasher is None:
+            hasher = stack.enter_context(ThreadPoolExecutor(max_workers=os.cpu_count()))
+        pending = threading.BoundedSemaphore(_MAX_PENDING_CHUNKS)
+
+        for kind, tar in iter_deb_tarballs(fileobj):
+            if kind == "control":
+                control, md5sums = _read_control_files(tar)
+                continue
+
+            for tarinfo in tar:
+                sizes.add(tarinfo)
+                path = normalize_path(tarinfo.name)
+                if tarinfo.islnk():
+                    # Hard links share the contents of a previous member.
+                    target = digests.get(normalize_path(tarinfo.linkname))
+                    if target is not None:
+                        digests[path] = target
+                    continue
+
+                data = tar.extractfile(tarinfo) if tarinfo.isreg() else None
+                if data is not None:
+                    digests[path] = _hash_stream(data, hasher, pending)
+
+    if control is None:
+        return ["missing control file"]
+
+    problems.extend(_check_installed_size(control, sizes))
+
+    if md5sums is None:
+        problems.append("missing md5sums file")
+        return problems
+
+    for path, future in digests.items():
+        expected = md5sums.get(path)
+        if expected is None:
+            problems.append(f"{path}: not listed in md5sums")
+        elif future.result() != expected:
+            problems.append(f"{path}: md5sum mismatch")
+
+    problems.extend(
+        f"{path}: listed in md5sums but not in package"
+        for path in md5sums
+        if path not in digests
+    )
+
+    return problems
+
+
+def _read_control_files(
+    tar: tarfile.TarFile,
+) -> tuple[dict[str, str] | None, dict[str, str] | None]:
+    """Read the control and md5sums files from the control tarball.
+
+    :param tar: The control tarball.
+
+    :returns: The parsed control file and a map of paths to MD5 digests, or
+        None if the corresponding file is missing.
+    """
+    control = None
+    md5sums = None
+
+    for tarinfo in tar:
+        name = normalize_path(tarinfo.name)
+        data = tar.extractfile(tarinfo) if tarinfo.isreg() else None
+        if data is None:
+            continue
+
+        if name == "control":
+            control = parse_fields(data.read().decode("utf-8"))
+        elif name == "md5sums":
+            md5sums = parse_md5sums(data.read().decode("utf-8"))
+
+    return control, md5sums
+
+
+def _hash_stream(
+    data: BinaryIO, hasher: ThreadPoolExecutor, pending: threading.BoundedSemaphore
+) -> Future[str]:
+    """Schedule the computation of the MD5 digest of a stream.
+
+    The stream is read completely before returning, but the digest is
+    computed asynchronously.
+
+    :param data: The stream to hash.
+    :param hasher: The executor used for hashing.
+    :param pending: A semaphore limiting the number of chunks in flight.
+
+    :returns: A future resolving to the hexadecimal digest.
+    """
+    stream_hasher = _StreamHasher(hasher, pending)
+    while chunk := data.read(_HASH_CHUNK_SIZE):
+        stream_hasher.feed(chunk)
+
+    return stream_hasher.close()
+
+
+class _StreamHasher:
+    """Compute the MD5 digest of a stream on a shared executor.
+
+    Chunks are queued and hashed in order by at most one worker at a time,
+    so that the workers of the executor can hash several streams at once.
+
+    :param executor: The executor used for hashing.
+    :param pending: A semaphore limiting the number of chunks in flight.
+    """
+
+    def __init__(
+        self, executor: ThreadPoolExecutor, pending: threading.BoundedSemaphore
+    ) -> None:
+        self._executor = executor
+        self._pending = pending
+        self._md5 = hashlib.md5()  # noqa: S324
+        self._chunks: collections.deque[bytes] = collections.deque()
+        self._lock = threading.Lock()
+        self._draining = False
+        self._closed = False
+        self._future: Future[str] = Future()
+
+    def feed(self, chunk: bytes) -> None:
+        """Queue a chunk of the stream for hashing.
+
+        :param chunk: The data to hash.
+        """
+        self._pending.acquire()
+        with self._lock:
+            self._chunks.append(chunk)
+            if self._draining:
+                return
+            self._draining = True
+        self._executor.submit(self._drain)
+
+    def close(self) -> Future[str]:
+        """Mark the end of the stream.
+
+        :returns: A future resolving to the hexadecimal digest.
+        """
+        with self._lock:
+            self._closed = True
+            if not self._draining:
+                self._future.set_result(self._md5.hexdigest())
+        return self._future
+
+    def _drain(self) -> None:
+        while True:
+            with self._lock:
+                if not self._chunks:
+                    self._draining = False
+                    if self._closed:
+                        self._future.set_result(self._md5.hexdigest())
+                    return
+                chunk = self._chunks.popleft()
+
+            self._md5.update(chunk)
+            self._pending.release()
+
+
+def _check_installed_size(
+    control: dict[str, str], sizes: "_SizeCollector"
+) -> list[str]:
+    """Compare the Installed-Size field with the size of the package contents.
+
+    Debcraft computes the installed size as the total size of the regular
+    files in the package, following symlinks, while dpkg-gencontrol rounds
+    each file up to a whole KiB and counts other entries as one KiB. Either
+    value is accepted.
+
+    :param control: The parsed control file.
+    :param sizes: The collected member sizes.
+
+    :returns: A list with a problem description if the size does not match.
+    """
+    field = control.get("Installed-Size")
+    if field is None:
+        return ["missing Installed-Size field"]
+
+    try:
+        installed_size = int(field)
+    except ValueError:
+        return [f"invalid Installed-Size {field!r}"]
+
+    expected = (sizes.total_size() // 1024, sizes.total_blocks())
+    if installed_size not in expected:
+        message = f"Installed-Size is {installed_size}, expected {expected[0]}"
+        return [message]
+
+    return []
+
+
+class _SizeCollector:
+    """Collect the sizes of data tarball members."""
+
+    def __init__(self) -> None:
+        self._files: dict[str, int] = {}
+        self._links: dict[str, str] = {}
+        self._symlinks: dict[str, str] = {}
+        self._blocks = 0
+
+    def add(self, tarinfo: tarfile.TarInfo) -> None:
+        """Record a member of the data tarball.
+
+        :param tarinfo: The member to record.
+        """
+        path = normalize_path(tarinfo.name)
+        if not path:
+            return
+
+        if tarinfo.isreg():
+            self._files[path] = tarinfo.size
+            self._blocks += -(-tarinfo.size // 1024)
+        elif tarinfo.islnk():
+            self._links[path] = normalize_path(tarinfo.linkname)
+        elif tarinfo.issym():
+            self._symlinks[path] = tarinfo.linkname
+            self._blocks += 1
+        else:
+            self._blocks += 1
+
+    def total_size(self) -> int:
+        """Get the total size of the files, following links within the package.
+
+        :returns: The size in bytes.
+        """
+        total = sum(self._files.values())
+        total += sum(self._files.get(target, 0) for target in self._links.values())
+        for path in self._symlinks:
+            target = self._resolve_symlink(path)
+            if target is not None:
+                total += self._files.get(self._links.get(target, target), 0)
+        return total
+
+    def total_blocks(self) -> int:
+        """Get the installed size as computed by dpkg-gencontrol.
+
+        Hard links are only counted once.
+
+        :returns: The size in KiB.
+        """
+        return self._blocks
+
+    def _resolve_symlink(self, path: str) -> str | None:
+        """Resolve a symlink to a path in the package.
+
+        :param path: The symlink path.
+
+        :returns: The final target path, or None if it leaves the package or
+            is a symlink loop.
+        """
+        for _ in range(_MAX_SYMLINK_DEPTH):
+            linkname = self._symlinks.get(path)
+            if linkname is None:
+                return path
+
+            if linkname.startswith("/"):
+                path = posixpath.normpath(linkname).lstrip("/")
+            else:
+                joined = posixpath.join(posixpath.dirname(path), linkname)
+                path = posixpath.normpath(joined)
+            if path.startswith("../"):
+                return None
+
+        return None
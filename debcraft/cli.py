@@ -22,7 +22,7 @@ import craft_application
 from craft_cli import Dispatcher
 
 import debcraft
-from debcraft import services
+from debcraft import commands, services
 
 
 def _create_app() -> debcraft.Application:
@@ -30,7 +30,20 @@ def _create_app() -> debcraft.Application:
     services.register_services()
     app_services = craft_application.ServiceFactory(app=debcraft.METADATA)
 
-    return debcraft.Application(app=debcraft.METADATA, services=app_services)
+    app = debcraft.Application(app=debcraft.METADATA, services=app_services)
+    app.add_command_group(
+        "Package",
+        [
+            commands.InspectCommand,
+            commands.VerifyCommand,
+            commands.IndexCommand,
+            commands.DeltaCommand,
+            commands.ApplyDeltaCommand,
+            commands.DiffCommand,
+        ],
+    )
+
+    return app
 
 
 def get_app_info() -> tuple[Dispatcher, dict[str, Any]]:
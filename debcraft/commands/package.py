@@ -0,0 +1,536 @@
+#  This file is part of debcraft.
+#
+#  Copyright 2026 Canonical Ltd.
+#
+#  This program is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranties of MERCHANTABILITY,
+#  SATISFACTORY QUALITY, or FITNESS FOR A PARTICULAR PURPOSE.
+#  See the GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along
+#  with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Debcraft commands for working with deb packages."""
+
+import argparse
+import functools
+import os
+import pathlib
+import shutil
+import stat
+import sys
+import tarfile
+import textwrap
+from concurrent.futures import ThreadPoolExecutor
+
+from craft_application.commands import AppCommand
+from craft_cli import ArgumentParsingError, emit
+
+from debcraft import archive, errors
+
+_COPY_BUFSIZE = 1024 * 1024
+
+_FILE_TYPES = {
+    tarfile.DIRTYPE: stat.S_IFDIR,
+    tarfile.SYMTYPE: stat.S_IFLNK,
+    tarfile.CHRTYPE: stat.S_IFCHR,
+    tarfile.BLKTYPE: stat.S_IFBLK,
+    tarfile.FIFOTYPE: stat.S_IFIFO,
+}
+
+
+class InspectCommand(AppCommand):
+    """Show the contents of a deb package."""
+
+    name = "inspect"
+    help_msg = "Show the control information and contents of a deb package"
+    overview = textwrap.dedent(
+        """
+        Show the control information and the list of files in a deb package.
+
+        The package is read as a stream and nothing is extracted to disk. Use
+        --extract to write the contents of a single file to standard output.
+        """
+    )
+
+    def fill_parser(self, parser: argparse.ArgumentParser) -> None:
+        """Add arguments specific to the inspect command."""
+        parser.add_argument("deb", type=pathlib.Path, help="The deb package to inspect")
+        parser.add_argument(
+            "--control", action="store_true", help="Show the control file"
+        )
+        parser.add_argument(
+            "--md5sums", action="store_true", help="Show the md5sums file"
+        )
+        parser.add_argument(
+            "--list", action="store_true", help="List the files in the package"
+        )
+        parser.add_argument(
+            "--extract",
+            metavar="PATH",
+            help="Write the contents of the file at PATH to standard output",
+        )
+
+    def run(self, parsed_args: argparse.Namespace) -> None:
+        """Run the inspect command."""
+        deb: pathlib.Path = parsed_args.deb
+        extract: str | None = parsed_args.extract
+        show_control = parsed_args.control
+        show_md5sums = parsed_args.md5sums
+        show_list = parsed_args.list
+
+        if extract is not None:
+            if show_control or show_md5sums or show_list:
+                raise ArgumentParsingError(
+                    "--extract cannot be used with --control, --md5sums or --list"
+                )
+            extract = archive.normalize_path(extract)
+        elif not (show_control or show_md5sums or show_list):
+            show_control = show_list = True
+
+        control_files = []
+        if show_control:
+            control_files.append("control")
+        if show_md5sums:
+            control_files.append("md5sums")
+
+        try:
+            if extract is not None:
+                _extract(deb, extract)
+                return
+
+            with deb.open("rb") as f:
+                for kind, tar in archive.iter_deb_tarballs(f):
+                    if kind == "control" and control_files:
+                        _show_control_files(tar, control_files)
+                    elif kind == "data" and show_list:
+                        for tarinfo in tar:
+                            emit.message(_format_member(tarinfo))
+        except OSError as err:
+            raise errors.DebcraftError(
+                f"cannot read {str(deb)!r}: {err.strerror or err}"
+            ) from err
+
+
+class VerifyCommand(AppCommand):
+    """Verify the integrity of deb packages."""
+
+    name = "verify"
+    help_msg = "Verify the file digests and installed size of deb packages"
+    overview = textwrap.dedent(
+        """
+        Verify the integrity of deb packages.
+
+        Each file in the package is checked against the digest recorded in the
+        md5sums file, and the Installed-Size control field is checked against
+        the size of the package contents. Packages are verified in parallel.
+        """
+    )
+
+    def fill_parser(self, parser: argparse.ArgumentParser) -> None:
+        """Add arguments specific to the verify command."""
+        parser.add_argument(
+            "debs", type=pathlib.Path, nargs="+", help="The deb packages to verify"
+        )
+        parser.add_argument(
+            "-j",
+            "--jobs",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="The number of packages to verify in parallel",
+        )
+
+    def run(self, parsed_args: argparse.Namespace) -> None:
+        """Run the verify command."""
+        debs: list[pathlib.Path] = parsed_args.debs
+        if parsed_args.jobs < 1:
+            raise ArgumentParsingError("--jobs must be a positive number")
+
+        failed = 0
+        # The packages verified in parallel share the hashing threads.
+        with (
+            ThreadPoolExecutor(max_workers=os.cpu_count()) as hasher,
+            ThreadPoolExecutor(max_workers=parsed_args.jobs) as executor,
+        ):
+            verify = functools.partial(_verify_deb, hasher=hasher)
+            for deb, problems in zip(debs, executor.map(verify, debs)):
+                if not problems:
+                    emit.message(f"{deb}: OK")
+                    continue
+
+                failed += 1
+                for problem in problems:
+                    emit.message(f"{deb}: {problem}")
+
+        if failed:
+            raise errors.DebcraftError(
+                f"{failed} of {len(debs)} packages failed verification"
+            )
+
+
+class IndexCommand(AppCommand):
+    """Update the package index of a flat APT repository."""
+
+    name = "index"
+    help_msg = "Update the APT package index of a directory of deb packages"
+    overview = textwrap.dedent(
+        """
+        Update the Packages, Packages.zst and Release files of a flat APT
+        repository.
+
+        If packages are given, they are added to the index. Otherwise the
+        index is synchronized with the packages in the repository directory:
+        only new or modified packages are read, and missing packages are
+        removed from the index.
+        """
+    )
+
+    def fill_parser(self, parser: argparse.ArgumentParser) -> None:
+        """Add arguments specific to the index command."""
+        parser.add_argument("repo", type=pathlib.Path, help="The repository directory")
+        parser.add_argument(
+            "debs",
+            type=pathlib.Path,
+            nargs="*",
+            help="The deb packages to add to the index",
+        )
+        parser.add_argument(
+            "-j",
+            "--jobs",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="The number of packages to read in parallel",
+        )
+
+    def run(self, parsed_args: argparse.Namespace) -> None:
+        """Run the index command."""
+        repo: pathlib.Path = parsed_args.repo
+        debs: list[pathlib.Path] = parsed_args.debs
+        if parsed_args.jobs < 1:
+            raise ArgumentParsingError("--jobs must be a positive number")
+        if not repo.is_dir():
+            raise errors.DebcraftError(f"{str(repo)!r} is not a directory")
+
+        try:
+            index = archive.PackageIndex(repo)
+            if debs:
+                index.add(debs, max_workers=parsed_args.jobs)
+            else:
+                debs = index.refresh(max_workers=parsed_args.jobs)
+            index.write(fsync=self._services.get("config").get("output_fsync"))
+        except OSError as err:
+            raise errors.DebcraftError(
+                f"cannot update package index: {err.strerror or err}"
+            ) from err
+
+        emit.message(f"Indexed {len(index)} packages ({len(debs)} updated)")
+
+
+class DeltaCommand(AppCommand):
+    """Create a binary delta between two versions of a deb package."""
+
+    name = "delta"
+    help_msg = "Create a delta to update a deb package to a newer version"
+    overview = textwrap.dedent(
+        """
+        Create a delta that reconstructs a deb package from a previous
+        version of the package.
+
+        Files with the same contents in both versions are copied from the
+        previous version, so the delta only contains what changed. Use the
+        apply-delta command to reconstruct the package.
+        """
+    )
+
+    def fill_parser(self, parser: argparse.ArgumentParser) -> None:
+        """Add arguments specific to the delta command."""
+        parser.add_argument(
+            "old", type=pathlib.Path, help="The previous version of the package"
+        )
+        parser.add_argument("new", type=pathlib.Path, help="The new package")
+        parser.add_argument(
+            "-o",
+            "--output",
+            type=pathlib.Path,
+            help="The delta file to write (default: the new package name "
+            "with a .delta suffix)",
+        )
+
+    def run(self, parsed_args: argparse.Namespace) -> None:
+        """Run the delta command."""
+        old: pathlib.Path = parsed_args.old
+        new: pathlib.Path = parsed_args.new
+        output: pathlib.Path = parsed_args.output or new.with_suffix(".delta")
+        fsync = self._services.get("config").get("output_fsync")
+
+        try:
+            archive.create_delta(old, new, output, fsync=fsync)
+        except OSError as err:
+            raise errors.DebcraftError(
+                f"cannot create delta: {err.strerror or err}"
+            ) from err
+
+        emit.message(
+            f"Created delta {output} ({output.stat().st_size} bytes, "
+            f"package is {new.stat().st_size} bytes)"
+        )
+
+
+class ApplyDeltaCommand(AppCommand):
+    """Reconstruct a deb package from a previous version and a delta."""
+
+    name = "apply-delta"
+    help_msg = "Reconstruct a deb package from a previous version and a delta"
+    overview = textwrap.dedent(
+        """
+        Reconstruct a deb package from a previous version of the package and
+        a delta created with the delta command.
+
+        The reconstructed package is verified to be identical to the package
+        the delta was created from.
+        """
+    )
+
+    def fill_parser(self, parser: argparse.ArgumentParser) -> None:
+        """Add arguments specific to the apply-delta command."""
+        parser.add_argument(
+            "old", type=pathlib.Path, help="The previous version of the package"
+        )
+        parser.add_argument("delta", type=pathlib.Path, help="The delta file")
+        parser.add_argument(
+            "-o",
+            "--output",
+            type=pathlib.Path,
+            help="The package file to write (default: the original package "
+            "name in the directory of the previous version)",
+        )
+
+    def run(self, parsed_args: argparse.Namespace) -> None:
+        """Run the apply-delta command."""
+        old: pathlib.Path = parsed_args.old
+        delta: pathlib.Path = parsed_args.delta
+        fsync = self._services.get("config").get("output_fsync")
+
+        try:
+            output: pathlib.Path = parsed_args.output
+            if output is None:
+                output = old.parent / archive.read_delta_header(delta)["name"]
+            archive.apply_delta(old, delta, output, fsync=fsync)
+        except OSError as err:
+            raise errors.DebcraftError(
+                f"cannot apply delta: {err.strerror or err}"
+            ) from err
+
+        emit.message(f"Created package {output}")
+
+
+class DiffCommand(AppCommand):
+    """Compare the contents of two builds of a package."""
+
+    name = "diff"
+    help_msg = "Show the differences between the contents of two packages"
+    overview = textwrap.dedent(
+        """
+        Show the files added, removed and changed between two builds of a
+        package, with their mode changes and size differences.
+
+        Each build can be a deb package or a prime directory. Packages are
+        read as a stream without extracting them, and file contents are
+        compared using the digests in the md5sums file when available.
+        """
+    )
+
+    def fill_parser(self, parser: argparse.ArgumentParser) -> None:
+        """Add arguments specific to the diff command."""
+        parser.add_argument(
+            "old", type=pathlib.Path, help="The previous package or prime directory"
+        )
+        parser.add_argument(
+            "new", type=pathlib.Path, help="The new package or prime directory"
+        )
+
+    def run(self, parsed_args: argparse.Namespace) -> None:
+        """Run the diff command."""
+        try:
+            old = archive.read_manifest(parsed_args.old)
+            new = archive.read_manifest(parsed_args.new)
+            changes = archive.diff_manifests(old, new)
+        except OSError as err:
+            raise errors.DebcraftError(
+                f"cannot compare packages: {err.strerror or err}"
+            ) from err
+
+        if not changes:
+            emit.message("No differences")
+            return
+
+        counts = dict.fromkeys(archive.ChangeKind, 0)
+        for change in changes:
+            counts[change.kind] += 1
+            emit.message(_format_change(change))
+
+        size_delta = sum(change.size_delta for change in changes)
+        emit.message(
+            f"{counts[archive.ChangeKind.ADDED]} added, "
+            f"{counts[archive.ChangeKind.REMOVED]} removed, "
+            f"{counts[archive.ChangeKind.CHANGED]} changed, "
+            f"size delta {size_delta:+d} bytes"
+        )
+
+
+def _verify_deb(deb: pathlib.Path, *, hasher: ThreadPoolExecutor) -> list[str]:
+    """Verify a deb package, reporting read errors as problems.
+
+    Corrupt packages are reported as a single problem, such as "corrupt data
+    tarball: ...".
+
+    :param deb: The package to verify.
+    :param hasher: The executor used for hashing.
+
+    :returns: A list of problems found, empty if the package is valid.
+    """
+    try:
+        with deb.open("rb") as f:
+            return archive.verify_deb(f, hasher=hasher)
+    except OSError as err:
+        return [f"cannot read package: {err.strerror or err}"]
+    except errors.DebcraftError as err:
+        return [str(err)]
+
+
+def _show_control_files(tar: tarfile.TarFile, names: list[str]) -> None:
+    """Show the given files from the control tarball, in the requested order.
+
+    :param tar: The control tarball.
+    :param names: The names of the control files to show.
+    """
+    # Control files are small, so all of them are read in case one of the
+    # requested files is a hard link to another.
+    contents: dict[str, str] = {}
+    for tarinfo in tar:
+        name = archive.normalize_path(tarinfo.name)
+        if tarinfo.islnk():
+            target = archive.normalize_path(tarinfo.linkname)
+            if target in contents:
+                contents[name] = contents[target]
+            continue
+
+        data = tar.extractfile(tarinfo) if tarinfo.isfile() else None
+        if data:
+            contents[name] = data.read().decode("utf-8", errors="replace")
+
+    for name in names:
+        if name not in contents:
+            emit.progress(f"Package has no {name} file", permanent=True)
+            continue
+        emit.message(contents[name].rstrip("\n"))
+
+
+def _extract(deb: pathlib.Path, path: str) -> None:
+    """Write the contents of a file in a package to standard output.
+
+    Hard links are resolved to the file they link to. Its contents come
+    earlier in the data tarball, so the package is read again to extract them.
+
+    :param deb: The deb package.
+    :param path: The path of the file to extract, relative to the root.
+    """
+    target = _extract_from_deb(deb, path)
+    if target is not None and _extract_from_deb(deb, target) is not None:
+        raise errors.DebcraftError(f"{path!r} is not a regular file")
+
+
+def _extract_from_deb(deb: pathlib.Path, path: str) -> str | None:
+    """Write the contents of a file in a package to standard output.
+
+    If the package file is seekable and its data tarball is a seekable zstd
+    stream, the file is located through the seek table. Otherwise the data
+    tarball is read as a stream.
+
+    :param deb: The deb package.
+    :param path: The path of the file to extract, relative to the root.
+
+    :returns: The target of the file if it is a hard link, which is not
+        extracted, or None.
+    """
+    with deb.open("rb") as f:
+        if f.seekable():
+            with archive.open_seekable_data_tarball(f) as tar:
+                if tar is not None:
+                    emit.debug("Locate file through the zstd seek table")
+                    return _extract_file(tar, path)
+            f.seek(0)
+
+        for kind, tar in archive.iter_deb_tarballs(f):
+            if kind == "data":
+                return _extract_file(tar, path)
+
+    raise errors.DebcraftError(f"file {path!r} not found in {deb.name}")
+
+
+def _extract_file(tar: tarfile.TarFile, path: str) -> str | None:
+    """Write the contents of a data tarball member to standard output.
+
+    :param tar: The data tarball.
+    :param path: The path of the file to extract, relative to the root.
+
+    :returns: The target of the member if it is a hard link, which is not
+        extracted, or None.
+    """
+    for tarinfo in tar:
+        if archive.normalize_path(tarinfo.name) != path:
+            continue
+
+        if tarinfo.islnk():
+            return archive.normalize_path(tarinfo.linkname)
+
+        data = tar.extractfile(tarinfo) if tarinfo.isfile() else None
+        if data is None:
+            raise errors.DebcraftError(f"{path!r} is not a regular file")
+
+        shutil.copyfileobj(data, sys.stdout.buffer, _COPY_BUFSIZE)
+        sys.stdout.buffer.flush()
+        return None
+
+    raise errors.DebcraftError(f"file {path!r} not found in package")
+
+
+def _format_member(tarinfo: tarfile.TarInfo) -> str:
+    """Format a tarball member in the style of ``tar --verbose --list``.
+
+    :param tarinfo: The member to format.
+
+    :returns: A line describing the member.
+    """
+    file_type = _FILE_TYPES.get(tarinfo.type, stat.S_IFREG)
+    owner = f"{tarinfo.uname or tarinfo.uid}/{tarinfo.gname or tarinfo.gid}"
+    line = f"{stat.filemode(tarinfo.mode | file_type)} {owner} "
+    line += f"{tarinfo.size:>10} {archive.normalize_path(tarinfo.name) or '.'}"
+    if tarinfo.issym():
+        line += f" -> {tarinfo.linkname}"
+    elif tarinfo.islnk():
+        line += f" link to {tarinfo.linkname}"
+    return line
+
+
+def _format_change(change: archive.Change) -> str:
+    """Format a change for the diff command output.
+
+    :param change: The change to format.
+
+    :returns: A line describing the change.
+    """
+    if change.kind == archive.ChangeKind.ADDED:
+        line = f"+ {change.path}"
+    elif change.kind == archive.ChangeKind.REMOVED:
+        line = f"- {change.path}"
+    else:
+        line = f"~ {change.path}: {', '.join(change.describe())}"
+
+    if change.size_delta:
+        line += f" ({change.size_delta:+d} bytes)"
+    return line
@@ -16,9 +16,10 @@
 
 """Debian control file encoder."""
 
-from typing import TextIO
+from collections.abc import Mapping
+from typing import Any, TextIO
 
-from debcraft import models
+from debcraft import errors, models
 
 
 class Encoder:
@@ -33,24 +34,78 @@ class Encoder:
         :param model: The binary package control model to encode.
         """
         for name, field in model.__class__.model_fields.items():
-            value = getattr(model, name)
-            if value is None:
-                continue
+            self.encode_field(field.alias or name, getattr(model, name))
 
-            key = field.alias or name
+    def encode_fields(self, fields: Mapping[str, Any]) -> None:
+        """Encode a stanza from a mapping of field names to values.
 
-            match value:
-                case str() if "\n" in value:
-                    lines = value.splitlines()
+        :param fields: The fields to encode, in order.
+        """
+        for key, value in fields.items():
+            self.encode_field(key, value)
+
+    def encode_field(self, key: str, value: Any) -> None:  # noqa: ANN401
+        """Encode a single field.
+
+        Multi-line strings are written as continuation lines, with empty
+        lines encoded as a single dot, and lists are comma-separated.
+
+        :param key: The field name.
+        :param value: The field value. Fields set to None are not written.
+        """
+        match value:
+            case None:
+                pass
+            case str() if "\n" in value:
+                lines = value.splitlines()
+                if lines[0]:
                     self._file.write(f"{key}: {lines[0]}\n")
-                    for line in lines[1:]:
-                        if line.strip() == "":
-                            self._file.write(" .\n")
-                        else:
-                            self._file.write(f" {line}\n")
-                case list():
-                    line = ", ".join(map(str, value))
-                    if line.strip():
-                        self._file.write(f"{key}: {line}\n")
-                case _:
-                    self._file.write(f"{key}: {value}\n")
+                else:
+                    self._file.write(f"{key}:\n")
+                for line in lines[1:]:
+                    if line.strip() == "":
+                        self._file.write(" .\n")
+                    else:
+                        self._file.write(f" {line}\n")
+            case list():
+                line = ", ".join(map(str, value))
+                if line.strip():
+                    self._file.write(f"{key}: {line}\n")
+            case _:
+                self._file.write(f"{key}: {value}\n")
+
+
+def parse_fields(text: str) -> dict[str, str]:
+    """Parse a control file stanza into a mapping of field names to values.
+
+    This is the inverse of :meth:`Encoder.encode_field` for string values:
+    continuation lines are joined with newlines, and lines containing a
+    single dot are decoded as empty lines.
+
+    :param text: The stanza to parse.
+
+    :returns: The field values, in the order of the stanza.
+    """
+    fields: dict[str, str] = {}
+    key = None
+
+    for line in text.splitlines():
+        if not line.strip() and not line.startswith((" ", "\t")):
+            continue
+        if line.startswith("#"):
+            continue
+
+        if line.startswith((" ", "\t")):
+            if key is None:
+                raise errors.DebcraftError(f"invalid control data: {line!r}")
+            content = line[1:]
+            fields[key] += "\n" + ("" if content == "." else content)
+            continue
+
+        key, sep, value = line.partition(":")
+        if not sep:
+            raise errors.DebcraftError(f"invalid control data: {line!r}")
+        key = key.strip()
+        fields[key] = value.strip()
+
+    return fields
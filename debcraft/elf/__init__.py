@@ -16,11 +16,18 @@
 #
 """ELF file handling."""
 
+from .elf_cache import ElfCache
 from .elf_file import ElfFile, ElfLibrary
-from .elf_utils import get_elf_files
+from .elf_index import ElfIndex
+from .elf_utils import get_elf_files, iter_elf_files
+from .strip_cache import StripCache
 
 __all__ = [
+    "ElfCache",
     "ElfFile",
+    "ElfIndex",
     "ElfLibrary",
+    "StripCache",
     "get_elf_files",
+    "iter_elf_files",
 ]
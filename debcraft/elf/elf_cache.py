@@ -0,0 +1,168 @@
+#  This file is part of debcraft.
+#
+#  Copyright 2026 Canonical Ltd.
+#
+#  This program is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranties of MERCHANTABILITY,
+#  SATISFACTORY QUALITY, or FITNESS FOR A PARTICULAR PURPOSE.
+#  See the GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along
+#  with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Persistent cache of ELF file analyses."""
+
+import json
+import os
+import pathlib
+import sqlite3
+
+from craft_cli import emit
+from typing_extensions import Self
+
+from .elf_file import ElfFile, ElfLibrary
+
+# Increase when the cached data format or the analysis results change.
+SCHEMA_VERSION = 4
+
+_CREATE_TABLE = """
+CREATE TABLE IF NOT EXISTS elf_files (
+    dev INTEGER NOT NULL,
+    ino INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (dev, ino, size, mtime_ns)
+)
+"""
+
+
+class ElfCache:
+    """A cache of ELF file analyses stored in a SQLite database.
+
+    Entries are keyed by the file identity (device, inode, size and
+    modification time), so files that were not changed since the previous
+    build are not parsed again. The cache is discarded when its schema
+    version does not match.
+
+    :param path: The cache database file.
+    """
+
+    def __init__(self, path: pathlib.Path) -> None:
+        self._path = path
+        self._conn = self._connect()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def get(self, path: pathlib.Path, stat: os.stat_result) -> ElfFile | None:
+        """Obtain the cached analysis of an ELF file.
+
+        :param path: The path of the ELF file.
+        :param stat: The status of the ELF file.
+
+        :return: The cached ElfFile, or None if the file is not in the cache.
+        """
+        row = self._conn.execute(
+            "SELECT data FROM elf_files "
+            "WHERE dev = ? AND ino = ? AND size = ? AND mtime_ns = ?",
+            _get_key(stat),
+        ).fetchone()
+        if row is None:
+            return None
+
+        data = json.loads(row[0])
+        return ElfFile(
+            path=path,
+            is_dynamic=data["is_dynamic"],
+            libname=data["libname"],
+            ver=data["ver"],
+            arch=data["arch"],
+            needed=[ElfLibrary.from_name(name) for name in data["needed"]],
+            undefined_symbols=frozenset(data["undefined_symbols"]),
+            symbol_libraries=data["symbol_libraries"],
+            strippable=data["strippable"],
+            build_id=data["build_id"],
+        )
+
+    def put(self, elf_file: ElfFile, stat: os.stat_result) -> None:
+        """Add the analysis of an ELF file to the cache.
+
+        :param elf_file: The analyzed ELF file.
+        :param stat: The status of the ELF file when it was analyzed.
+        """
+        data = {
+            "is_dynamic": elf_file.is_dynamic,
+            "libname": elf_file.libname,
+            "ver": elf_file.ver,
+            "arch": elf_file.arch,
+            "needed": [lib.soname for lib in elf_file.needed],
+            "undefined_symbols": sorted(elf_file.undefined_symbols),
+            "symbol_libraries": elf_file.symbol_libraries,
+            "strippable": elf_file.strippable,
+            "build_id": elf_file.build_id,
+        }
+        self._conn.execute(
+            "INSERT OR REPLACE INTO elf_files VALUES (?, ?, ?, ?, ?)",
+            (*_get_key(stat), json.dumps(data)),
+        )
+
+    def commit(self) -> None:
+        """Write the added entries to the database."""
+        self._conn.commit()
+
+    def close(self) -> None:
+        """Write the added entries and close the database."""
+        self._conn.commit()
+        self._conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the cache database, recreating it if it is invalid or outdated.
+
+        :return: The database connection.
+        """
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            return self._open()
+        except sqlite3.DatabaseError as err:
+            emit.debug(f"Recreate invalid ELF cache {str(self._path)!r}: {err}")
+            self._path.unlink(missing_ok=True)
+            return self._open()
+
+    def _open(self) -> sqlite3.Connection:
+        """Open the cache database and check its schema version.
+
+        :return: The database connection.
+        """
+        conn = sqlite3.connect(self._path)
+        try:
+            # The cache can be rebuilt, so durability is not needed.
+            conn.execute("PRAGMA synchronous = OFF")
+            (version,) = conn.execute("PRAGMA user_version").fetchone()
+            if version != SCHEMA_VERSION:
+                emit.debug(f"Discard ELF cache with schema version {version}")
+                conn.execute("DROP TABLE IF EXISTS elf_files")
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.execute(_CREATE_TABLE)
+            conn.commit()
+        except sqlite3.DatabaseError:
+            conn.close()
+            raise
+        return conn
+
+
+def _get_key(stat: os.stat_result) -> tuple[int, int, int, int]:
+    """Obtain the cache key of a file.
+
+    :param stat: The status of the file.
+
+    :return: The device, inode, size and modification time of the file.
+    """
+    return (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
@@ -17,17 +17,20 @@
 """Helpers to parse and handle ELF binary files."""
 
 import pathlib
-import subprocess
-from dataclasses import dataclass, field
+import sys
+from collections.abc import Callable
+from dataclasses import dataclass, field, fields
 
 from elftools.common.exceptions import ELFError
-from elftools.elf import dynamic, elffile
+from elftools.elf import dynamic, elffile, gnuversions, sections, segments
 from typing_extensions import Self
 
 from debcraft import errors
 
+from . import elf_reader
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class ElfLibrary:
     """Representation of an ELF dynamic library."""
 
@@ -39,20 +42,43 @@ class ElfLibrary:
     def from_name(cls, name: str) -> Self:
         """Create a ElfLibrary instance from a shared library name.
 
+        Instances are shared between all the ELF files needing the same
+        library.
+
         :param name: The shared library name.
 
-        :return: A newly created ElfLibrary instance.
+        :return: An ElfLibrary instance.
         """
+        library = _LIBRARIES.get(name)
+        if isinstance(library, cls):
+            return library
+
+        name = sys.intern(name)
         if ".so." not in name:
-            return cls(soname=name, libname=name, ver="")
+            library = cls(soname=name, libname=name, ver="")
+        else:
+            libname, ver = name.split(".so.", maxsplit=1)
+            library = cls(soname=name, libname=sys.intern(libname), ver=sys.intern(ver))
+
+        _LIBRARIES[name] = library
+        return library
+
+    def __reduce__(self) -> tuple[Callable[[str], "ElfLibrary"], tuple[str]]:
+        # Share the instances unpickled from worker processes.
+        return ElfLibrary.from_name, (self.soname,)
 
-        libname, ver = name.split(".so.", maxsplit=1)
-        return cls(soname=name, libname=libname, ver=ver)
 
+# The libraries created by name, shared between ELF files.
+_LIBRARIES: dict[str, ElfLibrary] = {}
 
-@dataclass
+
+@dataclass(slots=True)
 class ElfFile:
-    """ELF files."""
+    """ELF files.
+
+    Symbol names and sonames are interned, so that the strings used by many
+    ELF files are only stored once.
+    """
 
     path: pathlib.Path
     is_dynamic: bool = False
@@ -60,6 +86,21 @@ class ElfFile:
     ver: str = ""
     arch: str = ""
     needed: list[ElfLibrary] = field(default_factory=list)
+    undefined_symbols: frozenset[str] = frozenset()
+    symbol_libraries: dict[str, str] = field(default_factory=dict)
+    strippable: bool = True
+    build_id: str = ""
+
+    def __post_init__(self) -> None:
+        self.undefined_symbols = frozenset(map(sys.intern, self.undefined_symbols))
+        self.symbol_libraries = {
+            sys.intern(symbol): sys.intern(soname)
+            for symbol, soname in self.symbol_libraries.items()
+        }
+
+    def __reduce__(self) -> tuple[type[Self], tuple[object, ...]]:
+        # Intern the strings of ELF files unpickled from worker processes.
+        return type(self), tuple(getattr(self, f.name) for f in fields(self))
 
     @classmethod
     def is_elf(cls, path: pathlib.Path) -> bool:
@@ -78,6 +119,54 @@ class ElfFile:
     def from_path(cls, path: pathlib.Path) -> Self:
         """Represent the given file as an ElfFile.
 
+        The file is read with a lightweight reader, and only parsed with
+        pyelftools if its layout is not supported by the reader.
+
+        :param path: The path of the file to represent.
+
+        :return: A newly created ElfFile instance.
+        """
+        try:
+            info = elf_reader.read_elf_info(path)
+        except elf_reader.UnsupportedLayoutError:
+            return cls._from_elftools(path)
+
+        arch = _ELF_ARCH_MAP.get((info.machine, info.ei_class, info.ei_data), "unknown")
+        if not info.is_dynamic:
+            return cls(
+                path=path,
+                arch=arch,
+                strippable=info.strippable,
+                build_id=info.build_id,
+            )
+
+        libname = ver = ""
+        if info.soname is not None:
+            elf_lib = ElfLibrary.from_name(info.soname)
+            libname = elf_lib.libname
+            ver = elf_lib.ver
+
+        return cls(
+            path=path,
+            is_dynamic=True,
+            libname=libname,
+            ver=ver,
+            arch=arch,
+            needed=[
+                ElfLibrary.from_name(needed)
+                for needed in info.needed
+                if ".so." in needed
+            ],
+            undefined_symbols=info.undefined_symbols,
+            symbol_libraries=info.symbol_libraries,
+            strippable=info.strippable,
+            build_id=info.build_id,
+        )
+
+    @classmethod
+    def _from_elftools(cls, path: pathlib.Path) -> Self:
+        """Represent the given file as an ElfFile, parsing it with pyelftools.
+
         :param path: The path of the file to represent.
 
         :return: A newly created ElfFile instance.
@@ -88,38 +177,61 @@ class ElfFile:
             except ELFError as err:
                 raise errors.DebcraftError(f"cannot load ELF file: {err}")
 
-            elf_data = cls(path=path)
-            elf_data.arch = _get_elf_debian_arch(elf_file)
+            arch = _get_elf_debian_arch(elf_file)
 
             dynamic_section = None
+            strippable = False
             for section in elf_file.iter_sections():
                 if isinstance(section, dynamic.DynamicSection):
                     dynamic_section = section
-                    break
+                strippable |= section["sh_type"] == "SHT_SYMTAB" or (
+                    section.name.startswith(_DEBUG_SECTION_PREFIXES)
+                )
 
+            build_id = _read_build_id(elf_file)
             if not dynamic_section:
-                return elf_data
+                return cls(
+                    path=path, arch=arch, strippable=strippable, build_id=build_id
+                )
 
-            elf_data.is_dynamic = True
+            undefined_symbols, symbol_libraries = _read_undefined_symbols(elf_file)
+
+            libname = ver = ""
+            needed_libs = []
             for tag in dynamic_section.iter_tags():
                 if tag.entry.d_tag == "DT_NEEDED":
                     needed = tag.needed
                     if ".so." in needed:
-                        elf_data.needed.append(ElfLibrary.from_name(needed))
+                        needed_libs.append(ElfLibrary.from_name(needed))
                 elif tag.entry.d_tag == "DT_SONAME":
                     soname = tag.soname
                     elf_lib = ElfLibrary.from_name(soname)
-                    elf_data.libname = elf_lib.libname
-                    elf_data.ver = elf_lib.ver
-
-        return elf_data
+                    libname = elf_lib.libname
+                    ver = elf_lib.ver
+
+        return cls(
+            path=path,
+            is_dynamic=True,
+            libname=libname,
+            ver=ver,
+            arch=arch,
+            needed=needed_libs,
+            undefined_symbols=undefined_symbols,
+            symbol_libraries=symbol_libraries,
+            strippable=strippable,
+            build_id=build_id,
+        )
 
-    def read_symbols(self) -> set[str]:
+    def read_symbols(self) -> frozenset[str]:
         """Read undefined symbols from this ELF file.
 
-        :return: A set of undefined symbol names.
+        The symbols are read from the dynamic symbol table when the file is
+        loaded, so no additional file access is needed.
+
+        :return: A set of undefined symbol names, with the required symbol
+            version appended as ``name@VERSION`` when present.
         """
-        return _read_undefined_symbols(self.path)
+        return self.undefined_symbols
 
 
 _ELF_ARCH_MAP = {
@@ -136,6 +248,13 @@ _ELF_ARCH_MAP = {
 }
 
 
+# The high bit of a version index marks hidden symbols.
+_VERSYM_INDEX_MASK = 0x7FFF
+
+# The sections removed by strip, besides the symbol table.
+_DEBUG_SECTION_PREFIXES = (".debug", ".zdebug")
+
+
 def _get_elf_debian_arch(elf_file: elffile.ELFFile) -> str:
     machine = elf_file.header["e_machine"]
     ei_class = elf_file.header["e_ident"]["EI_CLASS"]
@@ -144,24 +263,93 @@ def _get_elf_debian_arch(elf_file: elffile.ELFFile) -> str:
     return _ELF_ARCH_MAP.get((machine, ei_class, ei_data), "unknown")
 
 
-def _read_undefined_symbols(path: pathlib.Path) -> set[str]:
-    symbols = set()
+def _read_build_id(elf_file: elffile.ELFFile) -> str:
+    """Read the GNU build ID of an ELF file.
 
-    try:
-        res = subprocess.run(
-            ["nm", "-uD", path], capture_output=True, text=True, check=True
-        )
-    except subprocess.CalledProcessError as err:
-        raise errors.DebcraftError(f"error running nm on {path}: {err.stderr}")
-    except FileNotFoundError:
-        raise errors.DebcraftError(
-            "required tool 'nm' not found on PATH; install the 'binutils' package"
-        )
+    :param elf_file: The parsed ELF file.
 
-    for line in res.stdout.splitlines():
-        parts = line.strip().split()
-        if not parts or parts[0] != "U":
+    :return: The build ID as a hexadecimal string, or an empty string if the
+        file has no build ID.
+    """
+    for segment in elf_file.iter_segments():
+        if not isinstance(segment, segments.NoteSegment):
             continue
-        symbols.add(parts[-1])
+        for note in segment.iter_notes():
+            if note["n_type"] == "NT_GNU_BUILD_ID" and note["n_name"] == "GNU":
+                return note["n_desc"]
+    return ""
+
+
+def _read_undefined_symbols(
+    elf_file: elffile.ELFFile,
+) -> tuple[set[str], dict[str, str]]:
+    """Read the undefined dynamic symbols of an ELF file.
+
+    Like ``nm -uD``, weak undefined symbols are not included.
+
+    :param elf_file: The parsed ELF file.
+
+    :return: A set of undefined symbol names, with the required symbol
+        version appended as ``name@VERSION`` when present, and the sonames
+        of the libraries providing the versioned symbols.
+    """
+    dynsym = None
+    versym = None
+    verneed = None
+    for section in elf_file.iter_sections():
+        if section["sh_type"] == "SHT_DYNSYM":
+            dynsym = section
+        elif isinstance(section, gnuversions.GNUVerSymSection):
+            versym = section
+        elif isinstance(section, gnuversions.GNUVerNeedSection):
+            verneed = section
+
+    if not isinstance(dynsym, sections.SymbolTableSection):
+        return set(), {}
+
+    requirements = _read_version_requirements(verneed)
+    symbols = set()
+    libraries = {}
+
+    for index, symbol in enumerate(dynsym.iter_symbols()):
+        if (
+            not symbol.name
+            or symbol["st_shndx"] != "SHN_UNDEF"
+            or symbol["st_info"]["bind"] == "STB_WEAK"
+        ):
+            continue
+
+        requirement = None
+        if versym is not None and requirements:
+            ndx = versym.get_symbol(index)["ndx"]
+            if isinstance(ndx, int):
+                requirement = requirements.get(ndx & _VERSYM_INDEX_MASK)
+
+        if requirement is None:
+            symbols.add(symbol.name)
+        else:
+            version, library = requirement
+            symbols.add(f"{symbol.name}@{version}")
+            libraries[f"{symbol.name}@{version}"] = library
+
+    return symbols, libraries
+
+
+def _read_version_requirements(
+    verneed: gnuversions.GNUVerNeedSection | None,
+) -> dict[int, tuple[str, str]]:
+    """Map version indexes to the required symbol versions.
+
+    :param verneed: The ``.gnu.version_r`` section, if present.
+
+    :return: A map of version indexes to the version names and the sonames
+        of the libraries defining them.
+    """
+    if verneed is None:
+        return {}
 
-    return symbols
+    return {
+        aux["vna_other"]: (aux.name, library.name)
+        for library, auxiliaries in verneed.iter_versions()
+        for aux in auxiliaries
+    }
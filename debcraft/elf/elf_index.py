@@ -0,0 +1,163 @@
+#  This file is part of debcraft.
+#
+#  Copyright 2026 Canonical Ltd.
+#
+#  This program is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranties of MERCHANTABILITY,
+#  SATISFACTORY QUALITY, or FITNESS FOR A PARTICULAR PURPOSE.
+#  See the GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along
+#  with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Build-scoped index of ELF file analyses."""
+
+import dataclasses
+import hashlib
+import os
+import pathlib
+
+from .elf_cache import ElfCache
+from .elf_file import ElfFile
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclasses.dataclass
+class _Entry:
+    """An analyzed file and its status when it was analyzed."""
+
+    path: pathlib.Path
+    stat: os.stat_result
+    elf_file: ElfFile
+    digest: str | None = None
+
+
+class ElfIndex:
+    """An index of the ELF files analyzed during a build, by content identity.
+
+    Files are identified by their device and inode, so hard links to an
+    analyzed file, such as the primed copies of installed files, are found
+    without reading them. Copies of an analyzed file that kept its size and
+    modification time are found by comparing their contents. Files not in
+    the index are looked up in the persistent cache, if any.
+
+    :param cache: The persistent cache of ELF file analyses.
+    """
+
+    def __init__(self, cache: ElfCache | None = None) -> None:
+        self._cache = cache
+        self._by_inode: dict[tuple[int, int], _Entry] = {}
+        self._by_metadata: dict[tuple[int, int], list[_Entry]] = {}
+
+    def get(self, path: pathlib.Path, stat: os.stat_result) -> ElfFile | None:
+        """Obtain the analysis of an ELF file with the same contents.
+
+        :param path: The path of the ELF file.
+        :param stat: The status of the ELF file.
+
+        :return: The ElfFile for the given path, or None if no file with the
+            same contents was analyzed.
+        """
+        entry = self._by_inode.get((stat.st_dev, stat.st_ino))
+        if entry is None or not _same_metadata(entry.stat, stat):
+            entry = self._find_copy(path, stat)
+
+        if entry is not None:
+            return dataclasses.replace(entry.elf_file, path=path)
+
+        elf_file = self._cache.get(path, stat) if self._cache else None
+        if elf_file is not None:
+            self._add(elf_file, stat)
+        return elf_file
+
+    def put(self, elf_file: ElfFile, stat: os.stat_result) -> None:
+        """Record the analysis of an ELF file.
+
+        :param elf_file: The analyzed ELF file.
+        :param stat: The status of the ELF file when it was analyzed.
+        """
+        self._add(elf_file, stat)
+        if self._cache:
+            self._cache.put(elf_file, stat)
+
+    def commit(self) -> None:
+        """Write the recorded analyses to the persistent cache."""
+        if self._cache:
+            self._cache.commit()
+
+    def close(self) -> None:
+        """Close the persistent cache."""
+        if self._cache:
+            self._cache.close()
+            self._cache = None
+
+    def _add(self, elf_file: ElfFile, stat: os.stat_result) -> None:
+        """Add an analysis to the in-memory index.
+
+        :param elf_file: The analyzed ELF file.
+        :param stat: The status of the ELF file when it was analyzed.
+        """
+        entry = _Entry(elf_file.path, stat, elf_file)
+        self._by_inode[(stat.st_dev, stat.st_ino)] = entry
+        self._by_metadata.setdefault((stat.st_size, stat.st_mtime_ns), []).append(entry)
+
+    def _find_copy(self, path: pathlib.Path, stat: os.stat_result) -> _Entry | None:
+        """Find an analyzed file with the same contents as the given file.
+
+        :param path: The path of the file.
+        :param stat: The status of the file.
+
+        :return: The entry of the analyzed file, or None if not found.
+        """
+        candidates = self._by_metadata.get((stat.st_size, stat.st_mtime_ns))
+        if not candidates:
+            return None
+
+        digest = _digest(path)
+        for entry in candidates:
+            # The analyzed file may have been changed or removed since.
+            try:
+                if not _same_metadata(entry.stat, entry.path.stat()):
+                    continue
+            except OSError:
+                continue
+
+            if entry.digest is None:
+                entry.digest = _digest(entry.path)
+            if entry.digest == digest:
+                self._by_inode[(stat.st_dev, stat.st_ino)] = _Entry(
+                    path, stat, entry.elf_file, digest
+                )
+                return entry
+
+        return None
+
+
+def _same_metadata(old: os.stat_result, new: os.stat_result) -> bool:
+    """Check whether the size and modification time of a file are unchanged.
+
+    :param old: The previous status of the file.
+    :param new: The current status of the file.
+
+    :return: Whether the size and modification time match.
+    """
+    return (old.st_size, old.st_mtime_ns) == (new.st_size, new.st_mtime_ns)
+
+
+def _digest(path: pathlib.Path) -> str:
+    """Compute the digest of the contents of a file.
+
+    :param path: The file to hash.
+
+    :return: The hexadecimal SHA-256 digest.
+    """
+    sha256 = hashlib.sha256()
+    with path.open("rb") as f:
+        while chunk := f.read(_HASH_CHUNK_SIZE):
+            sha256.update(chunk)
+    return sha256.hexdigest()
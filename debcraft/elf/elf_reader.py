@@ -0,0 +1,516 @@
+#  This file is part of debcraft.
+#
+#  Copyright 2026 Canonical Ltd.
+#
+#  This program is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranties of MERCHANTABILITY,
+#  SATISFACTORY QUALITY, or FITNESS FOR A PARTICULAR PURPOSE.
+#  See the GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along
+#  with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Lightweight reader for the dynamic linking information of ELF files.
+
+The reader maps the file in memory and only decodes the structures needed to
+obtain the architecture, the dynamic section tags and the undefined dynamic
+symbols, which is much faster than a complete parse with pyelftools. Files
+with unusual layouts are not handled and must be parsed with pyelftools.
+"""
+
+import dataclasses
+import mmap
+import pathlib
+import struct
+
+from elftools.elf.enums import ENUM_E_MACHINE
+
+_ELF_MAGIC = b"\x7fELF"
+
+_ELFCLASS = {1: "ELFCLASS32", 2: "ELFCLASS64"}
+_ELFDATA = {1: ("ELFDATA2LSB", "<"), 2: ("ELFDATA2MSB", ">")}
+_E_MACHINE = {value: name for name, value in ENUM_E_MACHINE.items()}
+
+_ET_EXEC = 2
+_ET_DYN = 3
+_PT_LOAD = 1
+_PT_DYNAMIC = 2
+_PT_NOTE = 4
+_DT_NULL = 0
+_DT_NEEDED = 1
+_DT_STRTAB = 5
+_DT_STRSZ = 10
+_DT_SONAME = 14
+_SHT_SYMTAB = 2
+_SHT_DYNSYM = 11
+_SHT_GNU_VERNEED = 0x6FFFFFFE
+_SHT_GNU_VERSYM = 0x6FFFFFFF
+_SHN_UNDEF = 0
+_STB_WEAK = 2
+_VERSYM_INDEX_MASK = 0x7FFF
+_DEBUG_SECTION_PREFIXES = (".debug", ".zdebug")
+_NT_GNU_BUILD_ID = 3
+_NOTE_HEADER = {"<": struct.Struct("<III"), ">": struct.Struct(">III")}
+
+
+class UnsupportedLayoutError(Exception):
+    """The ELF file layout is not supported by the lightweight reader."""
+
+
+@dataclasses.dataclass(frozen=True)
+class ElfInfo:
+    """Dynamic linking information of an ELF file."""
+
+    machine: str
+    """The ELF machine, such as ``EM_X86_64``."""
+
+    ei_class: str
+    """The ELF class, such as ``ELFCLASS64``."""
+
+    ei_data: str
+    """The ELF data encoding, such as ``ELFDATA2LSB``."""
+
+    is_dynamic: bool
+    """Whether the file has a dynamic section."""
+
+    soname: str | None
+    """The value of the DT_SONAME tag, if present."""
+
+    needed: list[str]
+    """The values of the DT_NEEDED tags."""
+
+    undefined_symbols: set[str]
+    """The undefined non-weak dynamic symbols, as ``name@VERSION``."""
+
+    symbol_libraries: dict[str, str]
+    """The sonames of the libraries providing the versioned undefined symbols."""
+
+    strippable: bool
+    """Whether the file has a symbol table or debug sections."""
+
+    build_id: str
+    """The GNU build ID as a hexadecimal string, or empty if not present."""
+
+
+@dataclasses.dataclass(frozen=True)
+class _Layout:
+    """The binary layout of the ELF structures for a class and data encoding."""
+
+    header: struct.Struct
+    phdr: struct.Struct
+    shdr: struct.Struct
+    dyn: struct.Struct
+    sym: struct.Struct
+    versym: struct.Struct
+    verneed: struct.Struct
+    vernaux: struct.Struct
+    is_64: bool
+
+
+def _make_layout(ei_class: int, endian: str) -> _Layout:
+    is_64 = ei_class == 2  # noqa: PLR2004
+    if is_64:
+        return _Layout(
+            header=struct.Struct(endian + "HHIQQQIHHHHHH"),
+            phdr=struct.Struct(endian + "IIQQQQQQ"),
+            shdr=struct.Struct(endian + "IIQQQQIIQQ"),
+            dyn=struct.Struct(endian + "qQ"),
+            sym=struct.Struct(endian + "IBBHQQ"),
+            versym=struct.Struct(endian + "H"),
+            verneed=struct.Struct(endian + "HHIII"),
+            vernaux=struct.Struct(endian + "IHHII"),
+            is_64=True,
+        )
+    return _Layout(
+        header=struct.Struct(endian + "HHIIIIIHHHHHH"),
+        phdr=struct.Struct(endian + "IIIIIIII"),
+        shdr=struct.Struct(endian + "IIIIIIIIII"),
+        dyn=struct.Struct(endian + "iI"),
+        sym=struct.Struct(endian + "IIIBBH"),
+        versym=struct.Struct(endian + "H"),
+        verneed=struct.Struct(endian + "HHIII"),
+        vernaux=struct.Struct(endian + "IHHII"),
+        is_64=False,
+    )
+
+
+_LAYOUTS = {
+    (ei_class, ei_data): _make_layout(ei_class, endian)
+    for ei_class in _ELFCLASS
+    for ei_data, (_, endian) in _ELFDATA.items()
+}
+
+
+def read_elf_info(path: pathlib.Path) -> ElfInfo:
+    """Read the dynamic linking information of an ELF file.
+
+    :param path: The ELF file.
+
+    :return: The dynamic linking information.
+
+    :raises UnsupportedLayoutError: If the file is not an ELF executable or
+        shared object with a regular layout.
+    """
+    with path.open("rb") as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError) as err:
+            # Empty files cannot be mapped.
+            raise UnsupportedLayoutError(str(err)) from err
+
+    with data:
+        try:
+            return _ElfReader(data).read()
+        except (struct.error, IndexError, KeyError, UnicodeDecodeError) as err:
+            raise UnsupportedLayoutError(str(err)) from err
+
+
+class _ElfReader:
+    """Decode the dynamic linking information of a mapped ELF file."""
+
+    def __init__(self, data: mmap.mmap) -> None:
+        self._data = data
+        if data[:4] != _ELF_MAGIC:
+            raise UnsupportedLayoutError("not an ELF file")
+
+        self._class = data[4]
+        self._encoding = data[5]
+        self._layout = _LAYOUTS[(self._class, self._encoding)]
+        (
+            self._type,
+            self._machine,
+            _,  # e_version
+            _,  # e_entry
+            self._phoff,
+            self._shoff,
+            _,  # e_flags
+            _,  # e_ehsize
+            self._phentsize,
+            self._phnum,
+            self._shentsize,
+            self._shnum,
+            self._shstrndx,
+        ) = self._layout.header.unpack_from(data, 16)
+
+    def read(self) -> ElfInfo:
+        """Read the dynamic linking information.
+
+        :return: The dynamic linking information.
+        """
+        if self._type not in (_ET_EXEC, _ET_DYN):
+            raise UnsupportedLayoutError(f"unsupported ELF type {self._type}")
+
+        info = {
+            "machine": _E_MACHINE.get(self._machine, str(self._machine)),
+            "ei_class": _ELFCLASS[self._class],
+            "ei_data": _ELFDATA[self._encoding][0],
+        }
+
+        loads, dynamic, notes = self._read_program_headers()
+        build_id = self._read_build_id(notes)
+        sections = self._read_section_headers() if self._shnum else []
+        strippable = self._is_strippable(sections)
+        if dynamic is None:
+            return ElfInfo(
+                **info,
+                is_dynamic=False,
+                soname=None,
+                needed=[],
+                undefined_symbols=set(),
+                symbol_libraries={},
+                strippable=strippable,
+                build_id=build_id,
+            )
+
+        if not sections:
+            raise UnsupportedLayoutError("no section headers")
+
+        soname, needed = self._read_dynamic(dynamic, loads)
+        undefined_symbols, symbol_libraries = self._read_undefined_symbols(sections)
+        return ElfInfo(
+            **info,
+            is_dynamic=True,
+            soname=soname,
+            needed=needed,
+            undefined_symbols=undefined_symbols,
+            symbol_libraries=symbol_libraries,
+            strippable=strippable,
+            build_id=build_id,
+        )
+
+    def _read_program_headers(
+        self,
+    ) -> tuple[
+        list[tuple[int, int, int]], tuple[int, int] | None, list[tuple[int, int, int]]
+    ]:
+        """Read the loadable segments, the dynamic segment and the note segments.
+
+        :return: The offset, address and file size of the loadable segments,
+            the offset and size of the dynamic segment if present, and the
+            offset, size and alignment of the note segments.
+        """
+        loads = []
+        dynamic = None
+        notes = []
+        for i in range(self._phnum):
+            fields = self._layout.phdr.unpack_from(
+                self._data, self._phoff + i * self._phentsize
+            )
+            if self._layout.is_64:
+                p_type, _, p_offset, p_vaddr, _, p_filesz, _, p_align = fields
+            else:
+                p_type, p_offset, p_vaddr, _, p_filesz, _, _, p_align = fields
+
+            if p_type == _PT_LOAD:
+                loads.append((p_offset, p_vaddr, p_filesz))
+            elif p_type == _PT_DYNAMIC:
+                dynamic = (p_offset, p_filesz)
+            elif p_type == _PT_NOTE:
+                notes.append((p_offset, p_filesz, p_align))
+
+        return loads, dynamic, notes
+
+    def _read_build_id(self, notes: list[tuple[int, int, int]]) -> str:
+        """Read the GNU build ID from the note segments.
+
+        :param notes: The offset, size and alignment of the note segments.
+
+        :return: The build ID as a hexadecimal string, or an empty string if
+            the file has no build ID.
+        """
+        header = _NOTE_HEADER[_ELFDATA[self._encoding][1]]
+        for offset, size, segment_align in notes:
+            # Notes are aligned to 4 bytes, or 8 bytes in 8-byte aligned segments.
+            align = 8 if segment_align == 8 else 4  # noqa: PLR2004
+            pos = offset
+            while pos + header.size <= offset + size:
+                namesz, descsz, note_type = header.unpack_from(self._data, pos)
+                name_pos = pos + header.size
+                desc_pos = name_pos + _align(namesz, align)
+                if (
+                    note_type == _NT_GNU_BUILD_ID
+                    and self._data[name_pos : name_pos + namesz] == b"GNU\0"
+                ):
+                    return self._data[desc_pos : desc_pos + descsz].hex()
+                pos = desc_pos + _align(descsz, align)
+        return ""
+
+    def _read_dynamic(
+        self, dynamic: tuple[int, int], loads: list[tuple[int, int, int]]
+    ) -> tuple[str | None, list[str]]:
+        """Read the DT_SONAME and DT_NEEDED tags of the dynamic segment.
+
+        :param dynamic: The offset and size of the dynamic segment.
+        :param loads: The loadable segments, used to locate the string table.
+
+        :return: The soname, if present, and the needed libraries.
+        """
+        offset, size = dynamic
+        entry_size = self._layout.dyn.size
+        strtab = None
+        strsz = None
+        soname_offset = None
+        needed_offsets = []
+
+        for pos in range(offset, offset + size - entry_size + 1, entry_size):
+            tag, value = self._layout.dyn.unpack_from(self._data, pos)
+            if tag == _DT_NULL:
+                break
+            if tag == _DT_NEEDED:
+                needed_offsets.append(value)
+            elif tag == _DT_SONAME:
+                soname_offset = value
+            elif tag == _DT_STRTAB:
+                strtab = value
+            elif tag == _DT_STRSZ:
+                strsz = value
+
+        if strtab is None or strsz is None:
+            if soname_offset is None and not needed_offsets:
+                return None, []
+            raise UnsupportedLayoutError("missing dynamic string table")
+
+        strtab_offset = _address_to_offset(strtab, strsz, loads)
+        soname = None
+        if soname_offset is not None:
+            soname = self._read_string(strtab_offset, soname_offset, strsz)
+        needed = [
+            self._read_string(strtab_offset, name, strsz) for name in needed_offsets
+        ]
+        return soname, needed
+
+    def _read_undefined_symbols(
+        self, sections: list[tuple[int, ...]]
+    ) -> tuple[set[str], dict[str, str]]:
+        """Read the undefined dynamic symbols and their required versions.
+
+        Like ``nm -uD``, weak undefined symbols are not included.
+
+        :param sections: The section headers.
+
+        :return: The undefined symbols, as ``name@VERSION`` if versioned, and
+            the sonames of the libraries providing the versioned symbols.
+        """
+        by_type = {section[1]: section for section in sections}
+        dynsym = by_type.get(_SHT_DYNSYM)
+        if dynsym is None:
+            return set(), {}
+
+        versym = by_type.get(_SHT_GNU_VERSYM)
+        verneed = by_type.get(_SHT_GNU_VERNEED)
+        requirements = {}
+        if versym is not None and verneed is not None:
+            requirements = self._read_version_requirements(verneed, sections)
+
+        str_offset, str_size = sections[dynsym[6]][4:6]
+        sym_layout = self._layout.sym
+        symbols = set()
+        libraries = {}
+
+        for index in range(1, dynsym[5] // sym_layout.size):
+            fields = sym_layout.unpack_from(
+                self._data, dynsym[4] + index * sym_layout.size
+            )
+            if self._layout.is_64:
+                st_name, st_info, _, st_shndx, _, _ = fields
+            else:
+                st_name, _, _, st_info, _, st_shndx = fields
+
+            if not st_name or st_shndx != _SHN_UNDEF or st_info >> 4 == _STB_WEAK:
+                continue
+
+            name = self._read_string(str_offset, st_name, str_size)
+            requirement = None
+            if versym is not None and requirements:
+                (ndx,) = self._layout.versym.unpack_from(
+                    self._data, versym[4] + index * self._layout.versym.size
+                )
+                requirement = requirements.get(ndx & _VERSYM_INDEX_MASK)
+
+            if requirement is None:
+                symbols.add(name)
+            else:
+                version, library = requirement
+                symbols.add(f"{name}@{version}")
+                libraries[f"{name}@{version}"] = library
+
+        return symbols, libraries
+
+    def _read_section_headers(self) -> list[tuple[int, ...]]:
+        """Read the section headers.
+
+        Each header is a tuple of the name, type, flags, address, offset,
+        size, link, info, alignment and entry size fields.
+
+        :return: The section headers.
+        """
+        return [
+            self._layout.shdr.unpack_from(self._data, self._shoff + i * self._shentsize)
+            for i in range(self._shnum)
+        ]
+
+    def _is_strippable(self, sections: list[tuple[int, ...]]) -> bool:
+        """Check whether there is anything for ``strip --strip-unneeded`` to remove.
+
+        :param sections: The section headers.
+
+        :return: Whether there is a symbol table or a debug section.
+        """
+        if any(section[1] == _SHT_SYMTAB for section in sections):
+            return True
+        if not sections:
+            return False
+
+        str_offset, str_size = sections[self._shstrndx][4:6]
+        return any(
+            self._read_string(str_offset, section[0], str_size).startswith(
+                _DEBUG_SECTION_PREFIXES
+            )
+            for section in sections
+        )
+
+    def _read_version_requirements(
+        self, verneed: tuple[int, ...], sections: list[tuple[int, ...]]
+    ) -> dict[int, tuple[str, str]]:
+        """Map version indexes to the required symbol versions.
+
+        :param verneed: The ``.gnu.version_r`` section header.
+        :param sections: All section headers, used to find the string table.
+
+        :return: A map of version indexes to the version names and the
+            sonames of the libraries defining them.
+        """
+        str_offset, str_size = sections[verneed[6]][4:6]
+        names = {}
+
+        pos = verneed[4]
+        for _ in range(verneed[7]):
+            _, vn_cnt, vn_file, vn_aux, vn_next = self._layout.verneed.unpack_from(
+                self._data, pos
+            )
+            library = self._read_string(str_offset, vn_file, str_size)
+            aux_pos = pos + vn_aux
+            for _ in range(vn_cnt):
+                _, _, vna_other, vna_name, vna_next = self._layout.vernaux.unpack_from(
+                    self._data, aux_pos
+                )
+                version = self._read_string(str_offset, vna_name, str_size)
+                names[vna_other] = (version, library)
+                if not vna_next:
+                    break
+                aux_pos += vna_next
+            if not vn_next:
+                break
+            pos += vn_next
+
+        return names
+
+    def _read_string(self, table_offset: int, offset: int, table_size: int) -> str:
+        """Read a null-terminated string from a string table.
+
+        :param table_offset: The file offset of the string table.
+        :param offset: The offset of the string in the table.
+        :param table_size: The size of the string table.
+
+        :return: The decoded string.
+        """
+        if offset >= table_size:
+            raise UnsupportedLayoutError("string offset out of bounds")
+
+        start = table_offset + offset
+        end = self._data.find(b"\0", start, table_offset + table_size)
+        if end < 0:
+            raise UnsupportedLayoutError("unterminated string")
+        return self._data[start:end].decode("utf-8")
+
+
+def _align(value: int, alignment: int) -> int:
+    """Round a value up to a multiple of an alignment.
+
+    :param value: The value to round.
+    :param alignment: The alignment, a power of 2.
+
+    :return: The aligned value.
+    """
+    return (value + alignment - 1) & ~(alignment - 1)
+
+
+def _address_to_offset(
+    address: int, size: int, loads: list[tuple[int, int, int]]
+) -> int:
+    """Translate a virtual address to a file offset.
+
+    :param address: The virtual address.
+    :param size: The size of the data at the address.
+    :param loads: The offset, address and file size of the loadable segments.
+
+    :return: The file offset of the data.
+    """
+    for p_offset, p_vaddr, p_filesz in loads:
+        if p_vaddr <= address and address + size <= p_vaddr + p_filesz:
+            return p_offset + address - p_vaddr
+    raise UnsupportedLayoutError(f"address {address:#x} is not in a loadable segment")
@@ -16,46 +16,257 @@
 
 """Helpers to handle ELF files."""
 
+import itertools
+import multiprocessing
+import os
 import pathlib
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
 
 from elftools.common.exceptions import ELFError
+from typing_extensions import Self
 
+from .elf_cache import ElfCache
 from .elf_file import ElfFile
+from .elf_index import ElfIndex
 
+# Parsing fewer files than this is faster than starting worker processes.
+_MIN_PARALLEL_FILES = 32
 
-def get_elf_files(path: pathlib.Path, *, recursive: bool = True) -> list[ElfFile]:
+# The number of batches of files submitted to each worker process.
+_BATCHES_PER_WORKER = 4
+
+# The number of files identified before their analyses are yielded.
+_BATCH_SIZE = 1024
+
+# The size of the smallest ELF header, for 32-bit files.
+_MIN_ELF_SIZE = 52
+
+
+def iter_elf_files(
+    path: pathlib.Path,
+    *,
+    recursive: bool = True,
+    patterns: Sequence[str] | None = None,
+    min_size: int = 0,
+    arch: str | None = None,
+    with_soname: bool = False,
+    cache: ElfCache | ElfIndex | None = None,
+    max_workers: int | None = None,
+) -> Iterator[ElfFile]:
+    """Iterate over the dynamic ELF files in a directory or subtree.
+
+    Files are selected by name, type and size before they are opened, and
+    only the analyses matching the ELF filters are yielded. Files are
+    analyzed in batches, in a pool of worker processes if there are enough
+    of them, and yielded in directory traversal order.
+
+    :param path: The root of the subtree to list ELF files from.
+    :param recursive: Whether this will be a recursive search.
+    :param patterns: Only consider files whose path relative to the root
+        matches one of these glob patterns, such as ``*.so.*``.
+    :param min_size: Only consider files of at least this size in bytes.
+    :param arch: Only yield ELF files for this Debian architecture.
+    :param with_soname: Only yield shared libraries with a versioned soname.
+    :param cache: A cache or index of ELF file analyses to consult before
+        parsing files, and to update with the files parsed.
+    :param max_workers: The number of worker processes used to parse files.
+        If None, one worker per CPU is used. With 1, files are parsed in the
+        current process.
+
+    :return: An iterator of the dynamic ELF files found.
+    """
+    if not path.is_dir():
+        return
+
+    candidates = _iter_candidates(
+        path,
+        path,
+        recursive=recursive,
+        patterns=patterns,
+        min_size=max(min_size, _MIN_ELF_SIZE),
+    )
+
+    with _ElfLoader(cache, max_workers) as loader:
+        for elf_file in loader.load(candidates):
+            # If ELF has dynamic symbols, add it.
+            if not elf_file.is_dynamic:
+                continue
+            if arch is not None and elf_file.arch != arch:
+                continue
+            if with_soname and not (elf_file.libname and elf_file.ver):
+                continue
+            yield elf_file
+
+
+def get_elf_files(
+    path: pathlib.Path,
+    *,
+    recursive: bool = True,
+    cache: ElfCache | ElfIndex | None = None,
+    max_workers: int | None = None,
+) -> list[ElfFile]:
     """Obtain a list of all ELF files in a directory or subtree.
 
     :param path: The root of the subtree to list ELF files from.
     :param recursive: Whether this will be a recursive search.
+    :param cache: A cache or index of ELF file analyses to consult before
+        parsing files, and to update with the files parsed.
+    :param max_workers: The number of worker processes used to parse files.
+        If None, one worker per CPU is used. With 1, files are parsed in the
+        current process.
 
     :return: A list of ELF files found in the given directory or subtree.
     """
-    file_list: list[ElfFile] = []
+    return list(
+        iter_elf_files(path, recursive=recursive, cache=cache, max_workers=max_workers)
+    )
 
-    if not path.is_dir():
-        return file_list
 
-    files_to_check = path.rglob("*") if recursive else path.iterdir()
+def _iter_candidates(
+    root: pathlib.Path,
+    directory: pathlib.Path,
+    *,
+    recursive: bool,
+    patterns: Sequence[str] | None,
+    min_size: int,
+) -> Iterator[tuple[pathlib.Path, os.stat_result]]:
+    """Iterate over the files that may be ELF files.
+
+    Entries of a directory are listed before the entries of its
+    subdirectories. Symbolic links to files are followed, but symbolic
+    links to directories are not.
+
+    :param root: The root of the subtree, used to match patterns.
+    :param directory: The directory to list.
+    :param recursive: Whether to list subdirectories.
+    :param patterns: Glob patterns matched against the path relative to the
+        root, or None to consider all files.
+    :param min_size: The minimum size of the files.
+
+    :return: An iterator of the candidate files and their status.
+    """
+    subdirs = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(pathlib.Path(entry.path))
+                continue
+
+            # Uses the directory entry type, without a stat call for regular files.
+            if not entry.is_file() or entry.name.endswith(".o"):
+                continue
+
+            file = pathlib.Path(entry.path)
+            if patterns and not any(
+                file.relative_to(root).match(pattern) for pattern in patterns
+            ):
+                continue
 
-    for file in files_to_check:
-        if not file.is_file():
-            continue
+            stat = entry.stat()
+            if stat.st_size >= min_size:
+                yield file, stat
 
-        if file.suffix == ".o":
-            continue
+    if recursive:
+        for subdir in subdirs:
+            yield from _iter_candidates(
+                root, subdir, recursive=True, patterns=patterns, min_size=min_size
+            )
 
-        if not ElfFile.is_elf(file):
-            continue
 
-        try:
-            elf_file = ElfFile.from_path(path=file)
-        except ELFError:
-            # Ignore invalid ELF files.
-            continue
+class _ElfLoader:
+    """Load ELF file analyses from the cache or by parsing the files.
 
-        # If ELF has dynamic symbols, add it.
-        if elf_file.is_dynamic:
-            file_list.append(elf_file)
+    :param cache: The cache or index of ELF file analyses.
+    :param max_workers: The maximum number of worker processes.
+    """
+
+    def __init__(
+        self, cache: ElfCache | ElfIndex | None, max_workers: int | None
+    ) -> None:
+        self._cache = cache
+        self._max_workers = max_workers or os.cpu_count() or 1
+        self._executor: ProcessPoolExecutor | None = None
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        if self._executor:
+            self._executor.shutdown(cancel_futures=True)
+        if self._cache:
+            self._cache.commit()
+
+    def load(
+        self, candidates: Iterable[tuple[pathlib.Path, os.stat_result]]
+    ) -> Iterator[ElfFile]:
+        """Load the analyses of the candidate files that are valid ELF files.
+
+        :param candidates: The files to load and their status.
+
+        :return: An iterator of the ELF files, in the order of the candidates.
+        """
+        iterator = iter(candidates)
+        while batch := list(itertools.islice(iterator, _BATCH_SIZE)):
+            yield from self._load_batch(batch)
+
+    def _load_batch(
+        self, batch: list[tuple[pathlib.Path, os.stat_result]]
+    ) -> Iterator[ElfFile]:
+        """Load the analyses of a batch of candidate files.
+
+        :param batch: The files to load and their status.
+
+        :return: An iterator of the ELF files, in the order of the batch.
+        """
+        elf_files = [
+            self._cache.get(file, stat) if self._cache else None for file, stat in batch
+        ]
+        uncached = [i for i, elf_file in enumerate(elf_files) if elf_file is None]
+
+        parsed = self._parse([batch[i][0] for i in uncached])
+        for i, elf_file in zip(uncached, parsed):
+            elf_files[i] = elf_file
+            if self._cache and elf_file is not None:
+                self._cache.put(elf_file, batch[i][1])
+
+        yield from (elf_file for elf_file in elf_files if elf_file is not None)
+
+    def _parse(self, paths: list[pathlib.Path]) -> list[ElfFile | None]:
+        """Parse files that may be ELF files, in parallel if worthwhile.
+
+        :param paths: The files to parse.
+
+        :return: The parsed ELF files, in the same order as the given paths,
+            or None for files that are not valid ELF files.
+        """
+        workers = min(self._max_workers, len(paths))
+        if workers <= 1 or len(paths) < _MIN_PARALLEL_FILES:
+            return [_load_elf_file(path) for path in paths]
+
+        if self._executor is None:
+            # Don't fork the current process, which may have running threads.
+            context = multiprocessing.get_context("forkserver")
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._max_workers, mp_context=context
+            )
+
+        chunksize = max(1, len(paths) // (workers * _BATCHES_PER_WORKER))
+        return list(self._executor.map(_load_elf_file, paths, chunksize=chunksize))
+
+
+def _load_elf_file(path: pathlib.Path) -> ElfFile | None:
+    """Parse a file if it is an ELF file.
+
+    :param path: The file to parse.
+
+    :return: The parsed ELF file, or None if the file is not a valid ELF file.
+    """
+    if not ElfFile.is_elf(path):
+        return None
 
-    return file_list
+    try:
+        return ElfFile.from_path(path=path)
+    except ELFError:
+        # Ignore invalid ELF files.
+        return None
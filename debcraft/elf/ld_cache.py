@@ -0,0 +1,226 @@
+#  This file is part of debcraft.
+#
+#  Copyright 2026 Canonical Ltd.
+#
+#  This program is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranties of MERCHANTABILITY,
+#  SATISFACTORY QUALITY, or FITNESS FOR A PARTICULAR PURPOSE.
+#  See the GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along
+#  with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Reader for the dynamic linker cache.
+
+The cache file written by ldconfig lists the shared libraries found in the
+library search path, with their soname, path and ABI flags. It is read
+directly instead of running ``ldconfig -p``, which prints the libraries of
+every architecture installed on multiarch hosts. Only the current format,
+``glibc-ld.so.cache1.1``, is supported, possibly following an entry table in
+the legacy ``ld.so-1.7.0`` format as written by older versions of ldconfig.
+"""
+
+import dataclasses
+import pathlib
+import struct
+from collections.abc import Iterator
+
+LD_CACHE_FILE = pathlib.Path("/etc/ld.so.cache")
+
+_CACHE_MAGIC = b"glibc-ld.so.cache1.1"
+_OLD_CACHE_MAGIC = b"ld.so-1.7.0"
+
+# The cache is written in the byte order of the host.
+_HEADER = struct.Struct("=20sII4xI12x")
+_ENTRY = struct.Struct("=iIIIQ")
+_OLD_HEADER = struct.Struct("=11sxI")
+_OLD_ENTRY = struct.Struct("=iII")
+_HEADER_ALIGNMENT = 8
+
+_EXTENSION_MAGIC = 0xEAA42174
+_EXTENSION_HEADER = struct.Struct("=II")
+_EXTENSION_SECTION = struct.Struct("=IIII")
+_EXTENSION_TAG_GLIBC_HWCAPS = 1
+_HWCAP_EXTENSION = 1 << 62
+_HWCAP_INDEX_MASK = 0xFFFFFFFF
+
+_FLAG_REQUIRED_MASK = 0xFF00
+
+# The ABI flags of the libraries of each architecture.
+_ARCH_FLAGS = {
+    "amd64": 0x0300,
+    "arm64": 0x0A00,
+    "armel": 0x0B00,
+    "armhf": 0x0900,
+    "i386": 0x0000,
+    "loong64": 0x1200,
+    "ppc64el": 0x0500,
+    "riscv64": 0x1000,
+    "s390x": 0x0400,
+}
+
+
+class UnsupportedCacheError(Exception):
+    """The dynamic linker cache format is not supported by the reader."""
+
+
+@dataclasses.dataclass(frozen=True)
+class LdCacheEntry:
+    """A shared library listed in the dynamic linker cache."""
+
+    soname: str
+    """The soname of the library."""
+
+    path: str
+    """The path of the library."""
+
+    flags: int
+    """The library type and ABI flags."""
+
+    hwcaps: str | None = None
+    """The glibc-hwcaps subdirectory of an optimized variant of the library."""
+
+
+def read_ld_cache(path: pathlib.Path = LD_CACHE_FILE) -> list[LdCacheEntry]:
+    """Read the entries of the dynamic linker cache.
+
+    :param path: The cache file.
+
+    :return: The cache entries, in cache order.
+
+    :raises UnsupportedCacheError: If the cache format is not supported.
+    """
+    data = path.read_bytes()
+    return [
+        LdCacheEntry(
+            soname=_read_string(data, key),
+            path=_read_string(data, value),
+            flags=flags,
+            hwcaps=hwcaps,
+        )
+        for flags, key, value, hwcaps in _iter_entries(data)
+    ]
+
+
+def get_soname_paths(
+    arch: str | None = None, path: pathlib.Path = LD_CACHE_FILE
+) -> dict[str, str]:
+    """Obtain the path of each library in the dynamic linker cache.
+
+    The baseline version of a library is preferred over its variants for
+    specific hardware capabilities. If a soname is listed more than once, the
+    first entry is used, as the dynamic linker does.
+
+    :param arch: The Debian architecture of the libraries to list, or None to
+        list the libraries of all architectures.
+    :param path: The cache file.
+
+    :return: The path of the library for each soname.
+
+    :raises UnsupportedCacheError: If the cache format is not supported.
+    """
+    data = path.read_bytes()
+    required = _ARCH_FLAGS.get(arch) if arch else None
+    paths: dict[str, str] = {}
+    optimized: dict[str, str] = {}
+
+    for flags, key, value, hwcaps in _iter_entries(data):
+        if required is not None and flags & _FLAG_REQUIRED_MASK != required:
+            continue
+        soname = _read_string(data, key)
+        selected = optimized if hwcaps else paths
+        if soname not in selected:
+            selected[soname] = _read_string(data, value)
+
+    return optimized | paths
+
+
+def _iter_entries(data: bytes) -> Iterator[tuple[int, int, int, str | None]]:
+    """Decode the entries of a dynamic linker cache.
+
+    :param data: The contents of the cache file.
+
+    :return: The flags, soname offset, path offset and glibc-hwcaps
+        subdirectory of each entry.
+
+    :raises UnsupportedCacheError: If the cache format is not supported.
+    """
+    try:
+        # String offsets are relative to the start of the new format header.
+        base = 0
+        if data.startswith(_OLD_CACHE_MAGIC):
+            _, old_count = _OLD_HEADER.unpack_from(data)
+            base = _OLD_HEADER.size + old_count * _OLD_ENTRY.size
+            base = -(-base // _HEADER_ALIGNMENT) * _HEADER_ALIGNMENT
+
+        magic, count, _, extension_offset = _HEADER.unpack_from(data, base)
+        if magic != _CACHE_MAGIC:
+            raise UnsupportedCacheError("not a glibc-ld.so.cache1.1 file")
+
+        hwcaps = _read_hwcaps(data, base, extension_offset)
+        start = base + _HEADER.size
+        table = data[start : start + count * _ENTRY.size]
+        if len(table) != count * _ENTRY.size:
+            raise UnsupportedCacheError("truncated cache entries")
+
+        for flags, key, value, _, hwcap in _ENTRY.iter_unpack(table):
+            if hwcap >> 32 == _HWCAP_EXTENSION >> 32:
+                yield flags, base + key, base + value, hwcaps[hwcap & _HWCAP_INDEX_MASK]
+            elif not hwcap:
+                # Entries for legacy hardware capability subdirectories, no
+                # longer used by the dynamic linker, are skipped.
+                yield flags, base + key, base + value, None
+    except (struct.error, IndexError) as err:
+        raise UnsupportedCacheError(f"malformed cache: {err}") from err
+
+
+def _read_hwcaps(data: bytes, base: int, extension_offset: int) -> list[str]:
+    """Read the names of the glibc-hwcaps subdirectories of the cache.
+
+    Unlike string offsets, the offsets of the extension directory and of its
+    sections are relative to the start of the file, as glibc reads them.
+
+    :param data: The contents of the cache file.
+    :param base: The offset of the new format header.
+    :param extension_offset: The offset of the extension directory, if any.
+
+    :return: The subdirectory names, by index.
+    """
+    if not extension_offset:
+        return []
+
+    magic, count = _EXTENSION_HEADER.unpack_from(data, extension_offset)
+    if magic != _EXTENSION_MAGIC:
+        return []
+
+    names: list[str] = []
+    for index in range(count):
+        section_offset = (
+            extension_offset + _EXTENSION_HEADER.size + index * _EXTENSION_SECTION.size
+        )
+        tag, _, offset, size = _EXTENSION_SECTION.unpack_from(data, section_offset)
+        if tag == _EXTENSION_TAG_GLIBC_HWCAPS:
+            string_offsets = struct.unpack_from(f"={size // 4}I", data, offset)
+            names = [_read_string(data, base + string) for string in string_offsets]
+
+    return names
+
+
+def _read_string(data: bytes, offset: int) -> str:
+    """Read a NUL-terminated string.
+
+    :param data: The contents of the cache file.
+    :param offset: The offset of the string.
+
+    :return: The decoded string.
+
+    :raises UnsupportedCacheError: If the string is not terminated.
+    """
+    end = data.find(b"\0", offset)
+    if end < 0:
+        raise UnsupportedCacheError("unterminated string in cache")
+    return data[offset:end].decode(errors="surrogateescape")
@@ -0,0 +1,237 @@
+#  This file is part of debcraft.
+#
+#  Copyright 2026 Canonical Ltd.
+#
+#  This program is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranties of MERCHANTABILITY,
+#  SATISFACTORY QUALITY, or FITNESS FOR A PARTICULAR PURPOSE.
+#  See the GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along
+#  with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+"""Content-addressed cache of stripped ELF files."""
+
+import contextlib
+import fcntl
+import hashlib
+import os
+import pathlib
+import platform
+import secrets
+import shutil
+import stat
+import tempfile
+from collections.abc import Sequence
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def _get_ficlone_request() -> int:
+    """Obtain the ioctl request that shares the extents of a file with another.
+
+    :return: The FICLONE request, ``_IOW(0x94, 9, int)``, for the host.
+    """
+    # Added in Python 3.12.
+    request: int | None = getattr(fcntl, "FICLONE", None)
+    if request is not None:
+        return request
+
+    # These architectures encode the write direction in the three high bits
+    # of the request, instead of the two high bits of asm-generic/ioctl.h.
+    if platform.machine().startswith(("alpha", "mips", "ppc", "sparc")):
+        write = 4 << 29
+    else:
+        write = 1 << 30
+    return write | 4 << 16 | 0x94 << 8 | 9
+
+
+_FICLONE = _get_ficlone_request()
+
+_DEBUG_SUFFIX = ".debug"
+
+
+class StripCache:
+    """A cache of stripped files, by the contents of the unstripped files.
+
+    Each entry holds the stripped file and, if the debug information was
+    split, the debug file. Entries are keyed by the digest of the unstripped
+    file and of the options that affect the output, so a cached file is
+    identical to the one that stripping the file again would create. Files
+    are copied in and out of the cache with reflinks where the file system
+    supports them.
+
+    The cache is limited in size, and the least recently used entries are
+    evicted first.
+
+    :param path: The directory containing the cache.
+    :param max_size: The maximum size of the cached files, in bytes.
+    """
+
+    def __init__(self, path: pathlib.Path, *, max_size: int) -> None:
+        self._path = path
+        self._max_size = max_size
+
+    def key(self, path: pathlib.Path, options: Sequence[str]) -> str:
+        """Compute the cache key of a file to be stripped.
+
+        :param path: The unstripped file.
+        :param options: The options that affect the stripped output.
+
+        :return: The hexadecimal cache key.
+        """
+        sha256 = hashlib.sha256()
+        for option in options:
+            sha256.update(option.encode() + b"\0")
+        with path.open("rb") as f:
+            while chunk := f.read(_HASH_CHUNK_SIZE):
+                sha256.update(chunk)
+        return sha256.hexdigest()
+
+    def get(
+        self,
+        key: str,
+        path: pathlib.Path,
+        debug_file: pathlib.Path | None = None,
+        *,
+        links: Sequence[pathlib.Path] = (),
+    ) -> bool:
+        """Replace a file by its cached stripped version.
+
+        The cached file is copied next to the file and renamed over it, so the
+        file is never left partially written. Its permissions are kept, and
+        its other hard links are replaced by links to the new file, so each
+        set of hard links must be restored with a single call.
+
+        :param key: The cache key of the file.
+        :param path: The file to replace.
+        :param debug_file: The debug file to create, if debug information is
+            split from the file.
+        :param links: The other hard links to the file.
+
+        :return: Whether the file was found in the cache.
+        """
+        entry = self._path / key
+        debug_entry = entry.with_suffix(_DEBUG_SUFFIX)
+        if not entry.is_file() or (debug_file and not debug_entry.is_file()):
+            return False
+
+        # Mark the entry as recently used.
+        os.utime(entry)
+        # Debug files are created with the permissions of the file, as objcopy
+        # does.
+        mode = stat.S_IMODE(path.stat().st_mode)
+        if debug_file:
+            debug_file.parent.mkdir(parents=True, exist_ok=True)
+            _replace(debug_entry, debug_file, mode)
+        _replace(entry, path, mode)
+        for link in links:
+            _replace_with_link(path, link)
+        return True
+
+    def put(
+        self, key: str, path: pathlib.Path, debug_file: pathlib.Path | None = None
+    ) -> None:
+        """Add a stripped file to the cache.
+
+        :param key: The cache key of the unstripped file.
+        :param path: The stripped file.
+        :param debug_file: The debug file split from the file, if any.
+        """
+        self._path.mkdir(parents=True, exist_ok=True)
+        if debug_file:
+            self._add(debug_file, (self._path / key).with_suffix(_DEBUG_SUFFIX))
+        self._add(path, self._path / key)
+
+    def trim(self) -> None:
+        """Evict the least recently used entries that exceed the cache size."""
+        if not self._path.is_dir():
+            return
+
+        entries = []
+        total_size = 0
+        for path in self._path.iterdir():
+            if path.suffix or not path.is_file():
+                continue
+            stat = path.stat()
+            debug_entry = path.with_suffix(_DEBUG_SUFFIX)
+            size = stat.st_size
+            if debug_entry.is_file():
+                size += debug_entry.stat().st_size
+            entries.append((stat.st_mtime_ns, size, path))
+            total_size += size
+
+        for _, size, path in sorted(entries):
+            if total_size <= self._max_size:
+                break
+            path.unlink()
+            path.with_suffix(_DEBUG_SUFFIX).unlink(missing_ok=True)
+            total_size -= size
+
+    def _add(self, source: pathlib.Path, entry: pathlib.Path) -> None:
+        """Copy a file into the cache atomically.
+
+        :param source: The file to copy.
+        :param entry: The path of the cache entry.
+        """
+        fd, temp_name = tempfile.mkstemp(dir=self._path, suffix=".tmp")
+        os.close(fd)
+        temp_path = pathlib.Path(temp_name)
+        try:
+            _clone(source, temp_path)
+            temp_path.replace(entry)
+        finally:
+            temp_path.unlink(missing_ok=True)
+
+
+def _replace(source: pathlib.Path, dest: pathlib.Path, mode: int) -> None:
+    """Atomically replace a file by a copy of another file.
+
+    :param source: The file to copy.
+    :param dest: The file to replace, created if needed.
+    :param mode: The permissions of the new file.
+    """
+    fd, temp_name = tempfile.mkstemp(dir=dest.parent, prefix=f".{dest.name}.")
+    os.close(fd)
+    temp_path = pathlib.Path(temp_name)
+    try:
+        _clone(source, temp_path)
+        temp_path.chmod(mode)
+        temp_path.replace(dest)
+    finally:
+        temp_path.unlink(missing_ok=True)
+
+
+def _replace_with_link(target: pathlib.Path, link: pathlib.Path) -> None:
+    """Atomically replace a file by a hard link to another file.
+
+    :param target: The file to link to.
+    :param link: The file to replace.
+    """
+    temp_path = link.with_name(f".{link.name}.{secrets.token_hex(8)}")
+    temp_path.hardlink_to(target)
+    try:
+        temp_path.replace(link)
+    finally:
+        temp_path.unlink(missing_ok=True)
+
+
+def _clone(source: pathlib.Path, dest: pathlib.Path) -> None:
+    """Copy the contents of a file into a new file.
+
+    The files share their extents if the file system supports reflinks, and
+    the contents are copied otherwise.
+
+    :param source: The file to copy.
+    :param dest: The file to write, which is not used by any other path yet.
+    """
+    with source.open("rb") as fsrc, dest.open("wb") as fdst:
+        with contextlib.suppress(OSError):
+            fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+            return
+        shutil.copyfileobj(fsrc, fdst)
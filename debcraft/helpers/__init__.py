@@ -24,7 +24,8 @@ from .installchangelogs import Installchangelogs
 from .installdebconf import Installdebconf
 from .installdocs import Installdocs
 from .lintian import Lintian
-from .makedeb import Makedeb
+from .makedbgsym import Makedbgsym
+from .makedeb import Makedata, Makedeb
 from .makeshlibs import Makeshlibs
 from .md5sums import Md5sums
 from .shlibdeps import Shlibdeps
@@ -47,8 +48,10 @@ class PackagingHelpers(HelperGroup):
 
     def _register(self) -> None:
         self._register_helper("fixperms", Fixperms)
+        self._register_helper("makedata", Makedata)
         self._register_helper("compress", Compress)
         self._register_helper("md5sums", Md5sums)
+        self._register_helper("makedbgsym", Makedbgsym)
         self._register_helper("makeshlibs", Makeshlibs)
         self._register_helper("shlibdeps", Shlibdeps)
         self._register_helper("gencontrol", Gencontrol)
@@ -104,6 +104,7 @@ class Gencontrol(Helper):
         with output_file.open("w", encoding="utf-8", newline="\n") as f:
             encoder = control.Encoder(f)
             encoder.encode(ctl_data)
+            encoder.encode_fields(package.passthrough)
 
 
 def _read_shlibdeps(state_dir: pathlib.Path) -> list[str]:
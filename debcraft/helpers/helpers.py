@@ -66,6 +66,16 @@ class HelperGroup(ABC):
         return helper
 
 
+def get_debug_file_path(build_id: str) -> Path:
+    """Obtain the path of the debug file for an ELF file.
+
+    :param build_id: The GNU build ID of the ELF file, in hexadecimal.
+
+    :returns: The path of the debug file, relative to the root directory.
+    """
+    return Path("usr/lib/debug/.build-id", build_id[:2], f"{build_id[2:]}.debug")
+
+
 def install_package_data(
     *,
     name: str,
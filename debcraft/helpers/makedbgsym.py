@@ -0,0 +1,114 @@
+#  This file is part of debcraft.
+#
+#  Copyright 2026 Canonical Ltd.
+#
+#  This program is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranties of MERCHANTABILITY,
+#  SATISFACTORY QUALITY, or FITNESS FOR A PARTICULAR PURPOSE.
+#  See the GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along
+#  with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Debcraft makedbgsym helper."""
+
+import pathlib
+import shutil
+from typing import Any
+
+from craft_cli import emit
+
+from debcraft import models
+from debcraft.elf import ElfIndex, iter_elf_files
+
+from .helpers import Helper, get_debug_file_path
+
+
+class Makedbgsym(Helper):
+    """Debcraft makedbgsym helper.
+
+    The makedbgsym helper will:
+    - Scan prime dir for ELF files with a build ID
+    - Collect the debug files split from them by the strip helper in each part
+    - Describe a debug symbols package shipping the debug files
+    """
+
+    def run(
+        self,
+        *,
+        prime_dir: pathlib.Path,
+        state_dir: pathlib.Path,
+        project: models.Project,
+        package_name: str,
+        arch: str,
+        debug_dir: pathlib.Path,
+        dbgsym_packages: dict[str, tuple[models.Package, pathlib.Path]],
+        elf_index: ElfIndex | None = None,
+        **kwargs: Any,  # noqa: ARG002
+    ) -> None:
+        """Create the debug symbols package for the given package.
+
+        :param prime_dir: Directory containing the package payload files.
+        :param state_dir: Directory for writing helper state files.
+        :param project: The project model.
+        :param package_name: The name of the package being created.
+        :param arch: The deb control architecture.
+        :param debug_dir: Directory containing the split debug files of each
+            part, in a subdirectory named after the part.
+        :param dbgsym_packages: The debug symbols packages and their payload
+            directories, to be updated with the package created.
+        :param elf_index: The index of the ELF files analyzed during the build.
+        """
+        if arch == "all":
+            return
+
+        part_debug_dirs = sorted(debug_dir.iterdir()) if debug_dir.is_dir() else []
+
+        # Map the build IDs to the debug files.
+        debug_files: dict[str, pathlib.Path] = {}
+        for elf_file in iter_elf_files(prime_dir, cache=elf_index):
+            if not elf_file.build_id or elf_file.build_id in debug_files:
+                continue
+            debug_file = get_debug_file_path(elf_file.build_id)
+            for part_debug_dir in part_debug_dirs:
+                if (part_debug_dir / debug_file).is_file():
+                    debug_files[elf_file.build_id] = part_debug_dir / debug_file
+                    break
+
+        if not debug_files:
+            emit.debug(f"no debug files for package {package_name}")
+            return
+
+        dbgsym_dir = state_dir / "dbgsym"
+        for build_id, source in sorted(debug_files.items()):
+            dest = dbgsym_dir / get_debug_file_path(build_id)
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(source, dest)
+
+        package = project.get_package(package_name)
+        version = package.version or project.version
+        dbgsym_name = f"{package_name}-dbgsym"
+        emit.progress(f"Create debug symbols package {dbgsym_name}")
+
+        dbgsym_packages[dbgsym_name] = (
+            models.Package(
+                architectures=package.architectures,
+                summary=f"debug symbols for {package_name}",
+                description=(
+                    f"This package contains the debug symbols for {package_name}."
+                ),
+                version=version,
+                depends=[f"{package_name} (= {version})"],
+                section="debug",
+                multi_arch="same" if package.multi_arch == "same" else "no",
+                passthrough={
+                    "Auto-Built-Package": "debug-symbols",
+                    "Build-Ids": " ".join(sorted(debug_files)),
+                },
+            ),
+            dbgsym_dir,
+        )
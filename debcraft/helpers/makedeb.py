@@ -16,26 +16,97 @@
 
 """Debcraft makedeb helper service."""
 
+import errno
 import os
 import pathlib
-import subprocess
 import tarfile
-from typing import Any, cast
+from collections.abc import Callable
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import Any, BinaryIO, cast
 
 import zstandard as zstd
 from craft_cli import emit
 
-from debcraft import models
+from debcraft import errors, models, util
+from debcraft.archive.ar import ArWriter
+from debcraft.archive.compression import (
+    ZSTD_COMPRESSION_LEVEL,
+    ZSTD_MAX_WINDOW_LOG,
+    ZSTD_MIN_WINDOW_LOG,
+)
+from debcraft.archive.seekable import SeekableZstdWriter
+from debcraft.models.const import FsyncPolicy
 
 from .helpers import Helper
 
-_ZSTD_COMPRESSION_LEVEL = 3
+# Payload size above which long-distance matching is enabled by default.
+_ZSTD_LONG_DISTANCE_THRESHOLD = 256 * 1024 * 1024
+
+# Frame sizes used in seekable data tarballs. Frames end at the first member
+# boundary after the target size, and files larger than the maximum size are
+# split across frames.
+_SEEKABLE_FRAME_SIZE = 2 * 1024 * 1024
+_SEEKABLE_MAX_FRAME_SIZE = 32 * 1024 * 1024
+
+_TAR_COPY_BUFSIZE = 1024 * 1024
+
+_DEBIAN_BINARY = "debian-binary"
+_CONTROL_TARBALL = "control.tar.zst"
+_DATA_TARBALL = "data.tar.zst"
+
+
+class Makedata(Helper):
+    """Debcraft makedata helper.
+
+    The makedata helper starts compressing the data tarball in the background
+    as soon as the prime directory contents are final, so that the remaining
+    control-side helpers run while the package payload is being compressed.
+    The pending tarball is picked up by the makedeb helper.
+    """
+
+    def run(
+        self,
+        *,
+        package_name: str,
+        prime_dir: pathlib.Path,
+        deb_dir: pathlib.Path,
+        executor: Executor,
+        data_tarballs: dict[str, Future[None]],
+        zstd_long_distance: bool | None = None,
+        zstd_window_log: int | None = None,
+        zstd_seekable: bool = False,
+        **kwargs: Any,  # noqa: ARG002
+    ) -> None:
+        """Schedule the creation of the data tarball.
+
+        :param package_name: The name of the package being created.
+        :param prime_dir: Directory containing the primed package files.
+        :param deb_dir: Temporary directory for building deb components.
+        :param executor: The executor used to create the tarball.
+        :param data_tarballs: Mapping of package names to pending data tarballs.
+        :param zstd_long_distance: Whether to use long-distance matching, or
+            None to decide based on the payload size.
+        :param zstd_window_log: The zstd window size as a power of 2, or None
+            to use the default.
+        :param zstd_seekable: Whether to create a seekable data tarball.
+        """
+        params = _get_zstd_parameters(
+            prime_dir, long_distance=zstd_long_distance, window_log=zstd_window_log
+        )
+        emit.debug(f"Schedule data tarball creation for package {package_name}")
+        data_tarballs[package_name] = executor.submit(
+            _create_tarball,
+            root=prime_dir,
+            dest_file=deb_dir / _DATA_TARBALL,
+            params=params,
+            seekable=zstd_seekable,
+        )
 
 
 class Makedeb(Helper):
     """Debcraft makedeb helper."""
 
-    def run(
+    def run(  # noqa: PLR0913
         self,
         *,
         project: models.Project,
@@ -46,10 +117,21 @@ class Makedeb(Helper):
         deb_dir: pathlib.Path,
         output_dir: pathlib.Path,
         deb_list: list[pathlib.Path],
+        data_tarballs: dict[str, Future[None]] | None = None,
+        zstd_long_distance: bool | None = None,
+        zstd_window_log: int | None = None,
+        zstd_seekable: bool = False,
+        output_fsync: FsyncPolicy = "dir",
         **kwargs: Any,  # noqa: ARG002
     ) -> None:
         """Create a .deb package from the control and data tarballs.
 
+        The debian-binary member, the control tarball and the data tarball
+        are created concurrently. If the data tarball was already scheduled
+        by the makedata helper, its result is used instead. The package is
+        written to a temporary file that atomically replaces any existing
+        package once complete.
+
         :param project: The project model.
         :param package_name: The name of the package to create.
         :param arch: The target architecture.
@@ -58,58 +140,254 @@ class Makedeb(Helper):
         :param deb_dir: Temporary directory for building deb components.
         :param output_dir: Directory where the .deb file will be written.
         :param deb_list: List to append the output .deb file path to.
+        :param data_tarballs: Mapping of package names to pending data tarballs.
+        :param zstd_long_distance: Whether to use long-distance matching for
+            the data tarball, or None to decide based on the payload size.
+        :param zstd_window_log: The zstd window size for the data tarball as
+            a power of 2, or None to use the default.
+        :param zstd_seekable: Whether to create a seekable data tarball.
+        :param output_fsync: When to flush the package to permanent storage.
         """
         package = project.get_package(package_name)
         version = cast(str, package.version or project.version)
         deb_name = f"{package_name}_{version}_{arch}.deb"
         output_file = output_dir.absolute() / deb_name
 
-        output_file.unlink(missing_ok=True)
+        data_tar = deb_dir / _DATA_TARBALL
+        control_tar = deb_dir / _CONTROL_TARBALL
+        debian_binary_file = deb_dir / _DEBIAN_BINARY
 
-        data_tar = deb_dir / "data.tar.zst"
-        control_tar = deb_dir / "control.tar.zst"
-        debian_binary_file = deb_dir / "debian-binary"
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            data_future = (data_tarballs or {}).get(package_name)
+            if data_future is None:
+                params = _get_zstd_parameters(
+                    prime_dir,
+                    long_distance=zstd_long_distance,
+                    window_log=zstd_window_log,
+                )
+                data_future = executor.submit(
+                    _create_tarball,
+                    root=prime_dir,
+                    dest_file=data_tar,
+                    params=params,
+                    seekable=zstd_seekable,
+                )
+            control_future = executor.submit(
+                _create_tarball, root=control_dir, dest_file=control_tar
+            )
+            binary_future = executor.submit(debian_binary_file.write_text, "2.0\n")
 
-        _create_tarball(root=prime_dir, dest_file=data_tar)
-        _create_tarball(root=control_dir, dest_file=control_tar)
-        debian_binary_file.write_text("2.0\n")
+            for future in (binary_future, control_future, data_future):
+                future.result()
 
-        cwd = pathlib.Path().absolute()
-        try:
-            os.chdir(deb_dir)
-            emit.progress(f"Create deb package {deb_name}")
+        emit.progress(f"Create deb package {deb_name}")
 
+        with util.atomic_write(output_file, fsync=output_fsync) as f:
             # Order of files added to the deb file is important. The
             # debian-binary file must come first, followed by the control
             # tarball and then the data tarball.
-            subprocess.run(
-                [
-                    "ar",
-                    "rc",
-                    output_file,
-                    "debian-binary",
-                    "control.tar.zst",
-                    "data.tar.zst",
-                ],
-                check=True,
-            )
-        finally:
-            os.chdir(cwd)
+            ar_writer = ArWriter(f)
+            for member in (_DEBIAN_BINARY, _CONTROL_TARBALL, _DATA_TARBALL):
+                ar_writer.add_file(member, deb_dir / member)
 
         deb_list.append(output_file)
 
 
-def _create_tarball(*, root: pathlib.Path, dest_file: pathlib.Path) -> None:
-    """Create the data.tar.zst file containing the prime contents.
+def _get_zstd_parameters(
+    root: pathlib.Path,
+    *,
+    long_distance: bool | None = None,
+    window_log: int | None = None,
+) -> zstd.ZstdCompressionParameters:
+    """Obtain the zstd compression parameters for a data tarball.
+
+    :param root: Directory containing the files to package.
+    :param long_distance: Whether to use long-distance matching. If None,
+        it is enabled if the payload is larger than the size threshold.
+    :param window_log: The window size as a power of 2. If None, the default
+        window is used, or the largest allowed window if long-distance matching
+        is enabled.
+
+    :returns: The compression parameters to use.
+    """
+    if window_log is not None and not (
+        ZSTD_MIN_WINDOW_LOG <= window_log <= ZSTD_MAX_WINDOW_LOG
+    ):
+        raise errors.DebcraftError(
+            f"invalid zstd window log {window_log}",
+            resolution=(
+                f"Use a value between {ZSTD_MIN_WINDOW_LOG} and "
+                f"{ZSTD_MAX_WINDOW_LOG} to keep packages installable by dpkg."
+            ),
+        )
+
+    if long_distance is None:
+        long_distance = _get_tree_size(root) > _ZSTD_LONG_DISTANCE_THRESHOLD
+
+    if long_distance and window_log is None:
+        window_log = ZSTD_MAX_WINDOW_LOG
+
+    emit.debug(
+        f"zstd parameters: long_distance={long_distance}, window_log={window_log}"
+    )
+    return zstd.ZstdCompressionParameters.from_level(
+        ZSTD_COMPRESSION_LEVEL,
+        window_log=window_log or 0,
+        enable_ldm=long_distance,
+    )
+
+
+def _get_tree_size(root: pathlib.Path) -> int:
+    size = 0
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            path = os.path.join(dirpath, name)  # noqa: PTH118
+            if not os.path.islink(path):  # noqa: PTH114
+                size += os.lstat(path).st_size
+    return size
+
+
+def _create_tarball(
+    *,
+    root: pathlib.Path,
+    dest_file: pathlib.Path,
+    params: zstd.ZstdCompressionParameters | None = None,
+    seekable: bool = False,
+) -> None:
+    """Create a zstd-compressed tarball containing the contents of a directory.
 
     :param root: Directory containing the files to package.
     :param dest_file: The tar file to be created.
+    :param params: The zstd compression parameters, or None to use the
+        default compression level.
+    :param seekable: Whether to write independent frames at member boundaries
+        followed by a seek table.
     """
+    if params is None:
+        zcomp = zstd.ZstdCompressor(level=ZSTD_COMPRESSION_LEVEL)
+    else:
+        zcomp = zstd.ZstdCompressor(compression_params=params)
+
     with dest_file.open("wb") as data_zstd:
-        zcomp = zstd.ZstdCompressor(level=_ZSTD_COMPRESSION_LEVEL)
-        with zcomp.stream_writer(data_zstd) as comp:
+        writer: SeekableZstdWriter | zstd.ZstdCompressionWriter
+        on_member: Callable[[], None] | None = None
+
+        if seekable:
+            seekable_writer = SeekableZstdWriter(
+                data_zstd,
+                zcomp,
+                frame_size=_SEEKABLE_FRAME_SIZE,
+                max_frame_size=_SEEKABLE_MAX_FRAME_SIZE,
+            )
+            writer = seekable_writer
+            on_member = seekable_writer.mark_boundary
+        else:
+            writer = zcomp.stream_writer(data_zstd)
+
+        # The GNU format is used because it is the format written by dpkg-deb
+        # and supports long paths and members larger than 8 GiB. PAX extended
+        # headers are rejected by the dpkg tar extractor.
+        with writer as comp:
             with tarfile.open(
-                fileobj=comp, mode="w", format=tarfile.USTAR_FORMAT
+                fileobj=comp,
+                mode="w",
+                format=tarfile.GNU_FORMAT,
+                copybufsize=_TAR_COPY_BUFSIZE,
             ) as tar:
-                for entry in root.absolute().iterdir():
-                    tar.add(entry, arcname=entry.name)
+                _add_tree(tar, root.absolute(), on_member=on_member)
+
+
+def _add_tree(
+    tar: tarfile.TarFile,
+    root: pathlib.Path,
+    *,
+    on_member: Callable[[], None] | None = None,
+) -> None:
+    """Add the contents of a directory to a tarball in a stable order.
+
+    :param tar: The tarball to add files to.
+    :param root: Directory containing the files to add.
+    :param on_member: A function called before each member is written.
+    """
+    for path, arcname in util.iter_tree(root):
+        tarinfo = tar.gettarinfo(path, arcname)
+        if tarinfo is None:
+            emit.debug(f"Skip unsupported file type: {arcname}")
+            continue
+
+        if on_member:
+            on_member()
+
+        if tarinfo.isreg():
+            with open(path, "rb") as f:  # noqa: PTH123
+                tar.addfile(tarinfo, _HoleSkippingReader(f))
+        else:
+            tar.addfile(tarinfo)
+
+
+class _HoleSkippingReader:
+    """Read a file, producing zeros for holes without reading them from disk.
+
+    dpkg cannot recreate holes, so sparse files are stored in full and their
+    holes still go through tar and zstd as runs of zeros. Locating the holes
+    with ``SEEK_DATA`` and ``SEEK_HOLE`` only avoids reading them from disk;
+    the cost of packing the file remains proportional to its apparent size.
+    """
+
+    def __init__(self, fileobj: BinaryIO) -> None:
+        self._fd = fileobj.fileno()
+        stat = os.fstat(self._fd)
+        self._size = stat.st_size
+        self._pos = 0
+        # Region of the file that is known to be data or a hole.
+        self._region_end = 0
+        self._in_hole = False
+        # Files without holes use all blocks they need, skip hole detection.
+        self._sparse = hasattr(os, "SEEK_DATA") and stat.st_blocks * 512 < stat.st_size
+
+    def read(self, size: int = -1) -> bytes:
+        """Read up to size bytes from the current position.
+
+        :param size: The maximum number of bytes to read.
+        :returns: The data read, which is shorter than requested only at the
+            end of the file.
+        """
+        if size < 0:
+            size = self._size - self._pos
+
+        chunks: list[bytes] = []
+        while size > 0 and self._pos < self._size:
+            chunk = self._read_region(size)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            self._pos += len(chunk)
+            size -= len(chunk)
+
+        return b"".join(chunks)
+
+    def _read_region(self, size: int) -> bytes:
+        if not self._sparse:
+            return os.pread(self._fd, size, self._pos)
+
+        if self._pos >= self._region_end:
+            self._find_region()
+
+        size = min(size, self._region_end - self._pos)
+        return bytes(size) if self._in_hole else os.pread(self._fd, size, self._pos)
+
+    def _find_region(self) -> None:
+        try:
+            data_start = os.lseek(self._fd, self._pos, os.SEEK_DATA)
+        except OSError as err:
+            if err.errno != errno.ENXIO:
+                raise
+            # No more data after this position, the rest is a hole.
+            data_start = self._size
+
+        if data_start > self._pos:
+            self._in_hole = True
+            self._region_end = data_start
+        else:
+            self._in_hole = False
+            self._region_end = os.lseek(self._fd, self._pos, os.SEEK_HOLE)
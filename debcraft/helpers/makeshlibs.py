@@ -25,7 +25,7 @@ from typing import Any, cast
 from craft_cli import emit
 
 from debcraft import errors, models, util
-from debcraft.elf import get_elf_files
+from debcraft.elf import ElfIndex, iter_elf_files
 
 from .helpers import Helper
 
@@ -47,6 +47,7 @@ class Makeshlibs(Helper):
         project: models.Project,
         package_name: str,
         arch: str,
+        elf_index: ElfIndex | None = None,
         **kwargs: Any,  # noqa: ARG002
     ) -> None:
         """Create a list of shared libraries present in this package."""
@@ -57,20 +58,20 @@ class Makeshlibs(Helper):
         arch_triplet = util.get_arch_triplet()
         lib_dirs = _get_lib_dirs(arch_triplet)
 
-        primed_elf_files = []
-        for lib_dir in lib_dirs:
-            primed_elf_files.extend(
-                get_elf_files(prime_dir / lib_dir.lstrip("/"), recursive=False)
+        arch_shlibs = [
+            elf
+            for lib_dir in lib_dirs
+            for elf in iter_elf_files(
+                prime_dir / lib_dir.lstrip("/"),
+                recursive=False,
+                arch=arch,
+                with_soname=True,
+                cache=elf_index,
             )
+        ]
 
-        primed_shlibs = [x for x in primed_elf_files if x.libname and x.ver]
-
-        if not primed_shlibs:
-            emit.debug(f"no primed shlibs in package {package_name}")
-            return
-
-        arch_shlibs = [elf for elf in primed_shlibs if elf.arch == arch]
         if not arch_shlibs:
+            emit.debug(f"no primed shlibs in package {package_name}")
             return
 
         # Write shlibs file
@@ -16,57 +16,219 @@
 
 """Debcraft shlibdeps helper service."""
 
+import contextlib
+import mmap
+import os
 import pathlib
+import struct
 import subprocess
+import tempfile
+from collections.abc import Iterator, Mapping
 from typing import Any
 
 from craft_cli import emit
 
 from debcraft import errors, util
-from debcraft.elf import ElfLibrary, get_elf_files
+from debcraft.elf import ElfIndex, ElfLibrary, get_elf_files, ld_cache
 
 from .helpers import Helper
 
 _DPKG_INFO_DIR = pathlib.Path("/var/lib/dpkg/info")
+_LD_CACHE_FILE = ld_cache.LD_CACHE_FILE
+
+# The header of the library path index: magic, dpkg database modification
+# times, and number of entries.
+_PATH_INDEX_MAGIC = b"DCPATHS1"
+_PATH_INDEX_HEADER = struct.Struct("<8sqqI")
+_PATH_INDEX_OFFSET = struct.Struct("<I")
+
+
+class _PathIndex:
+    """Persistent index of the shared library files installed by packages.
+
+    The index is stored in a file that is rebuilt from the dpkg database when
+    the database changes, and read through a memory map so that looking up a
+    path only reads the entries visited by a binary search. The file holds a
+    header, the offsets of the entries sorted by path, and the entries as NUL
+    terminated path and package names.
+
+    :param path: The index file.
+    :param arch: The architecture of the indexed packages.
+    :param stamp: The modification times identifying the dpkg database state.
+    """
+
+    def __init__(self, path: pathlib.Path, arch: str, stamp: tuple[int, int]) -> None:
+        map_ = _map_path_index(path, stamp)
+        if map_ is None:
+            emit.debug(f"shlibdeps: create library path index {path!s}")
+            _write_path_index(path, _read_library_paths(arch), stamp)
+            map_ = _map_path_index(path, stamp)
+            if map_ is None:
+                raise errors.DebcraftError(f"invalid library path index {path!s}")
+
+        self._map = map_
+        self._count = _PATH_INDEX_HEADER.unpack_from(map_)[3]
+
+    def get(self, path: str) -> str | None:
+        """Obtain the package that installed a file.
+
+        :param path: The path of the file.
+
+        :returns: The name of the package, or None if the path is not indexed.
+        """
+        key = path.encode()
+        low, high = 0, self._count
+        while low < high:
+            mid = (low + high) // 2
+            offset = _PATH_INDEX_HEADER.size + mid * _PATH_INDEX_OFFSET.size
+            start = _PATH_INDEX_OFFSET.unpack_from(self._map, offset)[0]
+            end = self._map.find(b"\0", start)
+            entry = self._map[start:end]
+            if entry < key:
+                low = mid + 1
+            elif entry > key:
+                high = mid
+            else:
+                return self._map[end + 1 : self._map.find(b"\0", end + 1)].decode()
+        return None
+
+    def close(self) -> None:
+        """Unmap the index file."""
+        self._map.close()
+
+
+def _read_library_paths(arch: str) -> dict[str, str]:
+    """Read the shared library paths from the dpkg database.
+
+    :param arch: The architecture of the packages.
+
+    :returns: The package that installed each shared library path.
+    """
+    index: dict[str, str] = {}
+    list_files = _DPKG_INFO_DIR.glob(f"*:{arch}.list")
+
+    for list_file in list_files:
+        with list_file.open("r", encoding="utf-8") as f:
+            pkg_name = list_file.stem.split(":", 1)[0]
+            for raw_line in f:
+                line = raw_line.strip()
+                if ".so." in line:
+                    index[line] = pkg_name
+
+    return index
+
+
+def _get_dpkg_stamp() -> tuple[int, int] | None:
+    """Obtain the modification times of the dpkg database.
+
+    Installing or removing packages updates the status file and the list of
+    files in the info directory.
+
+    :returns: The modification times of the info directory and status file,
+        or None if there is no dpkg database.
+    """
+    try:
+        info_stat = _DPKG_INFO_DIR.stat()
+        status_stat = (_DPKG_INFO_DIR.parent / "status").stat()
+    except OSError:
+        return None
+    return info_stat.st_mtime_ns, status_stat.st_mtime_ns
+
+
+def _map_path_index(path: pathlib.Path, stamp: tuple[int, int]) -> mmap.mmap | None:
+    """Map a library path index file if it matches the dpkg database.
+
+    :param path: The index file.
+    :param stamp: The modification times of the dpkg database.
+
+    :returns: The mapped index, or None if it is missing or out of date.
+    """
+    try:
+        with path.open("rb") as f:
+            map_ = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    if len(map_) >= _PATH_INDEX_HEADER.size:
+        magic, *index_stamp, _ = _PATH_INDEX_HEADER.unpack_from(map_)
+        if magic == _PATH_INDEX_MAGIC and tuple(index_stamp) == stamp:
+            return map_
+
+    map_.close()
+    return None
+
+
+def _write_path_index(
+    path: pathlib.Path, path_to_package: dict[str, str], stamp: tuple[int, int]
+) -> None:
+    """Write a library path index file.
+
+    :param path: The index file.
+    :param path_to_package: The package that installed each library path.
+    :param stamp: The modification times of the dpkg database.
+    """
+    entries = sorted((p.encode(), pkg.encode()) for p, pkg in path_to_package.items())
+    data = bytearray()
+    offsets = bytearray()
+    base = _PATH_INDEX_HEADER.size + len(entries) * _PATH_INDEX_OFFSET.size
+    for lib_path, package in entries:
+        offsets += _PATH_INDEX_OFFSET.pack(base + len(data))
+        data += lib_path + b"\0" + package + b"\0"
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_PATH_INDEX_HEADER.pack(_PATH_INDEX_MAGIC, *stamp, len(entries)))
+            f.write(offsets)
+            f.write(data)
+        pathlib.Path(temp_name).replace(path)
+    finally:
+        pathlib.Path(temp_name).unlink(missing_ok=True)
 
 
 class _LibraryMap:
     """Library to package name mapping.
 
     To determine the package that contains a given shared library, we
-    read the soname to library path information from the dynamic linker
-    and check the list of files belonging to each package on the system.
+    read the soname to library path information of the architecture from
+    the dynamic linker cache and check the list of files belonging to each
+    package on the system. If a cache directory is given, the library paths
+    of the packages are kept in a persistent index that is only rebuilt when
+    the dpkg database changes.
+
+    :param arch: The architecture of the packages.
+    :param cache_dir: The directory to keep the library path index in.
     """
 
-    def __init__(self, arch: str) -> None:
+    def __init__(self, arch: str, cache_dir: pathlib.Path | None = None) -> None:
         self.soname_to_package: dict[str, str] = {}
-        soname_to_path = self._get_soname_to_path()
-        path_to_package = self._get_path_to_package(arch)
-        for soname, path in soname_to_path.items():
-            list_path = path_to_package.get(path)
-            if not list_path and path.startswith("/lib"):
-                list_path = path_to_package.get("/usr" + path)  # usrmerge
-            if list_path:
-                self.soname_to_package[soname] = list_path
+        soname_to_path = self._get_soname_to_path(arch)
+        with _open_path_index(arch, cache_dir) as path_to_package:
+            for soname, path in soname_to_path.items():
+                list_path = path_to_package.get(path)
+                if not list_path and path.startswith("/lib"):
+                    list_path = path_to_package.get("/usr" + path)  # usrmerge
+                if list_path:
+                    self.soname_to_package[soname] = list_path
         emit.debug(f"shlibdeps: {len(self.soname_to_package)} library map entries")
 
     @staticmethod
-    def _get_path_to_package(arch: str) -> dict[str, str]:
-        index: dict[str, str] = {}
-        list_files = _DPKG_INFO_DIR.glob(f"*:{arch}.list")
+    def _get_soname_to_path(arch: str) -> dict[str, str]:
+        """Read the dynamic linker cache to obtain the libraries of an architecture.
 
-        for list_file in list_files:
-            with list_file.open("r", encoding="utf-8") as f:
-                pkg_name = list_file.stem.split(":", 1)[0]
-                for raw_line in f:
-                    line = raw_line.strip()
-                    if ".so." in line:
-                        index[line] = pkg_name
+        If the cache cannot be read, ldconfig is used to list the libraries of
+        all architectures instead.
+        """
+        try:
+            return ld_cache.get_soname_paths(arch, _LD_CACHE_FILE)
+        except (OSError, ld_cache.UnsupportedCacheError) as err:
+            emit.debug(f"shlibdeps: cannot read linker cache ({err}), run ldconfig")
 
-        return index
+        return _LibraryMap._run_ldconfig()
 
     @staticmethod
-    def _get_soname_to_path() -> dict[str, str]:
+    def _run_ldconfig() -> dict[str, str]:
         """Run ldconfig -p to obtain the current linker cache."""
         try:
             res = subprocess.run(
@@ -90,6 +252,29 @@ class _LibraryMap:
         return mapping
 
 
+@contextlib.contextmanager
+def _open_path_index(
+    arch: str, cache_dir: pathlib.Path | None
+) -> Iterator[Mapping[str, str] | _PathIndex]:
+    """Open the index of the shared library paths installed by packages.
+
+    :param arch: The architecture of the packages.
+    :param cache_dir: The directory to keep the persistent index in, if any.
+
+    :returns: A context manager yielding the library path index.
+    """
+    stamp = _get_dpkg_stamp()
+    if cache_dir is None or stamp is None:
+        yield _read_library_paths(arch)
+        return
+
+    index = _PathIndex(cache_dir / f"dpkg-paths-{arch}.idx", arch, stamp)
+    try:
+        yield index
+    finally:
+        index.close()
+
+
 class _SonameMap(dict[str, str]):
     """Mapping of soname to dependency."""
 
@@ -229,6 +414,8 @@ class Shlibdeps(Helper):
         prime_dir: pathlib.Path,
         state_dir: pathlib.Path,
         state_dir_map: dict[str, pathlib.Path],
+        elf_index: ElfIndex | None = None,
+        cache_dir: pathlib.Path | None = None,
         **kwargs: Any,  # noqa: ARG002
     ) -> None:
         """Find shared library dependencies.
@@ -238,22 +425,32 @@ class Shlibdeps(Helper):
         :param prime_dir: Directory containing the primed package files.
         :param state_dir: Directory for storing helper state files.
         :param state_dir_map: Mapping of package names to their state directories.
+        :param elf_index: Index of the ELF files analyzed during the build.
+        :param cache_dir: Directory to keep the library path index in.
         """
-        primed_elf_files = get_elf_files(prime_dir)
+        primed_elf_files = get_elf_files(prime_dir, cache=elf_index)
 
-        # Needed libraries and undefined symbols in primed ELF files.
+        # Needed libraries and undefined symbols in primed ELF files. Versioned
+        # symbols are bound to the library providing their version, and only
+        # the remaining symbols are checked against every needed library.
         needed_libs: list[ElfLibrary] = []
+        bound_symbols: dict[str, set[str]] = {}
         undefined_symbols: set[str] = set()
 
         # Obtain the list of dependencies from all primed ELF files.
         for elf_file in primed_elf_files:
             needed_libs += elf_file.needed
-            undefined_symbols.update(elf_file.read_symbols())
+            for symbol in elf_file.read_symbols():
+                soname = elf_file.symbol_libraries.get(symbol)
+                if soname is None:
+                    undefined_symbols.add(symbol)
+                else:
+                    bound_symbols.setdefault(soname, set()).add(symbol)
 
         # Deduplicate list of needed libraries, keeping the original order.
         unique_needed_libs = list(dict.fromkeys(needed_libs))
 
-        self._setup_shlibdeps(arch, state_dir_map)
+        self._setup_shlibdeps(arch, state_dir_map, cache_dir)
         assert self._deb_info_shlibs is not None  # noqa: S101 Type narrowing
         assert self._deb_info_symbols is not None  # noqa: S101 Type narrowing
 
@@ -269,7 +466,12 @@ class Shlibdeps(Helper):
             # Check symbols
             emit.debug(f"shlibdeps: check library: {lib}")
 
-            if self._add_deb_info_symbol_deps(lib, undefined_symbols, pkg_versions):
+            if self._add_deb_info_symbol_deps(
+                lib,
+                bound_symbols.get(lib.soname, set()),
+                undefined_symbols,
+                pkg_versions,
+            ):
                 continue
 
             if self._add_packaged_shlibs_deps(package_name, lib, pkg_deps):
@@ -295,27 +497,58 @@ class Shlibdeps(Helper):
     def _add_deb_info_symbol_deps(
         self,
         lib: ElfLibrary,
+        bound_symbols: set[str],
         undefined_symbols: set[str],
         pkg_versions: dict[str, set[str]],
     ) -> bool:
-        found_symbols: set[str] = set()
-
-        for symbol in undefined_symbols:
-            assert self._deb_info_symbols is not None  # noqa: S101 Type narrowing
-            pkg, ver = self._deb_info_symbols.get((lib.soname, symbol), ("", ""))
-            if pkg and ver:
-                if pkg not in pkg_versions:
-                    pkg_versions[pkg] = set()
-                pkg_versions[pkg].add(ver)
-                found_symbols.add(symbol)
-                emit.debug(
-                    f"shlibdeps: found symbol ({lib.soname}, {symbol}) -> ({pkg}, {ver})"
-                )
+        """Add the package versions providing the symbols used from a library.
+
+        :param lib: The needed library.
+        :param bound_symbols: The versioned symbols provided by this library.
+        :param undefined_symbols: The symbols not bound to a library. Symbols
+            found in this library are removed from the set.
+        :param pkg_versions: The map of package names to the symbol versions
+            to update.
+
+        :returns: Whether any symbol was found in the library.
+        """
+        found = False
+        for symbol in bound_symbols:
+            found |= self._add_symbol_version(lib, symbol, pkg_versions)
+
+        found_symbols = {
+            symbol
+            for symbol in undefined_symbols
+            if self._add_symbol_version(lib, symbol, pkg_versions)
+        }
 
         # Stop looking for symbols we already found
         undefined_symbols -= found_symbols
 
-        return bool(found_symbols)
+        return found or bool(found_symbols)
+
+    def _add_symbol_version(
+        self, lib: ElfLibrary, symbol: str, pkg_versions: dict[str, set[str]]
+    ) -> bool:
+        """Add the package version providing a symbol, if known.
+
+        :param lib: The library providing the symbol.
+        :param symbol: The symbol name.
+        :param pkg_versions: The map of package names to the symbol versions
+            to update.
+
+        :returns: Whether the symbol was found in the library symbols file.
+        """
+        assert self._deb_info_symbols is not None  # noqa: S101 Type narrowing
+        pkg, ver = self._deb_info_symbols.get((lib.soname, symbol), ("", ""))
+        if not (pkg and ver):
+            return False
+
+        pkg_versions.setdefault(pkg, set()).add(ver)
+        emit.debug(
+            f"shlibdeps: found symbol ({lib.soname}, {symbol}) -> ({pkg}, {ver})"
+        )
+        return True
 
     def _add_packaged_shlibs_deps(
         self, package_name: str, lib: ElfLibrary, pkg_deps: set[str]
@@ -342,10 +575,13 @@ class Shlibdeps(Helper):
             pkg_deps.add(raw_deps)
 
     def _setup_shlibdeps(
-        self, arch: str, state_dir_map: dict[str, pathlib.Path]
+        self,
+        arch: str,
+        state_dir_map: dict[str, pathlib.Path],
+        cache_dir: pathlib.Path | None,
     ) -> None:
         if self._libmap is None:
-            self._libmap = _LibraryMap(arch)
+            self._libmap = _LibraryMap(arch, cache_dir)
 
         if self._deb_info_symbols is None:
             self._deb_info_symbols = _SymbolMap(self._libmap)
@@ -16,16 +16,31 @@
 
 """Debcraft strip helper."""
 
+import dataclasses
+import functools
+import os
 import pathlib
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 from craft_cli import emit
 
 from debcraft import errors
-from debcraft.elf import elf_utils
+from debcraft.elf import ElfFile, ElfIndex, StripCache, elf_utils
 
-from .helpers import Helper
+from .helpers import Helper, get_debug_file_path
+
+# The maximum size of the file names passed to a strip invocation, well below
+# the command line length limit of the system.
+_MAX_ARGS_SIZE = 128 * 1024
+
+# The number of batches of files submitted to each worker.
+_BATCHES_PER_WORKER = 4
+
+_MISSING_TOOL_MESSAGE = (
+    "required tool {tool!r} not found on PATH; install the 'binutils' package"
+)
 
 
 class Strip(Helper):
@@ -33,23 +48,334 @@ class Strip(Helper):
 
     The strip helper will:
     - Scan part install dir for ELF files
-    - Split debug symbols into separate debug packages (not currently implemented)
-    - Call the strip tool on the installed ELF files
+    - Split debug symbols into separate debug files, to be shipped in debug
+      symbol packages
+    - Call the strip tool on the installed ELF files that have a symbol table
+      or debug sections, or reuse the files stripped in previous builds
     """
 
-    def run(self, *, install_dir: pathlib.Path, **kwargs: Any) -> None:  # noqa: ARG002
+    def run(
+        self,
+        *,
+        install_dir: pathlib.Path,
+        elf_index: ElfIndex | None = None,
+        debug_dir: pathlib.Path | None = None,
+        split_debug: bool = False,
+        compress_debug: bool = False,
+        strip_cache: StripCache | None = None,
+        max_workers: int | None = None,
+        **kwargs: Any,  # noqa: ARG002
+    ) -> None:
         """Strip installed files in the given package.
 
+        Files are stripped in parallel, largest first, and small files are
+        grouped so that each strip invocation handles many of them. Hard links
+        to the same file are stripped once, and copies of a file with the same
+        build ID are stripped together so that their debug file is split once.
+        Progress is reported in directory order.
+
         :param install_dir: the directory containing the files to be stripped.
+        :param elf_index: the index of the ELF files analyzed during the build.
+        :param debug_dir: the directory to store the split debug files in.
+        :param split_debug: whether to keep the debug information of files with
+            a build ID in separate debug files before stripping them.
+        :param compress_debug: whether to compress the sections of the split
+            debug files.
+        :param strip_cache: the cache of files stripped in previous builds.
+        :param max_workers: the number of files stripped in parallel. If None,
+            one file per CPU is stripped at a time.
         """
-        installed_elf_files = elf_utils.get_elf_files(install_dir)
+        installed_elf_files = elf_utils.get_elf_files(install_dir, cache=elf_index)
+        elf_files = _get_strippable(installed_elf_files, install_dir)
+        links = _group_hard_links(elf_files)
+        first_paths = {path: first for first, group in links.items() for path in group}
 
-        for elf_file in installed_elf_files:
-            rel_path = elf_file.path.relative_to(install_dir)
-            try:
-                emit.progress(f"Strip binary: {rel_path!s}")
-                subprocess.run(["strip", "--strip-unneeded", elf_file.path], check=True)
-            except subprocess.CalledProcessError as error:
-                raise errors.DebcraftError(
-                    f"cannot strip {rel_path!s}", details=error.stderr
+        debug_files = {}
+        if split_debug and debug_dir:
+            debug_files = {
+                elf_file.path: debug_dir / get_debug_file_path(elf_file.build_id)
+                for elf_file in elf_files
+                if elf_file.build_id and elf_file.path in links
+            }
+
+        # Start with the largest files so they don't delay the end of the step.
+        sizes = {path: path.stat().st_size for path in links}
+        schedule = sorted(sizes, key=sizes.__getitem__, reverse=True)
+        workers = max_workers or os.cpu_count() or 1
+
+        executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            cache_keys: dict[pathlib.Path, str] = {}
+            if strip_cache:
+                options = _get_cache_options(
+                    split_debug=bool(debug_files), compress_debug=compress_debug
+                )
+                cache_keys, cached = _restore_cached(
+                    executor, strip_cache, options, links, debug_files
                 )
+                emit.debug(f"Reuse {len(cached)} stripped files from cache")
+            else:
+                cached = set()
+
+            pending = [path for path in schedule if path not in cached]
+            futures = {}
+            for batch in _make_batches(
+                _group_copies(pending, debug_files), sizes, workers
+            ):
+                batch_debug_files = {
+                    path: debug_files[path] for path in batch if path in debug_files
+                }
+                future = executor.submit(
+                    _strip_batch, batch, batch_debug_files, compress_debug
+                )
+                futures.update(dict.fromkeys(batch, future))
+
+            for elf_file in elf_files:
+                rel_path = elf_file.path.relative_to(install_dir)
+                path = first_paths[elf_file.path]
+                if path not in cached:
+                    failures = futures[path].result()
+                    if path in failures:
+                        raise errors.DebcraftError(
+                            f"cannot strip {rel_path!s}", details=failures[path]
+                        )
+                    if strip_cache and path == elf_file.path:
+                        strip_cache.put(cache_keys[path], path, debug_files.get(path))
+                emit.progress(f"Strip binary: {rel_path!s}")
+
+                # Stripping keeps the dynamic section and symbols, so the analysis
+                # still applies to the stripped file and its primed copies.
+                if elf_index:
+                    stripped = dataclasses.replace(elf_file, strippable=False)
+                    elf_index.put(stripped, elf_file.path.stat())
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+        if elf_index:
+            elf_index.commit()
+        if strip_cache:
+            strip_cache.trim()
+
+
+def _get_strippable(
+    elf_files: list[ElfFile], install_dir: pathlib.Path
+) -> list[ElfFile]:
+    """Select the ELF files that have symbols or debug information to strip.
+
+    :param elf_files: The installed ELF files.
+    :param install_dir: The part install directory.
+
+    :return: The ELF files to strip.
+    """
+    strippable = []
+    for elf_file in elf_files:
+        if elf_file.strippable:
+            strippable.append(elf_file)
+        else:
+            rel_path = elf_file.path.relative_to(install_dir)
+            emit.debug(f"Skip stripped binary: {rel_path!s}")
+    return strippable
+
+
+def _group_hard_links(
+    elf_files: list[ElfFile],
+) -> dict[pathlib.Path, list[pathlib.Path]]:
+    """Group the paths of the ELF files that are hard links to the same file.
+
+    :param elf_files: The ELF files to strip.
+
+    :return: The paths of each file, keyed by its first path.
+    """
+    inodes: dict[tuple[int, int], list[pathlib.Path]] = {}
+    for elf_file in elf_files:
+        st = elf_file.path.stat()
+        inodes.setdefault((st.st_dev, st.st_ino), []).append(elf_file.path)
+    return {group[0]: group for group in inodes.values()}
+
+
+def _group_copies(
+    paths: list[pathlib.Path], debug_files: dict[pathlib.Path, pathlib.Path]
+) -> list[list[pathlib.Path]]:
+    """Group the copies of a file that share the same debug file.
+
+    :param paths: The files to strip, in scheduling order.
+    :param debug_files: The debug files to create for the ELF files.
+
+    :return: The groups of files to strip in the same batch, in scheduling
+        order.
+    """
+    groups: dict[pathlib.Path, list[pathlib.Path]] = {}
+    for path in paths:
+        groups.setdefault(debug_files.get(path, path), []).append(path)
+    return list(groups.values())
+
+
+def _get_cache_options(*, split_debug: bool, compress_debug: bool) -> list[str]:
+    """Obtain the options that affect the stripped files.
+
+    :param split_debug: Whether the debug information is split.
+    :param compress_debug: Whether the debug file sections are compressed.
+
+    :return: The options identifying the stripped output in the strip cache.
+    """
+    return [
+        _get_binutils_version(),
+        "--strip-unneeded",
+        f"split-debug={split_debug}",
+        f"compress-debug={compress_debug}",
+    ]
+
+
+@functools.cache
+def _get_binutils_version() -> str:
+    """Obtain the version of the binary utilities used to strip files.
+
+    :return: The first line of the strip tool version information.
+    """
+    try:
+        result = subprocess.run(
+            ["strip", "--version"], check=True, capture_output=True, text=True
+        )
+    except subprocess.CalledProcessError as err:
+        raise errors.DebcraftError(f"error obtaining the strip version: {err.stderr}")
+    except FileNotFoundError:
+        raise errors.DebcraftError(_MISSING_TOOL_MESSAGE.format(tool="strip"))
+    return result.stdout.partition("\n")[0]
+
+
+def _restore_cached(
+    executor: ThreadPoolExecutor,
+    strip_cache: StripCache,
+    options: list[str],
+    links: dict[pathlib.Path, list[pathlib.Path]],
+    debug_files: dict[pathlib.Path, pathlib.Path],
+) -> tuple[dict[pathlib.Path, str], set[pathlib.Path]]:
+    """Replace the files found in the strip cache by their stripped version.
+
+    Hard links to the same file are looked up and restored once, through
+    their first path.
+
+    :param executor: The executor to read the files with.
+    :param strip_cache: The strip cache.
+    :param options: The options that affect the stripped output.
+    :param links: The paths of each file to strip, keyed by its first path.
+    :param debug_files: The debug files to create for the ELF files.
+
+    :return: The cache key of each file, and the files found in the cache,
+        both keyed by their first path.
+    """
+    paths = list(links)
+    keys = executor.map(lambda path: strip_cache.key(path, options), paths)
+    cache_keys = dict(zip(paths, keys, strict=True))
+
+    def restore(path: pathlib.Path) -> bool:
+        return strip_cache.get(
+            cache_keys[path], path, debug_files.get(path), links=links[path][1:]
+        )
+
+    found = executor.map(restore, paths)
+    cached = {path for path, hit in zip(paths, found, strict=True) if hit}
+    return cache_keys, cached
+
+
+def _make_batches(
+    groups: list[list[pathlib.Path]], sizes: dict[pathlib.Path, int], workers: int
+) -> list[list[pathlib.Path]]:
+    """Group files to be stripped by a single strip invocation.
+
+    Batches are limited by the length of the command line, and by the size
+    of their files so that the work is spread across the workers. Groups of
+    files larger than the size limit are stripped on their own, and the files
+    of a group are never split across batches.
+
+    :param groups: The groups of files to strip, in scheduling order.
+    :param sizes: The size of each file.
+    :param workers: The number of workers.
+
+    :return: The batches of files, in scheduling order.
+    """
+    paths = [path for group in groups for path in group]
+    max_size = sum(sizes[path] for path in paths) // (workers * _BATCHES_PER_WORKER) + 1
+    batches: list[list[pathlib.Path]] = []
+    batch: list[pathlib.Path] = []
+    batch_size = 0
+    batch_args = 0
+
+    for group in groups:
+        size = sum(sizes[path] for path in group)
+        args = sum(len(os.fsencode(path)) + 1 for path in group)
+        if batch and (
+            batch_size + size > max_size or batch_args + args > _MAX_ARGS_SIZE
+        ):
+            batches.append(batch)
+            batch, batch_size, batch_args = [], 0, 0
+        batch.extend(group)
+        batch_size += size
+        batch_args += args
+
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def _strip_batch(
+    paths: list[pathlib.Path],
+    debug_files: dict[pathlib.Path, pathlib.Path],
+    compress_debug: bool,  # noqa: FBT001
+) -> dict[pathlib.Path, str]:
+    """Split the debug information of a batch of files and strip them.
+
+    objcopy handles a single file per invocation, so each file with a debug
+    file costs two of them: one to extract the debug information, and one to
+    strip the file and link it to its debug file. Copies of a file share its
+    debug file, which is only extracted once. The other files are stripped
+    with a single strip invocation. If it fails, each file is stripped on its
+    own to find the files that cannot be stripped.
+
+    :param paths: The ELF files to strip.
+    :param debug_files: The debug files to create for the ELF files.
+    :param compress_debug: Whether to compress the debug file sections.
+
+    :return: The error output for each file that failed.
+    """
+    failures = {}
+    split: dict[pathlib.Path, str | None] = {}
+    compress = ["--compress-debug-sections=zlib"] if compress_debug else []
+    for path, debug_file in debug_files.items():
+        if debug_file not in split:
+            debug_file.parent.mkdir(parents=True, exist_ok=True)
+            split[debug_file] = _run_tool(
+                ["objcopy", "--only-keep-debug", *compress, path, debug_file]
+            )
+        error = split[debug_file]
+        if error is None:
+            debuglink = f"--add-gnu-debuglink={debug_file}"
+            error = _run_tool(["objcopy", "--strip-unneeded", debuglink, path])
+        if error is not None:
+            failures[path] = error
+
+    paths = [path for path in paths if path not in debug_files]
+    error = _run_tool(["strip", "--strip-unneeded", *paths]) if paths else None
+    if error is not None and len(paths) == 1:
+        failures[paths[0]] = error
+    elif error is not None:
+        for path in paths:
+            error = _run_tool(["strip", "--strip-unneeded", path])
+            if error is not None:
+                failures[path] = error
+
+    return failures
+
+
+def _run_tool(args: list[str | pathlib.Path]) -> str | None:
+    """Run a binary utility.
+
+    :param args: The command line.
+
+    :return: The error output of the tool if it failed, or None.
+    """
+    try:
+        result = subprocess.run(args, check=False, capture_output=True, text=True)
+    except FileNotFoundError:
+        raise errors.DebcraftError(_MISSING_TOOL_MESSAGE.format(tool=args[0]))
+    return result.stderr if result.returncode else None
@@ -16,10 +16,17 @@
 
 """Debcraft models."""
 
+from debcraft.models.config import DebcraftConfig
 from debcraft.models.metadata import Metadata
 from debcraft.models.project import Project
 from debcraft.models.package import Package
 from debcraft.models.control import DebianBinaryPackageControl
 
 
-__all__ = ["Project", "Package", "DebianBinaryPackageControl", "Metadata"]
+__all__ = [
+    "Project",
+    "Package",
+    "DebianBinaryPackageControl",
+    "DebcraftConfig",
+    "Metadata",
+]
@@ -0,0 +1,109 @@
+#  This file is part of debcraft.
+#
+#  Copyright 2026 Canonical Ltd.
+#
+#  This program is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranties of MERCHANTABILITY,
+#  SATISFACTORY QUALITY, or FITNESS FOR A PARTICULAR PURPOSE.
+#  See the GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along
+#  with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Configuration model for Debcraft."""
+
+import craft_application
+import pydantic
+
+from debcraft.models.const import FsyncPolicy
+
+
+class DebcraftConfig(craft_application.ConfigModel):
+    """Debcraft application configuration.
+
+    Configuration items can be set with ``DEBCRAFT_`` prefixed environment
+    variables, for example ``DEBCRAFT_ZSTD_WINDOW_LOG=27``.
+    """
+
+    zstd_long_distance: bool | None = None
+    """Whether to use zstd long-distance matching for data tarballs.
+
+    If unset, long-distance matching is enabled for packages with a payload
+    larger than 256 MiB.
+    """
+
+    zstd_window_log: int | None = None
+    """The base 2 logarithm of the zstd window size used for data tarballs.
+
+    Values are limited to the range 10-27 so that packages can be unpacked by
+    dpkg without raising its decompression memory limit. If unset, the default
+    window for the compression level is used, or the largest allowed window if
+    long-distance matching is enabled.
+    """
+
+    zstd_seekable: bool = False
+    """Whether to create seekable data tarballs.
+
+    Seekable tarballs are made of independent zstd frames that start at file
+    boundaries, followed by a seek table in a skippable frame. They allow
+    debcraft to read single files without decompressing the whole tarball, at
+    the cost of a slightly larger package. Unpacking them requires a dpkg that
+    decompresses multi-frame zstd streams; some releases, such as dpkg 1.21.22
+    in Debian 12, stop after the first frame.
+    """
+
+    output_fsync: FsyncPolicy = "dir"
+    """When to flush created packages to permanent storage.
+
+    Packages are always written to a temporary file that replaces the output
+    file once complete. With ``file``, the package contents are synced before
+    the replacement, and with ``dir`` the output directory is synced as well so
+    that the new package survives a crash. ``none`` skips syncing, which is
+    faster for throwaway builds such as CI runs.
+    """
+
+    dbgsym: bool = False
+    """Whether to create debug symbols packages.
+
+    When enabled, the debug information of installed ELF files that have a GNU
+    build ID is kept in separate files before the files are stripped. The debug
+    files of each package are shipped in a ``<package>-dbgsym`` package, under
+    ``/usr/lib/debug/.build-id``, where debuggers find them.
+    """
+
+    dbgsym_compress: bool = False
+    """Whether to compress the debug sections of the split debug files.
+
+    Compressed debug files make smaller debug symbols packages, and are read by
+    current versions of gdb and other debugging tools.
+    """
+
+    strip_cache_size: int = pydantic.Field(default=1024, ge=0)
+    """The maximum size of the cache of stripped files, in MiB.
+
+    Installed ELF files with the same contents as a file stripped in a previous
+    build are replaced by the cached stripped file instead of being stripped
+    again. The least recently used files are evicted once the cache exceeds this
+    size. ``0`` disables the cache.
+    """
+
+    update_index: bool = False
+    """Whether to update an APT package index in the output directory.
+
+    When enabled, the ``Packages``, ``Packages.zst`` and ``Release`` files in the
+    output directory are updated with the created packages, so the directory can
+    be used as a flat APT repository. Existing entries are kept without reading
+    their packages again.
+    """
+
+    delta_from: str | None = None
+    """A directory containing previous versions of the created packages.
+
+    When set, a delta against the most recent previous version of each package
+    found in this directory is written next to the package, with a ``.delta``
+    suffix. Deltas are applied with ``debcraft apply-delta``.
+    """
@@ -20,3 +20,11 @@ from typing import Literal
 
 CommonBaseStr = Literal["ubuntu@22.04", "ubuntu@24.04", "ubuntu@26.04"]
 BaseStr = CommonBaseStr
+
+FsyncPolicy = Literal["none", "file", "dir"]
+"""When to flush written files to permanent storage.
+
+- ``none``: never call fsync.
+- ``file``: sync file contents before the file is moved into place.
+- ``dir``: also sync the containing directory after the file is moved.
+"""
@@ -30,6 +30,9 @@ def register_services() -> None:
     ServiceFactory.register(
         "lifecycle", "Lifecycle", module="debcraft.services.lifecycle"
     )
+    ServiceFactory.register(
+        "elf_index", "ElfIndexService", module="debcraft.services.elf_index"
+    )
 
 
 __all__ = ["BuildPlan", "ServiceFactory"]
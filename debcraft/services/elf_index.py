@@ -0,0 +1,48 @@
+#  This file is part of debcraft.
+#
+#  Copyright 2026 Canonical Ltd.
+#
+#  This program is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranties of MERCHANTABILITY,
+#  SATISFACTORY QUALITY, or FITNESS FOR A PARTICULAR PURPOSE.
+#  See the GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along
+#  with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Debcraft ELF index service."""
+
+from craft_application import AppMetadata, AppService
+from craft_application.services import ServiceFactory
+
+from debcraft.elf import ElfCache, ElfIndex
+
+# The ELF analysis cache, relative to the project work directory.
+_ELF_CACHE_FILE = "elf-cache.db"
+
+
+class ElfIndexService(AppService):
+    """Index of the ELF files analyzed during the build.
+
+    The index is shared by the install helpers, which analyze the installed
+    files of each part, and the packaging helpers, which look up the primed
+    copies of the same files.
+    """
+
+    def __init__(self, app: AppMetadata, services: ServiceFactory) -> None:
+        super().__init__(app, services)
+        self._index: ElfIndex | None = None
+
+    def get(self) -> ElfIndex:
+        """Obtain the ELF index for this build.
+
+        :returns: The ELF index, backed by the persistent ELF cache.
+        """
+        if self._index is None:
+            work_dir = self._services.get("lifecycle").project_info.dirs.work_dir
+            self._index = ElfIndex(ElfCache(work_dir / _ELF_CACHE_FILE))
+        return self._index
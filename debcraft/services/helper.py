@@ -28,9 +28,14 @@ from craft_platforms import BuildInfo
 from typing_extensions import Self
 
 from debcraft import models
+from debcraft.elf import ElfIndex
 from debcraft.helpers import InstallHelpers, PackagingHelpers
+from debcraft.services.elf_index import ElfIndexService
 from debcraft.services.lifecycle import Lifecycle
 
+# The split debug files of each part, relative to the project work directory.
+_DEBUG_DIR = "debug"
+
 
 class InstallHelpersRunner:
     """Run debcraft install helpers."""
@@ -42,6 +47,7 @@ class InstallHelpersRunner:
         build_info: BuildInfo,
         step_info: StepInfo,
         lifecycle: Lifecycle,
+        elf_index: ElfIndex,
     ) -> None:
         self._project = project
         self._project_info = project_info
@@ -49,8 +55,13 @@ class InstallHelpersRunner:
         self._step_info = step_info
         self._lifecycle = lifecycle
         self._helpers = InstallHelpers()
+        self._elf_index = elf_index
+        self._debug_dir = project_info.dirs.work_dir / _DEBUG_DIR / step_info.part_name
 
     def __enter__(self) -> Self:
+        # The part was built again, so the debug files of its previous build
+        # are stale.
+        shutil.rmtree(self._debug_dir, ignore_errors=True)
         return self
 
     def __exit__(self, *exc: object) -> None:
@@ -79,6 +90,8 @@ class InstallHelpersRunner:
             "install_dirs": self._step_info.part_install_dirs,
             "is_native": self._step_info.is_native,
             "partition_dir": self._project_info.partition_dir,
+            "elf_index": self._elf_index,
+            "debug_dir": self._debug_dir,
         }
         common_kwargs |= kwargs
 
@@ -101,6 +114,7 @@ class PackagingHelpersRunner:
         project_info: ProjectInfo,
         build_info: BuildInfo,
         lifecycle: Lifecycle,
+        elf_index: ElfIndex,
     ) -> None:
         self._project = project
         self._project_info = project_info
@@ -108,6 +122,8 @@ class PackagingHelpersRunner:
         self._lifecycle = lifecycle
         self._temp_dir = tempfile.TemporaryDirectory()
         self._helpers = PackagingHelpers()
+        self._elf_index = elf_index
+        self._prime_dirs: dict[str, pathlib.Path] = {}
 
     def __enter__(self) -> Self:
         return self
@@ -115,10 +131,29 @@ class PackagingHelpersRunner:
     def __exit__(self, *exc: object) -> None:
         self._temp_dir.cleanup()
 
-    def run(self, helper_name: str, **kwargs: Any) -> None:
+    def add_package(
+        self, name: str, package: models.Package, prime_dir: pathlib.Path
+    ) -> None:
+        """Add a package generated during packaging, such as a debug package.
+
+        Helpers run after this call also create the added package.
+
+        :param name: The name of the package.
+        :param package: The package model.
+        :param prime_dir: The directory containing the package payload files.
+        """
+        packages = {**(self._project.packages or {}), name: package}
+        self._project = self._project.model_copy(update={"packages": packages})
+        self._prime_dirs[name] = prime_dir
+
+    def run(
+        self, helper_name: str, *, added_packages: bool = True, **kwargs: Any
+    ) -> None:
         """Run the specified helper.
 
         :param helper_name: The name of the helper to run.
+        :param added_packages: Whether to also run the helper for the packages
+            added with :meth:`add_package`.
         :param kwargs: Optional arguments to the helper.
         """
         project = self._project
@@ -129,8 +164,13 @@ class PackagingHelpersRunner:
         emit.debug(f"run {helper_name} helper for all packages...")
 
         for package_name, package in project.packages.items():
+            if not added_packages and package_name in self._prime_dirs:
+                continue
+
             partition_dir = self._project_info.partition_dir
-            prime_dir = self._lifecycle.get_prime_dir(package_name)
+            prime_dir = self._prime_dirs.get(package_name)
+            if prime_dir is None:
+                prime_dir = self._lifecycle.get_prime_dir(package_name)
             arch = _get_architecture(package, self._build_info)
             if not arch:
                 continue
@@ -166,6 +206,8 @@ class PackagingHelpersRunner:
                 "project": project,
                 "package_name": package_name,
                 "state_dir_map": state_dir_map,
+                "elf_index": self._elf_index,
+                "debug_dir": self._project_info.dirs.work_dir / _DEBUG_DIR,
             }
             common_kwargs |= kwargs
 
@@ -190,8 +232,9 @@ class HelperService(AppService):
         project_info = self._services.get("lifecycle").project_info
         build_info = self._services.get("build_plan").plan()[0]
         lifecycle = cast(Lifecycle, self._services.lifecycle)
+        elf_index = cast(ElfIndexService, self._services.get("elf_index")).get()
         return InstallHelpersRunner(
-            project, project_info, build_info, step_info, lifecycle
+            project, project_info, build_info, step_info, lifecycle, elf_index
         )
 
     def packaging_helpers(self) -> PackagingHelpersRunner:
@@ -203,7 +246,10 @@ class HelperService(AppService):
         project_info = self._services.get("lifecycle").project_info
         build_info = self._services.get("build_plan").plan()[0]
         lifecycle = cast(Lifecycle, self._services.lifecycle)
-        return PackagingHelpersRunner(project, project_info, build_info, lifecycle)
+        elf_index = cast(ElfIndexService, self._services.get("elf_index")).get()
+        return PackagingHelpersRunner(
+            project, project_info, build_info, lifecycle, elf_index
+        )
 
 
 def _get_architecture(package: models.Package, build_info: BuildInfo) -> str | None:
@@ -29,10 +29,14 @@ from craft_parts.steps import Step
 from typing_extensions import override
 
 from debcraft import errors, models
+from debcraft.elf import StripCache
 
 if TYPE_CHECKING:
     from debcraft.services.helper import HelperService
 
+# The cache of stripped files, relative to the project work directory.
+_STRIP_CACHE_DIR = "strip-cache"
+
 
 class Lifecycle(LifecycleService):
     """Debcraft specialization of the Lifecycle Service."""
@@ -99,13 +103,25 @@ class Lifecycle(LifecycleService):
             return True
 
         helper_service = cast("HelperService", self._services.helper)
+        config = self._services.get("config")
+        strip_cache = None
+        if cache_size := config.get("strip_cache_size"):
+            strip_cache = StripCache(
+                self.project_info.dirs.work_dir / _STRIP_CACHE_DIR,
+                max_size=cache_size * 1024 * 1024,
+            )
 
         with helper_service.install_helpers(step_info) as helper:
             helper.run("lintian")
             helper.run("installdocs")
             helper.run("installchangelogs")
             helper.run("installdebconf")
-            helper.run("strip")
+            helper.run(
+                "strip",
+                split_debug=config.get("dbgsym"),
+                compress_debug=config.get("dbgsym_compress"),
+                strip_cache=strip_cache,
+            )
 
         return True
 
@@ -17,12 +17,15 @@
 """Package service for debcraft."""
 
 import pathlib
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import cast
 
 from craft_application import services
+from craft_cli import emit
 from typing_extensions import override
 
-from debcraft import models
+from debcraft import archive, models, util
+from debcraft.models.const import FsyncPolicy
 from debcraft.services.helper import HelperService
 
 
@@ -41,16 +44,60 @@ class Package(services.PackageService):
             return []
 
         helper_service = cast(HelperService, self._services.helper)
+        config = self._services.get("config")
+        work_dir = self._services.get("lifecycle").project_info.dirs.work_dir
         debs: list[pathlib.Path] = []
+        dbgsym_packages: dict[str, tuple[models.Package, pathlib.Path]] = {}
+        data_tarballs: dict[str, Future[None]] = {}
+        tarball_options = {
+            "zstd_long_distance": config.get("zstd_long_distance"),
+            "zstd_window_log": config.get("zstd_window_log"),
+            "zstd_seekable": config.get("zstd_seekable"),
+        }
+
+        with (
+            helper_service.packaging_helpers() as helper,
+            ThreadPoolExecutor() as executor,
+        ):
+            if config.get("dbgsym"):
+                helper.run("makedbgsym", dbgsym_packages=dbgsym_packages)
+            for name, (dbgsym, dbgsym_dir) in dbgsym_packages.items():
+                helper.add_package(name, dbgsym, dbgsym_dir)
 
-        with helper_service.packaging_helpers() as helper:
             helper.run("compress")
             helper.run("fixperms")
+            # The prime directory contents are final from this point on, so
+            # the data tarballs are compressed while control files are created.
+            helper.run(
+                "makedata",
+                executor=executor,
+                data_tarballs=data_tarballs,
+                **tarball_options,
+            )
             helper.run("md5sums")
-            helper.run("makeshlibs")
-            helper.run("shlibdeps")
+            # Shared library information is only generated for the main packages.
+            helper.run("makeshlibs", added_packages=False)
+            helper.run("shlibdeps", added_packages=False, cache_dir=work_dir)
             helper.run("gencontrol")
-            helper.run("makedeb", output_dir=dest, deb_list=debs)
+            helper.run(
+                "makedeb",
+                output_dir=dest,
+                deb_list=debs,
+                data_tarballs=data_tarballs,
+                output_fsync=config.get("output_fsync"),
+                **tarball_options,
+            )
+
+        delta_from = config.get("delta_from")
+        if delta_from:
+            for deb in debs:
+                _create_delta(deb, pathlib.Path(delta_from), config.get("output_fsync"))
+
+        if debs and config.get("update_index"):
+            emit.progress("Update package index")
+            index = archive.PackageIndex(dest)
+            index.add(debs)
+            index.write(fsync=config.get("output_fsync"))
 
         return debs
 
@@ -69,3 +116,34 @@ class Package(services.PackageService):
     @override
     def write_metadata(self, path: pathlib.Path) -> None:
         pass
+
+
+def _create_delta(
+    deb: pathlib.Path, previous_dir: pathlib.Path, fsync: FsyncPolicy
+) -> None:
+    """Create a delta against the most recent previous version of a package.
+
+    :param deb: The package to create a delta for.
+    :param previous_dir: The directory containing previous versions.
+    :param fsync: When to flush the delta file to permanent storage.
+    """
+    try:
+        name, version, arch = deb.stem.split("_")
+    except ValueError:
+        emit.debug(f"Cannot parse package file name {deb.name}")
+        return
+
+    previous: dict[str, pathlib.Path] = {}
+    for path in previous_dir.glob(f"{name}_*_{arch}.deb"):
+        parts = path.stem.split("_")
+        if len(parts) == 3 and parts[1] != version:  # noqa: PLR2004
+            previous[parts[1]] = path
+
+    previous_version = util.get_max_debian_version(set(previous))
+    if previous_version is None:
+        emit.progress(f"No previous version of {deb.name} to create a delta")
+        return
+
+    delta_file = deb.with_suffix(".delta")
+    emit.progress(f"Create delta {delta_file.name} from version {previous_version}")
+    archive.create_delta(previous[previous_version], deb, delta_file, fsync=fsync)
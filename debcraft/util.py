@@ -16,12 +16,19 @@
 
 """Utilities for debcraft."""
 
+import contextlib
 import functools
+import os
+import pathlib
 import platform
+import secrets
+from collections.abc import Iterator
+from typing import BinaryIO
 
 import apt_pkg
 
 from debcraft import errors
+from debcraft.models.const import FsyncPolicy
 
 _ARCH_TRIPLETS = {
     "aarch64": "aarch64-linux-gnu",
@@ -68,3 +75,74 @@ def get_max_debian_version(versions: set[str]) -> str | None:
         return None
 
     return max(versions, key=functools.cmp_to_key(apt_pkg.version_compare))
+
+
+def iter_tree(
+    directory: str | pathlib.Path, prefix: str = ""
+) -> Iterator[tuple[str, str]]:
+    """Walk a directory tree in the order its files are packed in a tarball.
+
+    Entries are sorted by name, and directories are listed before their
+    contents. Symbolic links to directories are not followed.
+
+    :param directory: The directory to walk.
+    :param prefix: The prefix of the relative paths.
+
+    :returns: An iterator of the file paths and their paths relative to the
+        directory.
+    """
+    with os.scandir(directory) as it:
+        entries = sorted(it, key=lambda entry: entry.name)
+
+    for entry in entries:
+        relpath = prefix + entry.name
+        yield entry.path, relpath
+        if entry.is_dir(follow_symlinks=False):
+            yield from iter_tree(entry.path, relpath + "/")
+
+
+@contextlib.contextmanager
+def atomic_write(
+    path: pathlib.Path, *, fsync: FsyncPolicy = "dir"
+) -> Iterator[BinaryIO]:
+    """Write a file atomically.
+
+    Data is written to a hidden temporary file in the destination directory,
+    which only replaces ``path`` once it was completely written. An interrupted
+    write leaves any previous file untouched.
+
+    :param path: The file to write.
+    :param fsync: When to flush the written data to permanent storage.
+
+    :returns: A context manager yielding the file object to write to.
+    """
+    directory = path.parent
+    fd, temp_path = _open_temp_file(directory, path.name)
+
+    try:
+        with os.fdopen(fd, "wb") as f:
+            yield f
+            f.flush()
+            if fsync != "none":
+                os.fsync(f.fileno())
+        temp_path.replace(path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+
+    if fsync == "dir":
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def _open_temp_file(directory: pathlib.Path, name: str) -> tuple[int, pathlib.Path]:
+    while True:
+        temp_path = directory / f".{name}.{secrets.token_hex(4)}.tmp"
+        try:
+            fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+        except FileExistsError:
+            continue
+        return fd, temp_path
@@ -0,0 +1,77 @@
+#  This file is part of debcraft.
+#
+#  Copyright 2026 Canonical Ltd.
+#
+#  This program is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranties of MERCHANTABILITY,
+#  SATISFACTORY QUALITY, or FITNESS FOR A PARTICULAR PURPOSE.
+#  See the GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along
+#  with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Tests for the ar archive writer."""
+
+import subprocess
+
+import pytest
+from debcraft import errors
+from debcraft.archive import ArWriter
+
+
+def test_ar_writer(tmp_path):
+    member = tmp_path / "member"
+    member.write_bytes(b"odd")
+    archive = tmp_path / "test.a"
+
+    with archive.open("wb") as f:
+        ar_writer = ArWriter(f)
+        ar_writer.add_data("debian-binary", b"2.0\n")
+        ar_writer.add_file("member", member)
+        ar_writer.add_data("last", b"content")
+
+    data = archive.read_bytes()
+    assert data.startswith(
+        b"!<arch>\ndebian-binary   0           0     0     100644  4         `\n"
+    )
+    # 8 bytes magic, 3 headers, 4 + 4 + 8 bytes of padded data.
+    assert len(data) == 8 + 3 * 60 + 4 + 4 + 8
+
+    listing = subprocess.run(
+        ["ar", "t", archive], check=True, capture_output=True, text=True
+    ).stdout
+    assert listing.split() == ["debian-binary", "member", "last"]
+
+    for name, content in [
+        ("debian-binary", b"2.0\n"),
+        ("member", b"odd"),
+        ("last", b"content"),
+    ]:
+        extracted = subprocess.run(
+            ["ar", "p", archive, name], check=True, capture_output=True
+        ).stdout
+        assert extracted == content
+
+
+@pytest.mark.parametrize("name", ["a" * 17, "dir/file"])
+def test_ar_writer_invalid_name(tmp_path, name):
+    with (tmp_path / "test.a").open("wb") as f:
+        ar_writer = ArWriter(f)
+        with pytest.raises(ValueError, match="invalid ar member name"):
+            ar_writer.add_data(name, b"")
+
+
+def test_ar_writer_member_too_large(tmp_path):
+    archive = tmp_path / "test.a"
+    with archive.open("wb") as f:
+        ar_writer = ArWriter(f)
+        with pytest.raises(errors.DebcraftError, match="'member' is too large"):
+            ar_writer._write_header("member", 10**10)
+        # The largest size that fits in the header is accepted.
+        ar_writer._write_header("member", 10**10 - 1)
+
+    assert archive.read_bytes().endswith(b"9999999999`\n")
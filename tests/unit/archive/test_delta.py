@@ -0,0 +1,166 @@
+#  This file is part of debcraft.
+#
+#  Copyright 2026 Canonical Ltd.
+#
+#  This program is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranties of MERCHANTABILITY,
+#  SATISFACTORY QUALITY, or FITNESS FOR A PARTICULAR PURPOSE.
+#  See the GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along
+#  with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Tests for binary deltas between package versions."""
+
+import io
+import lzma
+import random
+import tarfile
+
+import pytest
+from debcraft import errors
+from debcraft.archive import (
+    ArWriter,
+    apply_delta,
+    create_delta,
+    delta,
+    read_delta_header,
+)
+
+
+@pytest.fixture
+def make_version(tmp_path, make_deb):
+    def make_version(version, files, **kwargs):
+        prime_dir = tmp_path / version / "prime"
+        for path, data in files.items():
+            (prime_dir / path).parent.mkdir(parents=True, exist_ok=True)
+            (prime_dir / path).write_bytes(data)
+        return make_deb(
+            tmp_path / f"hello_{version}_all.deb",
+            prime_dir,
+            {"control": f"Package: hello\nVersion: {version}\n"},
+            generate_md5sums=True,
+            **kwargs,
+        )
+
+    return make_version
+
+
+def _tarball(files):
+    out = io.BytesIO()
+    with tarfile.open(fileobj=out, mode="w") as tar:
+        for path, data in files.items():
+            tarinfo = tarfile.TarInfo(path)
+            tarinfo.size = len(data)
+            tar.addfile(tarinfo, io.BytesIO(data))
+    return out.getvalue()
+
+
+@pytest.fixture
+def versions():
+    rnd = random.Random(42)  # noqa: S311
+    old_files = {f"usr/lib/file{i}": rnd.randbytes(200_000) for i in range(8)}
+    new_files = dict(old_files)
+    new_files["usr/lib/file1"] = rnd.randbytes(1000)
+    new_files["usr/lib/renamed"] = new_files.pop("usr/lib/file2")
+    new_files["usr/share/new"] = b"new file\n"
+    del new_files["usr/lib/file3"]
+    return old_files, new_files
+
+
+@pytest.mark.parametrize(
+    ("long_distance", "seekable"),
+    [
+        pytest.param(False, False, id="default"),
+        pytest.param(True, False, id="long-distance"),
+        pytest.param(False, True, id="seekable"),
+    ],
+)
+def test_delta_roundtrip(tmp_path, make_version, versions, long_distance, seekable):
+    old_files, new_files = versions
+    old_deb = make_version(
+        "1.0", old_files, long_distance=long_distance, seekable=seekable
+    )
+    new_deb = make_version(
+        "2.0", new_files, long_distance=long_distance, seekable=seekable
+    )
+    delta_file = tmp_path / "hello.delta"
+    output = tmp_path / "output.deb"
+
+    create_delta(old_deb, new_deb, delta_file)
+    apply_delta(old_deb, delta_file, output)
+
+    assert output.read_bytes() == new_deb.read_bytes()
+    # Only the changed file and the metadata are stored.
+    assert delta_file.stat().st_size < 10_000
+    assert read_delta_header(delta_file)["name"] == "hello_2.0_all.deb"
+
+
+def test_delta_not_reproducible(tmp_path, make_version, versions):
+    """Data tarballs that cannot be recompressed are stored in full."""
+    old_files, new_files = versions
+    old_deb = make_version("1.0", old_files)
+
+    new_deb = tmp_path / "hello_2.0_all.deb"
+    with new_deb.open("wb") as f:
+        ar_writer = ArWriter(f)
+        ar_writer.add_data("debian-binary", b"2.0\n")
+        ar_writer.add_data(
+            "control.tar.xz", lzma.compress(_tarball({"control": b"Package: hello\n"}))
+        )
+        ar_writer.add_data("data.tar.xz", lzma.compress(_tarball(new_files)))
+
+    delta_file = tmp_path / "hello.delta"
+    output = tmp_path / "output.deb"
+    create_delta(old_deb, new_deb, delta_file)
+    apply_delta(old_deb, delta_file, output)
+
+    assert output.read_bytes() == new_deb.read_bytes()
+
+
+def test_apply_delta_wrong_package(tmp_path, make_version, versions):
+    old_files, new_files = versions
+    old_deb = make_version("1.0", old_files)
+    new_deb = make_version("2.0", new_files)
+    delta_file = tmp_path / "hello.delta"
+    output = tmp_path / "output.deb"
+    create_delta(old_deb, new_deb, delta_file)
+
+    with pytest.raises(errors.DebcraftError, match="does not apply to hello_2.0"):
+        apply_delta(new_deb, delta_file, output)
+
+    assert not output.exists()
+
+
+def test_apply_delta_mismatch(mocker, tmp_path, make_version, versions):
+    old_files, new_files = versions
+    old_deb = make_version("1.0", old_files)
+    new_deb = make_version("2.0", new_files)
+    delta_file = tmp_path / "hello.delta"
+    output = tmp_path / "output.deb"
+    create_delta(old_deb, new_deb, delta_file)
+
+    # Corrupt the data copied from the old package.
+    iter_range = delta._iter_range
+
+    def corrupt(fileobj, offset, size):
+        for chunk in iter_range(fileobj, offset, size):
+            yield bytes(len(chunk))
+
+    mocker.patch.object(delta, "_iter_range", side_effect=corrupt)
+    with pytest.raises(errors.DebcraftError, match="package does not match"):
+        apply_delta(old_deb, delta_file, output)
+
+    assert not output.exists()
+
+
+def test_apply_delta_invalid(tmp_path):
+    delta_file = tmp_path / "hello.delta"
+    delta_file.write_bytes(b"garbage")
+
+    with pytest.raises(errors.DebcraftError, match="is not a delta file"):
+        apply_delta(tmp_path / "old.deb", delta_file, tmp_path / "output.deb")
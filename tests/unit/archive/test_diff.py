@@ -0,0 +1,149 @@
+#  This file is part of debcraft.
+#
+#  Copyright 2026 Canonical Ltd.
+#
+#  This program is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranties of MERCHANTABILITY,
+#  SATISFACTORY QUALITY, or FITNESS FOR A PARTICULAR PURPOSE.
+#  See the GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along
+#  with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Tests for package contents comparison."""
+
+import os
+import shutil
+
+import pytest
+from debcraft.archive import (
+    Change,
+    ChangeKind,
+    FileEntry,
+    FileType,
+    diff_manifests,
+    read_manifest,
+)
+
+
+@pytest.fixture
+def prime_dir(tmp_path):
+    prime_dir = tmp_path / "prime"
+    (prime_dir / "usr/share/doc").mkdir(parents=True)
+    (prime_dir / "usr/share/doc/hello").write_text("hello world")
+    (prime_dir / "usr/share/doc/hello").chmod(0o644)
+    (prime_dir / "usr/share/doc/old").write_text("old")
+    (prime_dir / "usr/share/doc/link").symlink_to("hello")
+    return prime_dir
+
+
+def _control(md5sums_text):
+    return {"control": "Package: hello\n", "md5sums": md5sums_text}
+
+
+def _modify(prime_dir):
+    doc_dir = prime_dir / "usr/share/doc"
+    (doc_dir / "hello").write_text("HELLO WORLD")
+    (doc_dir / "hello").chmod(0o755)
+    (doc_dir / "old").unlink()
+    (doc_dir / "new").write_text("new file")
+    (doc_dir / "link").unlink()
+    (doc_dir / "link").symlink_to("new")
+
+
+def test_read_manifest_deb(tmp_path, make_deb, prime_dir):
+    md5sums_text = "5eb63bbbe01eeed093cb22bb8f5acdc3  usr/share/doc/hello\n"
+    deb = make_deb(tmp_path / "hello.deb", prime_dir, _control(md5sums_text))
+
+    manifest = read_manifest(deb)
+
+    assert list(manifest) == [
+        "usr",
+        "usr/share",
+        "usr/share/doc",
+        "usr/share/doc/hello",
+        "usr/share/doc/link",
+        "usr/share/doc/old",
+    ]
+    assert manifest["usr/share/doc/hello"] == FileEntry(
+        FileType.FILE, 0o644, size=11, digest="5eb63bbbe01eeed093cb22bb8f5acdc3"
+    )
+    assert manifest["usr/share/doc/link"].linkname == "hello"
+    # Files not listed in md5sums are hashed from the data tarball.
+    assert manifest["usr/share/doc/old"].digest == "149603e6c03516362a8da23f624db945"
+
+
+def test_read_manifest_directory(prime_dir):
+    manifest = read_manifest(prime_dir)
+
+    entry = manifest["usr/share/doc/hello"]
+    assert (entry.type, entry.mode, entry.size) == (FileType.FILE, 0o644, 11)
+    assert entry.digest is None
+    assert entry.get_digest() == "5eb63bbbe01eeed093cb22bb8f5acdc3"
+    assert manifest["usr/share/doc"].type == FileType.DIRECTORY
+    assert manifest["usr/share/doc/link"] == FileEntry(
+        FileType.SYMLINK, 0o777, linkname="hello"
+    )
+
+
+def test_diff_manifests_identical(tmp_path, make_deb, prime_dir):
+    deb = make_deb(tmp_path / "hello.deb", prime_dir, _control(""))
+
+    assert diff_manifests(read_manifest(deb), read_manifest(prime_dir)) == []
+
+
+def test_diff_manifests_hardlink(tmp_path, make_deb, prime_dir):
+    doc_dir = prime_dir / "usr/share/doc"
+    os.link(doc_dir / "hello", doc_dir / "same")
+    deb = make_deb(tmp_path / "hello.deb", prime_dir, _control(""))
+
+    manifest = read_manifest(deb)
+
+    assert manifest["usr/share/doc/same"] == manifest["usr/share/doc/hello"]
+    assert manifest["usr/share/doc/same"].type == FileType.FILE
+    assert diff_manifests(manifest, read_manifest(prime_dir)) == []
+
+
+def test_diff_manifests(tmp_path, make_deb, prime_dir):
+    deb = make_deb(tmp_path / "hello.deb", prime_dir, _control(""))
+    _modify(prime_dir)
+
+    changes = diff_manifests(read_manifest(deb), read_manifest(prime_dir))
+
+    assert [(c.path, c.kind, c.size_delta, c.describe()) for c in changes] == [
+        (
+            "usr/share/doc/hello",
+            ChangeKind.CHANGED,
+            0,
+            ["mode 0644 -> 0755", "contents"],
+        ),
+        ("usr/share/doc/link", ChangeKind.CHANGED, 0, ["target hello -> new"]),
+        ("usr/share/doc/new", ChangeKind.ADDED, 8, []),
+        ("usr/share/doc/old", ChangeKind.REMOVED, -3, []),
+    ]
+
+
+def test_diff_manifests_skips_hashing_on_size_change(tmp_path, make_deb, prime_dir):
+    old_dir = tmp_path / "old"
+    shutil.copytree(prime_dir, old_dir, symlinks=True)
+    (prime_dir / "usr/share/doc/hello").write_text("hello, world")
+    old = read_manifest(old_dir)
+    new = read_manifest(prime_dir)
+
+    changes = diff_manifests(old, new)
+
+    assert changes == [
+        Change(
+            "usr/share/doc/hello",
+            ChangeKind.CHANGED,
+            old["usr/share/doc/hello"],
+            new["usr/share/doc/hello"],
+        )
+    ]
+    assert changes[0].describe() == ["size 11 -> 12"]
+    assert old["usr/share/doc/hello"].digest is None
+    assert new["usr/share/doc/hello"].digest is None
@@ -0,0 +1,158 @@
+#  This file is part of debcraft.
+#
+#  Copyright 2026 Canonical Ltd.
+#
+#  This program is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranties of MERCHANTABILITY,
+#  SATISFACTORY QUALITY, or FITNESS FOR A PARTICULAR PURPOSE.
+#  See the GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along
+#  with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Tests for APT package index generation."""
+
+import hashlib
+import os
+
+import pytest
+import zstandard as zstd
+from debcraft import control, errors
+from debcraft.archive import ArWriter, PackageIndex, index
+
+
+@pytest.fixture
+def write_deb(tmp_path, make_deb):
+    def write_deb(path, name, version="1.0"):
+        control_text = (
+            f"Package: {name}\nVersion: {version}\nArchitecture: all\n"
+            "Description: A package\n Longer text.\n"
+        )
+        return make_deb(path, tmp_path / "prime", {"control": control_text})
+
+    return write_deb
+
+
+def _read_packages(repo_dir):
+    text = (repo_dir / "Packages").read_text()
+    return [control.parse_fields(stanza) for stanza in text.split("\n\n")]
+
+
+def test_add(tmp_path, write_deb):
+    deb = write_deb(tmp_path / "pool/hello_1.0_all.deb", "hello")
+    write_deb(tmp_path / "abc_1.0_all.deb", "abc")
+
+    package_index = PackageIndex(tmp_path)
+    package_index.add([deb, tmp_path / "abc_1.0_all.deb"])
+    package_index.write()
+
+    hello_data = deb.read_bytes()
+    abc_data = (tmp_path / "abc_1.0_all.deb").read_bytes()
+    assert _read_packages(tmp_path) == [
+        {
+            "Package": "abc",
+            "Version": "1.0",
+            "Architecture": "all",
+            "Filename": "abc_1.0_all.deb",
+            "Size": str(len(abc_data)),
+            "MD5sum": hashlib.md5(abc_data).hexdigest(),  # noqa: S324
+            "SHA256": hashlib.sha256(abc_data).hexdigest(),
+            "Description": "A package\nLonger text.",
+        },
+        {
+            "Package": "hello",
+            "Version": "1.0",
+            "Architecture": "all",
+            "Filename": "pool/hello_1.0_all.deb",
+            "Size": str(len(hello_data)),
+            "MD5sum": hashlib.md5(hello_data).hexdigest(),  # noqa: S324
+            "SHA256": hashlib.sha256(hello_data).hexdigest(),
+            "Description": "A package\nLonger text.",
+        },
+    ]
+
+    packages = (tmp_path / "Packages").read_bytes()
+    assert (
+        zstd.ZstdDecompressor().decompress((tmp_path / "Packages.zst").read_bytes())
+        == packages
+    )
+
+    release = control.parse_fields((tmp_path / "Release").read_text())
+    assert list(release) == ["Date", "MD5Sum", "SHA256"]
+    sha256 = release["SHA256"].splitlines()
+    assert (
+        sha256[1] == f"{hashlib.sha256(packages).hexdigest()} {len(packages)} Packages"
+    )
+
+
+def test_add_incremental(mocker, tmp_path, write_deb):
+    hello = write_deb(tmp_path / "hello_1.0_all.deb", "hello")
+    abc = write_deb(tmp_path / "abc_1.0_all.deb", "abc")
+    package_index = PackageIndex(tmp_path)
+    package_index.add([hello, abc])
+    package_index.write()
+    (tmp_path / "Release").write_text("Origin: Me\nMD5Sum:\n old 1 Packages\n")
+
+    spy = mocker.spy(index, "_read_entry")
+    abc = write_deb(tmp_path / "abc_1.0_all.deb", "abc", version="2.0")
+    package_index = PackageIndex(tmp_path)
+    assert len(package_index) == 2
+    package_index.add([abc])
+    package_index.write()
+
+    spy.assert_called_once_with(abc, "abc_1.0_all.deb")
+    assert [p["Version"] for p in _read_packages(tmp_path)] == ["2.0", "1.0"]
+    release = control.parse_fields((tmp_path / "Release").read_text())
+    assert list(release) == ["Origin", "Date", "MD5Sum", "SHA256"]
+
+
+def test_refresh(mocker, tmp_path, write_deb):
+    hello = write_deb(tmp_path / "hello_1.0_all.deb", "hello")
+    abc = write_deb(tmp_path / "abc_1.0_all.deb", "abc")
+    package_index = PackageIndex(tmp_path)
+    assert package_index.refresh() == [abc, hello]
+    package_index.write()
+
+    # Make sure the index is newer than the unchanged package.
+    os.utime(hello, ns=(0, 0))
+    abc.unlink()
+    new = write_deb(tmp_path / "new_1.0_all.deb", "new")
+    os.utime(new, ns=(2**62, 2**62))
+
+    spy = mocker.spy(index, "_read_entry")
+    package_index = PackageIndex(tmp_path)
+    assert package_index.refresh() == [new]
+    package_index.write()
+
+    spy.assert_called_once_with(new, "new_1.0_all.deb")
+    assert [p["Package"] for p in _read_packages(tmp_path)] == ["hello", "new"]
+
+
+def test_add_outside_repository(tmp_path, write_deb):
+    deb = write_deb(tmp_path / "hello_1.0_all.deb", "hello")
+
+    package_index = PackageIndex(tmp_path / "repo")
+    with pytest.raises(errors.DebcraftError, match="is not in the repository"):
+        package_index.add([deb])
+
+
+def test_add_no_control(tmp_path):
+    deb = tmp_path / "bad.deb"
+    with deb.open("wb") as f:
+        ar_writer = ArWriter(f)
+        ar_writer.add_data("debian-binary", b"2.0\n")
+
+    package_index = PackageIndex(tmp_path)
+    with pytest.raises(errors.DebcraftError, match="has no valid control file"):
+        package_index.add([deb])
+
+
+def test_invalid_index(tmp_path):
+    (tmp_path / "Packages").write_text("Package: hello\n")
+
+    with pytest.raises(errors.DebcraftError, match="invalid package index"):
+        PackageIndex(tmp_path)
@@ -0,0 +1,225 @@
+#  This file is part of debcraft.
+#
+#  Copyright 2026 Canonical Ltd.
+#
+#  This program is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranties of MERCHANTABILITY,
+#  SATISFACTORY QUALITY, or FITNESS FOR A PARTICULAR PURPOSE.
+#  See the GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along
+#  with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Tests for the streaming deb reader."""
+
+import gzip
+import io
+import lzma
+import tarfile
+
+import pytest
+import zstandard as zstd
+from debcraft import errors
+from debcraft.archive import (
+    ArWriter,
+    SeekableZstdWriter,
+    iter_ar_members,
+    iter_deb_tarballs,
+    normalize_path,
+    read_md5sums,
+)
+
+
+class _Pipe(io.RawIOBase):
+    """A non-seekable stream that returns short reads."""
+
+    def __init__(self, data: bytes) -> None:
+        self._data = io.BytesIO(data)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self._data.read(min(len(buffer), 7))
+        buffer[: len(data)] = data
+        return len(data)
+
+
+def _tarball(files: dict[str, bytes]) -> bytes:
+    out = io.BytesIO()
+    with tarfile.open(fileobj=out, mode="w", format=tarfile.GNU_FORMAT) as tar:
+        for name, data in files.items():
+            tarinfo = tarfile.TarInfo(name)
+            tarinfo.size = len(data)
+            tar.addfile(tarinfo, io.BytesIO(data))
+    return out.getvalue()
+
+
+def _compress(data: bytes, suffix: str) -> bytes:
+    if suffix == ".zst":
+        return zstd.ZstdCompressor().compress(data)
+    if suffix == ".seekable.zst":
+        out = io.BytesIO()
+        with SeekableZstdWriter(
+            out, zstd.ZstdCompressor(), frame_size=512, max_frame_size=1024
+        ) as writer:
+            writer.write(data)
+        return out.getvalue()
+    if suffix == ".xz":
+        return lzma.compress(data)
+    if suffix == ".gz":
+        return gzip.compress(data)
+    return data
+
+
+def _deb(suffix: str = ".zst", version: bytes = b"2.0\n") -> bytes:
+    control = _tarball({"./control": b"Package: hello\n", "./md5sums": b"x  y\n"})
+    data = _tarball({"./usr/share/doc/hello": b"hello world" * 100})
+    ext = suffix.removeprefix(".seekable")
+
+    out = io.BytesIO()
+    ar_writer = ArWriter(out)
+    ar_writer.add_data("debian-binary", version)
+    ar_writer.add_data("control.tar" + ext, _compress(control, suffix))
+    ar_writer.add_data("_extension", b"ignored")
+    ar_writer.add_data("data.tar" + ext, _compress(data, suffix))
+    return out.getvalue()
+
+
+def test_iter_ar_members():
+    out = io.BytesIO()
+    ar_writer = ArWriter(out)
+    ar_writer.add_data("odd", b"abc")
+    ar_writer.add_data("even", b"abcd")
+    ar_writer.add_data("skipped", b"x" * 100)
+    ar_writer.add_data("last", b"")
+    out.seek(0)
+
+    members = []
+    for member, stream in iter_ar_members(out):
+        members.append((member.name, member.size))
+        if member.name != "skipped":
+            assert len(stream.read()) == member.size
+
+    assert members == [("odd", 3), ("even", 4), ("skipped", 100), ("last", 0)]
+
+
+@pytest.mark.parametrize(
+    ("data", "message"),
+    [
+        pytest.param(b"not an archive", "bad magic", id="magic"),
+        pytest.param(b"!<arch>\nshort", "bad member header", id="header"),
+        pytest.param(
+            b"!<arch>\nname            0           0     0     100644  10        `\nab",
+            "truncated member",
+            id="truncated",
+        ),
+    ],
+)
+def test_iter_ar_members_invalid(data, message):
+    def read_all():
+        for _, stream in iter_ar_members(io.BytesIO(data)):
+            stream.read()
+
+    with pytest.raises(errors.DebcraftError, match=message):
+        read_all()
+
+
+@pytest.mark.parametrize("suffix", ["", ".gz", ".xz", ".zst", ".seekable.zst"])
+def test_iter_deb_tarballs(suffix):
+    stream = io.BufferedReader(_Pipe(_deb(suffix)))
+
+    contents = []
+    for kind, tar in iter_deb_tarballs(stream):
+        for tarinfo in tar:
+            data = tar.extractfile(tarinfo)
+            assert data
+            contents.append((kind, normalize_path(tarinfo.name), data.read()))
+
+    assert contents == [
+        ("control", "control", b"Package: hello\n"),
+        ("control", "md5sums", b"x  y\n"),
+        ("data", "usr/share/doc/hello", b"hello world" * 100),
+    ]
+
+
+@pytest.mark.parametrize("suffix", [".gz", ".xz", ".zst"])
+@pytest.mark.parametrize("corruption", ["truncated", "bit-flip"])
+def test_iter_deb_tarballs_corrupt(suffix, corruption):
+    data = _compress(
+        _tarball({"./usr/share/doc/hello": bytes(range(256)) * 20}), suffix
+    )
+    if corruption == "truncated":
+        data = data[: len(data) // 2]
+    else:
+        data = data[:20] + bytes([data[20] ^ 0xFF]) + data[21:]
+    out = io.BytesIO()
+    ar_writer = ArWriter(out)
+    ar_writer.add_data("debian-binary", b"2.0\n")
+    ar_writer.add_data("data.tar" + suffix, data)
+    out.seek(0)
+
+    def read_all():
+        for _, tar in iter_deb_tarballs(out):
+            for tarinfo in tar:
+                member = tar.extractfile(tarinfo)
+                if member:
+                    member.read()
+
+    with pytest.raises(errors.DebcraftError, match="corrupt data tarball"):
+        read_all()
+
+
+def test_iter_deb_tarballs_bad_version():
+    with pytest.raises(errors.DebcraftError, match="unsupported deb format version"):
+        list(iter_deb_tarballs(io.BytesIO(_deb(version=b"3.0\n"))))
+
+
+def test_iter_deb_tarballs_no_debian_binary():
+    out = io.BytesIO()
+    ArWriter(out).add_data("control.tar", b"")
+    out.seek(0)
+
+    with pytest.raises(errors.DebcraftError, match="missing debian-binary"):
+        list(iter_deb_tarballs(out))
+
+
+def test_iter_deb_tarballs_bad_compression():
+    out = io.BytesIO()
+    ar_writer = ArWriter(out)
+    ar_writer.add_data("debian-binary", b"2.0\n")
+    ar_writer.add_data("control.tar.bz2", b"")
+    out.seek(0)
+
+    with pytest.raises(errors.DebcraftError, match="unsupported tarball compression"):
+        list(iter_deb_tarballs(out))
+
+
+@pytest.mark.parametrize(
+    ("name", "path"),
+    [("./usr/bin/x", "usr/bin/x"), ("usr/bin/", "usr/bin"), ("./", "")],
+)
+def test_normalize_path(name, path):
+    assert normalize_path(name) == path
+
+
+@pytest.mark.parametrize(
+    ("files", "expected"),
+    [
+        (
+            {
+                "./control": b"Package: hello\n",
+                "./md5sums": b"abc  usr/bin/hello\ndef  ./usr/share/doc/x y\n\n",
+            },
+            {"usr/bin/hello": "abc", "usr/share/doc/x y": "def"},
+        ),
+        ({"./control": b"Package: hello\n"}, None),
+    ],
+)
+def test_read_md5sums(files, expected):
+    with tarfile.open(fileobj=io.BytesIO(_tarball(files))) as tar:
+        assert read_md5sums(tar) == expected
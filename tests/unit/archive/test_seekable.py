@@ -0,0 +1,136 @@
+#  This file is part of debcraft.
+#
+#  Copyright 2026 Canonical Ltd.
+#
+#  This program is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranties of MERCHANTABILITY,
+#  SATISFACTORY QUALITY, or FITNESS FOR A PARTICULAR PURPOSE.
+#  See the GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along
+#  with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Tests for seekable zstd streams."""
+
+import io
+import os
+import tarfile
+
+import pytest
+import zstandard as zstd
+from debcraft import errors
+from debcraft.archive import SeekableZstdReader, SeekableZstdWriter, read_seek_table
+
+
+def _write(chunks, *, boundaries=True, frame_size=10, max_frame_size=100):
+    out = io.BytesIO()
+    with SeekableZstdWriter(
+        out,
+        zstd.ZstdCompressor(),
+        frame_size=frame_size,
+        max_frame_size=max_frame_size,
+    ) as writer:
+        for chunk in chunks:
+            writer.write(chunk)
+            if boundaries:
+                writer.mark_boundary()
+    return out, writer
+
+
+def test_writer_frames():
+    out, writer = _write([b"a" * 5, b"b" * 5, b"c" * 3, b"d" * 250])
+
+    assert [d for _, d in writer.frames] == [10, 100, 100, 53]
+    assert read_seek_table(out) == writer.frames
+
+
+def test_writer_compatible_with_regular_decoders():
+    data = [os.urandom(50), b"x" * 500, os.urandom(7)]
+    out, _ = _write(data)
+
+    out.seek(0)
+    reader = zstd.ZstdDecompressor().stream_reader(out, read_across_frames=True)
+    assert reader.read() == b"".join(data)
+
+
+def test_writer_empty():
+    out, writer = _write([])
+
+    assert writer.frames == []
+    assert read_seek_table(out) == []
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        pytest.param(b"", id="empty"),
+        pytest.param(b"\x00" * 100, id="zeros"),
+        pytest.param(zstd.ZstdCompressor().compress(b"hello"), id="regular_zstd"),
+    ],
+)
+def test_read_seek_table_not_seekable(data):
+    assert read_seek_table(io.BytesIO(data)) is None
+
+
+def test_read_seek_table_with_offset():
+    out, writer = _write([b"a" * 20, b"b" * 20])
+    stream = out.getvalue()
+    container = io.BytesIO(b"prefix" + stream + b"suffix")
+
+    frames = read_seek_table(container, offset=6, size=len(stream))
+    assert frames == writer.frames
+
+
+def test_read_seek_table_truncated():
+    out, _ = _write([b"a" * 20, b"b" * 20])
+    stream = out.getvalue()
+
+    with pytest.raises(errors.DebcraftError, match="invalid zstd seek table"):
+        read_seek_table(io.BytesIO(stream[10:]))
+
+
+def test_reader_random_access():
+    data = os.urandom(1000)
+    out, writer = _write([data[i : i + 30] for i in range(0, len(data), 30)])
+    container = io.BytesIO(b"prefix" + out.getvalue())
+    frames = read_seek_table(container, offset=6)
+    assert frames is not None
+
+    reader = io.BufferedReader(SeekableZstdReader(container, frames, offset=6))
+    assert reader.read() == data
+
+    for pos, size in [(0, 10), (95, 20), (500, 300), (990, 100), (2000, 5)]:
+        reader.seek(pos)
+        assert reader.read(size) == data[pos : pos + size]
+
+    reader.seek(-10, os.SEEK_END)
+    assert reader.read() == data[-10:]
+
+
+def test_reader_tarfile():
+    members = {f"dir/file{i}": os.urandom(i * 100) for i in range(20)}
+    out = io.BytesIO()
+    with SeekableZstdWriter(
+        out, zstd.ZstdCompressor(), frame_size=1024, max_frame_size=4096
+    ) as writer:
+        with tarfile.open(fileobj=writer, mode="w") as tar:
+            for name, content in members.items():
+                writer.mark_boundary()
+                info = tarfile.TarInfo(name)
+                info.size = len(content)
+                tar.addfile(info, io.BytesIO(content))
+
+    frames = read_seek_table(out)
+    assert frames is not None
+    assert len(frames) > 1
+
+    reader = io.BufferedReader(SeekableZstdReader(out, frames))
+    with tarfile.open(fileobj=reader, mode="r:") as tar:
+        member = tar.extractfile("dir/file17")
+        assert member is not None
+        assert member.read() == members["dir/file17"]
+        assert tar.getnames() == list(members)
@@ -0,0 +1,147 @@
+#  This file is part of debcraft.
+#
+#  Copyright 2026 Canonical Ltd.
+#
+#  This program is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranties of MERCHANTABILITY,
+#  SATISFACTORY QUALITY, or FITNESS FOR A PARTICULAR PURPOSE.
+#  See the GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along
+#  with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Tests for deb package verification."""
+
+import hashlib
+import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from debcraft import errors
+from debcraft.archive import verify, verify_deb
+
+_HELLO_MD5 = "5eb63bbbe01eeed093cb22bb8f5acdc3"
+
+
+@pytest.fixture
+def prime_dir(tmp_path):
+    prime_dir = tmp_path / "prime"
+    (prime_dir / "usr/share/doc").mkdir(parents=True)
+    (prime_dir / "usr/share/doc/hello").write_text("hello world")
+    (prime_dir / "usr/share/doc/big").write_bytes(b"x" * 5000)
+    (prime_dir / "usr/share/doc/link").symlink_to("hello")
+    (prime_dir / "usr/share/doc/outside").symlink_to("/etc/hostname")
+    os.link(prime_dir / "usr/share/doc/big", prime_dir / "usr/share/doc/hardlink")
+    return prime_dir
+
+
+def _control(installed_size):
+    return {"control": f"Package: hello\nInstalled-Size: {installed_size}\n"}
+
+
+@pytest.mark.parametrize(
+    "installed_size",
+    [
+        # Debcraft: 11 + 5000 + 5000 (hard link) + 11 (symlink) bytes.
+        pytest.param(9, id="debcraft"),
+        # dpkg-gencontrol: 1 + 5 KiB for files, 1 KiB each for 3 directories
+        # and 2 symlinks.
+        pytest.param(11, id="dpkg"),
+    ],
+)
+def test_verify_deb(tmp_path, make_deb, prime_dir, installed_size):
+    deb = make_deb(
+        tmp_path / "hello.deb",
+        prime_dir,
+        _control(installed_size),
+        generate_md5sums=True,
+    )
+
+    with deb.open("rb") as f:
+        assert verify_deb(f) == []
+
+
+def test_verify_deb_installed_size(tmp_path, make_deb, prime_dir):
+    deb = make_deb(
+        tmp_path / "hello.deb", prime_dir, _control(100), generate_md5sums=True
+    )
+
+    with deb.open("rb") as f:
+        assert verify_deb(f) == ["Installed-Size is 100, expected 9"]
+
+
+def test_verify_deb_md5sums(tmp_path, make_deb, prime_dir):
+    md5sums_text = (
+        "00000000000000000000000000000000  usr/share/doc/hello\n"
+        f"{_HELLO_MD5}  usr/share/doc/missing\n"
+    )
+    control_files = _control(9) | {"md5sums": md5sums_text}
+    deb = make_deb(tmp_path / "hello.deb", prime_dir, control_files)
+
+    with deb.open("rb") as f:
+        assert verify_deb(f) == [
+            "usr/share/doc/big: not listed in md5sums",
+            "usr/share/doc/hardlink: not listed in md5sums",
+            "usr/share/doc/hello: md5sum mismatch",
+            "usr/share/doc/missing: listed in md5sums but not in package",
+        ]
+
+
+def test_verify_deb_no_md5sums(tmp_path, make_deb, prime_dir):
+    deb = make_deb(tmp_path / "hello.deb", prime_dir, _control(9))
+
+    with deb.open("rb") as f:
+        assert verify_deb(f) == ["missing md5sums file"]
+
+
+@pytest.mark.parametrize(
+    ("corruption", "message"),
+    [
+        pytest.param(
+            "truncated", "invalid ar archive: truncated member", id="truncated"
+        ),
+        pytest.param("bit-flip", "corrupt data tarball", id="bit-flip"),
+    ],
+)
+def test_verify_deb_corrupt(tmp_path, make_deb, prime_dir, corruption, message):
+    deb = make_deb(tmp_path / "hello.deb", prime_dir, _control(9))
+    data = bytearray(deb.read_bytes())
+    if corruption == "truncated":
+        del data[-100:]
+    else:
+        data[data.index(b"data.tar.zst") + 80] ^= 0xFF
+    deb.write_bytes(data)
+
+    with deb.open("rb") as f, pytest.raises(errors.DebcraftError, match=message):
+        verify_deb(f)
+
+
+def test_verify_deb_shared_hasher(tmp_path, make_deb, prime_dir):
+    deb = make_deb(
+        tmp_path / "hello.deb", prime_dir, _control(9), generate_md5sums=True
+    )
+
+    with ThreadPoolExecutor(max_workers=2) as hasher, deb.open("rb") as f:
+        assert verify_deb(f, hasher=hasher) == []
+
+
+def test_hash_stream_parallel(monkeypatch):
+    monkeypatch.setattr(verify, "_HASH_CHUNK_SIZE", 100)
+    streams = [bytes([i]) * (i * 1000 + 1) for i in range(32)]
+    pending = threading.BoundedSemaphore(4)
+
+    with ThreadPoolExecutor(max_workers=4) as hasher:
+        futures = [
+            verify._hash_stream(io.BytesIO(data), hasher, pending) for data in streams
+        ]
+
+    assert [future.result() for future in futures] == [
+        hashlib.md5(data).hexdigest()  # noqa: S324
+        for data in streams
+    ]
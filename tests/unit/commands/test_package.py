@@ -0,0 +1,291 @@
+#  This file is part of debcraft.
+#
+#  Copyright 2026 Canonical Ltd.
+#
+#  This program is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranties of MERCHANTABILITY,
+#  SATISFACTORY QUALITY, or FITNESS FOR A PARTICULAR PURPOSE.
+#  See the GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along
+#  with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Tests for the package commands."""
+
+import argparse
+import grp
+import io
+import os
+import pwd
+import tarfile
+
+import debcraft
+import pytest
+from craft_cli import ArgumentParsingError
+from debcraft import archive, errors
+from debcraft.archive import ArWriter
+from debcraft.commands import (
+    ApplyDeltaCommand,
+    DeltaCommand,
+    DiffCommand,
+    IndexCommand,
+    InspectCommand,
+    VerifyCommand,
+)
+from debcraft.helpers import makedeb
+
+
+@pytest.fixture
+def make_hello_deb(tmp_path, make_deb):
+    def make_hello_deb(*, seekable=False):
+        prime_dir = tmp_path / "prime"
+        (prime_dir / "usr/share/doc").mkdir(parents=True, exist_ok=True)
+        (prime_dir / "usr/share/doc/hello").write_text("hello world")
+        (prime_dir / "usr/share/doc/hello").chmod(0o644)
+        (prime_dir / "usr/share/doc/link").symlink_to("hello")
+        control_files = {
+            "control": "Package: hello\nVersion: 1.0\nInstalled-Size: 0\n",
+            "md5sums": "5eb63bbbe01eeed093cb22bb8f5acdc3  usr/share/doc/hello\n",
+        }
+        return make_deb(
+            tmp_path / "hello_1.0_all.deb", prime_dir, control_files, seekable=seekable
+        )
+
+    return make_hello_deb
+
+
+@pytest.fixture
+def deb_file(make_hello_deb):
+    return make_hello_deb()
+
+
+def _run(deb, *, control=False, md5sums=False, list_=False, extract=None):
+    cmd = InspectCommand({"app": debcraft.METADATA, "services": None})
+    parsed_args = argparse.Namespace(
+        deb=deb, control=control, md5sums=md5sums, list=list_, extract=extract
+    )
+    cmd.run(parsed_args)
+
+
+def test_inspect_default(emitter, deb_file):
+    _run(deb_file)
+
+    owner = f"{pwd.getpwuid(os.getuid()).pw_name}/{grp.getgrgid(os.getgid()).gr_name}"
+
+    emitter.assert_messages(
+        [
+            "Package: hello\nVersion: 1.0\nInstalled-Size: 0",
+            f"drwxr-xr-x {owner}          0 usr",
+            f"drwxr-xr-x {owner}          0 usr/share",
+            f"drwxr-xr-x {owner}          0 usr/share/doc",
+            f"-rw-r--r-- {owner}         11 usr/share/doc/hello",
+            f"lrwxrwxrwx {owner}          0 usr/share/doc/link -> hello",
+        ]
+    )
+
+
+def test_inspect_md5sums(emitter, deb_file):
+    _run(deb_file, md5sums=True)
+
+    emitter.assert_messages(["5eb63bbbe01eeed093cb22bb8f5acdc3  usr/share/doc/hello"])
+
+
+def test_inspect_extract(capsysbinary, deb_file):
+    _run(deb_file, extract="./usr/share/doc/hello")
+
+    assert capsysbinary.readouterr().out == b"hello world"
+
+
+@pytest.fixture
+def seekable_deb_file(mocker, tmp_path, make_hello_deb):
+    mocker.patch.object(makedeb, "_SEEKABLE_FRAME_SIZE", 1024)
+    mocker.patch.object(makedeb, "_SEEKABLE_MAX_FRAME_SIZE", 4096)
+    (tmp_path / "prime/usr/share/doc").mkdir(parents=True)
+    (tmp_path / "prime/usr/share/doc/large").write_bytes(bytes(range(256)) * 64)
+    return make_hello_deb(seekable=True)
+
+
+def test_inspect_extract_seekable(mocker, capsysbinary, seekable_deb_file):
+    spy = mocker.spy(archive.SeekableZstdReader, "_read_frame")
+
+    _run(seekable_deb_file, extract="usr/share/doc/hello")
+
+    assert capsysbinary.readouterr().out == b"hello world"
+    # The frames containing only the data of the large file are skipped.
+    frames_read = {call.args[1] for call in spy.call_args_list}
+    assert len(frames_read) < len(spy.call_args_list[0].args[0]._frames)
+
+
+def test_inspect_extract_seekable_large(capsysbinary, seekable_deb_file):
+    _run(seekable_deb_file, extract="usr/share/doc/large")
+
+    assert capsysbinary.readouterr().out == bytes(range(256)) * 64
+
+
+def test_inspect_extract_seekable_missing(seekable_deb_file):
+    with pytest.raises(errors.DebcraftError, match="'usr/missing' not found"):
+        _run(seekable_deb_file, extract="usr/missing")
+
+
+@pytest.mark.parametrize(
+    ("path", "message"),
+    [
+        ("usr/share/doc/missing", "file 'usr/share/doc/missing' not found"),
+        ("usr/share/doc/link", "'usr/share/doc/link' is not a regular file"),
+    ],
+)
+def test_inspect_extract_error(deb_file, path, message):
+    with pytest.raises(errors.DebcraftError, match=message):
+        _run(deb_file, extract=path)
+
+
+@pytest.mark.parametrize("seekable", [False, True])
+def test_inspect_extract_hard_link(capsysbinary, tmp_path, make_hello_deb, seekable):
+    (tmp_path / "prime/usr/share/doc").mkdir(parents=True)
+    (tmp_path / "prime/usr/share/doc/first").write_text("hard link")
+    os.link(tmp_path / "prime/usr/share/doc/first", tmp_path / "prime/usr/share/doc/z")
+    deb_file = make_hello_deb(seekable=seekable)
+
+    _run(deb_file, extract="usr/share/doc/z")
+
+    assert capsysbinary.readouterr().out == b"hard link"
+
+
+def test_inspect_control_hard_link(emitter, tmp_path):
+    deb_file = tmp_path / "hello.deb"
+    # The control tarball lists md5sums as a hard link to the file before it.
+    control = io.BytesIO()
+    with tarfile.open(fileobj=control, mode="w") as tar:
+        tarinfo = tarfile.TarInfo("./control")
+        tarinfo.size = len(b"Package: hello\n")
+        tar.addfile(tarinfo, io.BytesIO(b"Package: hello\n"))
+        tarinfo = tarfile.TarInfo("./md5sums")
+        tarinfo.type = tarfile.LNKTYPE
+        tarinfo.linkname = "./control"
+        tar.addfile(tarinfo)
+    with deb_file.open("wb") as f:
+        ar_writer = ArWriter(f)
+        ar_writer.add_data("debian-binary", b"2.0\n")
+        ar_writer.add_data("control.tar", control.getvalue())
+
+    _run(deb_file, md5sums=True)
+
+    emitter.assert_messages(["Package: hello"])
+
+
+def test_inspect_corrupt(tmp_path, deb_file):
+    data = bytearray(deb_file.read_bytes())
+    data[data.index(b"data.tar.zst") + 80] ^= 0xFF
+    deb_file.write_bytes(data)
+
+    with pytest.raises(errors.DebcraftError, match="corrupt data tarball"):
+        _run(deb_file, extract="usr/share/doc/hello")
+
+
+def test_inspect_extract_with_list(deb_file):
+    with pytest.raises(ArgumentParsingError, match="--extract cannot be used"):
+        _run(deb_file, list_=True, extract="usr/share/doc/hello")
+
+
+def test_inspect_missing_file(tmp_path):
+    with pytest.raises(errors.DebcraftError, match="cannot read"):
+        _run(tmp_path / "missing.deb")
+
+
+def test_verify(emitter, deb_file):
+    cmd = VerifyCommand({"app": debcraft.METADATA, "services": None})
+    cmd.run(argparse.Namespace(debs=[deb_file], jobs=2))
+
+    emitter.assert_messages([f"{deb_file}: OK"])
+
+
+def test_verify_error(emitter, tmp_path, deb_file):
+    bad_file = tmp_path / "bad.deb"
+    bad_file.write_bytes(b"garbage")
+    corrupt_file = tmp_path / "corrupt.deb"
+    data = bytearray(deb_file.read_bytes())
+    data[data.index(b"data.tar.zst") + 80] ^= 0xFF
+    corrupt_file.write_bytes(data)
+    missing_file = tmp_path / "missing.deb"
+    debs = [bad_file, corrupt_file, deb_file, missing_file]
+
+    cmd = VerifyCommand({"app": debcraft.METADATA, "services": None})
+    with pytest.raises(errors.DebcraftError, match="3 of 4 packages failed"):
+        cmd.run(argparse.Namespace(debs=debs, jobs=2))
+
+    emitter.assert_messages(
+        [
+            f"{bad_file}: invalid ar archive: bad magic",
+            (
+                f"{corrupt_file}: corrupt data tarball: zstd decompress error: "
+                "Data corruption detected"
+            ),
+            f"{deb_file}: OK",
+            f"{missing_file}: cannot read package: No such file or directory",
+        ]
+    )
+
+
+def test_index(emitter, default_factory, deb_file):
+    repo = deb_file.parent
+    cmd = IndexCommand({"app": debcraft.METADATA, "services": default_factory})
+    cmd.run(argparse.Namespace(repo=repo, debs=[], jobs=2))
+    cmd.run(argparse.Namespace(repo=repo, debs=[], jobs=2))
+
+    emitter.assert_messages(
+        ["Indexed 1 packages (1 updated)", "Indexed 1 packages (0 updated)"]
+    )
+    assert "Filename: hello_1.0_all.deb\n" in (repo / "Packages").read_text()
+
+
+def test_delta(emitter, default_factory, tmp_path, deb_file):
+    config = {"app": debcraft.METADATA, "services": default_factory}
+    new_deb = tmp_path / "hello_2.0_all.deb"
+    new_deb.write_bytes(deb_file.read_bytes())
+    delta_file = tmp_path / "hello_2.0_all.delta"
+
+    DeltaCommand(config).run(argparse.Namespace(old=deb_file, new=new_deb, output=None))
+    new_deb.unlink()
+    ApplyDeltaCommand(config).run(
+        argparse.Namespace(old=deb_file, delta=delta_file, output=None)
+    )
+
+    assert new_deb.read_bytes() == deb_file.read_bytes()
+    emitter.assert_message(f"Created package {new_deb}")
+
+
+def test_diff(emitter, tmp_path, deb_file):
+    prime_dir = tmp_path / "prime"
+    (prime_dir / "usr/share/doc/hello").write_text("hello, world")
+    (prime_dir / "usr/share/doc/new").write_text("new")
+    cmd = DiffCommand({"app": debcraft.METADATA, "services": None})
+
+    cmd.run(argparse.Namespace(old=deb_file, new=prime_dir))
+
+    emitter.assert_messages(
+        [
+            "~ usr/share/doc/hello: size 11 -> 12 (+1 bytes)",
+            "+ usr/share/doc/new (+3 bytes)",
+            "1 added, 0 removed, 1 changed, size delta +4 bytes",
+        ]
+    )
+
+
+def test_diff_no_differences(emitter, tmp_path, deb_file):
+    cmd = DiffCommand({"app": debcraft.METADATA, "services": None})
+
+    cmd.run(argparse.Namespace(old=deb_file, new=tmp_path / "prime"))
+
+    emitter.assert_message("No differences")
+
+
+def test_diff_missing_file(tmp_path, deb_file):
+    cmd = DiffCommand({"app": debcraft.METADATA, "services": None})
+    parsed_args = argparse.Namespace(old=tmp_path / "missing.deb", new=deb_file)
+
+    with pytest.raises(errors.DebcraftError, match="cannot compare packages"):
+        cmd.run(parsed_args)
@@ -16,6 +16,8 @@
 """Configuration for debcraft unit tests."""
 
 import pathlib
+import tempfile
+from collections.abc import Callable
 from typing import Any, cast
 
 import craft_application
@@ -25,6 +27,8 @@ import debcraft.services.package
 import debcraft.services.project
 import pytest
 from debcraft import models, services
+from debcraft.archive import ArWriter
+from debcraft.helpers import makedeb, md5sums
 from debcraft.services import lifecycle
 from typing_extensions import override
 
@@ -134,6 +138,9 @@ def default_factory(
     services.ServiceFactory.register("project", fake_project_service_class)
     services.ServiceFactory.register("lifecycle", fake_lifecycle_service_class)
     services.ServiceFactory.register("helper", fake_helper_service_class)
+    services.ServiceFactory.register(
+        "elf_index", "ElfIndexService", module="debcraft.services.elf_index"
+    )
     service_factory = services.ServiceFactory(app=debcraft.METADATA)
     service_factory.update_kwargs("project", project_dir=project_path)
     return service_factory
@@ -157,3 +164,47 @@ def project_service(default_factory) -> debcraft.services.project.Project:
 @pytest.fixture
 def helper_service(default_factory) -> debcraft.services.helper.HelperService:
     return cast(debcraft.services.helper.HelperService, default_factory.helper)
+
+
+@pytest.fixture
+def make_deb(tmp_path: pathlib.Path) -> Callable[..., pathlib.Path]:
+    """Return a factory building deb packages the way makedeb does."""
+
+    def make_deb(
+        deb: pathlib.Path,
+        prime_dir: pathlib.Path,
+        control_files: dict[str, str],
+        *,
+        generate_md5sums: bool = False,
+        long_distance: bool = False,
+        seekable: bool = False,
+    ) -> pathlib.Path:
+        prime_dir.mkdir(parents=True, exist_ok=True)
+        work_dir = pathlib.Path(tempfile.mkdtemp(dir=tmp_path))
+        control_dir = work_dir / "control"
+        control_dir.mkdir()
+        for name, text in control_files.items():
+            (control_dir / name).write_text(text)
+        if generate_md5sums:
+            md5sums.Md5sums().run(prime_dir=prime_dir, control_dir=control_dir)
+
+        params = makedeb._get_zstd_parameters(prime_dir, long_distance=long_distance)
+        makedeb._create_tarball(
+            root=control_dir, dest_file=work_dir / "control.tar.zst"
+        )
+        makedeb._create_tarball(
+            root=prime_dir,
+            dest_file=work_dir / "data.tar.zst",
+            params=params,
+            seekable=seekable,
+        )
+
+        deb.parent.mkdir(parents=True, exist_ok=True)
+        with deb.open("wb") as f:
+            ar_writer = ArWriter(f)
+            ar_writer.add_data("debian-binary", b"2.0\n")
+            ar_writer.add_file("control.tar.zst", work_dir / "control.tar.zst")
+            ar_writer.add_file("data.tar.zst", work_dir / "data.tar.zst")
+        return deb
+
+    return make_deb
@@ -0,0 +1,92 @@
+#  This file is part of debcraft.
+#
+#  Copyright 2026 Canonical Ltd.
+#
+#  This program is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranties of MERCHANTABILITY,
+#  SATISFACTORY QUALITY, or FITNESS FOR A PARTICULAR PURPOSE.
+#  See the GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along
+#  with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Tests for the ELF analysis cache."""
+
+import shutil
+import sqlite3
+
+import pytest
+from debcraft.elf import ElfCache, ElfFile, elf_cache, get_elf_files
+
+
+@pytest.fixture
+def cache_file(tmp_path):
+    return tmp_path / "cache" / "elf-cache.db"
+
+
+def test_elf_cache_roundtrip(tmp_path, cache_file):
+    path = tmp_path / "gzip"
+    shutil.copy("/bin/gzip", path)
+    elf_file = ElfFile.from_path(path)
+
+    with ElfCache(cache_file) as cache:
+        assert cache.get(path, path.stat()) is None
+        cache.put(elf_file, path.stat())
+
+    with ElfCache(cache_file) as cache:
+        assert cache.get(path, path.stat()) == elf_file
+
+
+def test_elf_cache_file_changed(tmp_path, cache_file):
+    path = tmp_path / "gzip"
+    shutil.copy("/bin/gzip", path)
+
+    with ElfCache(cache_file) as cache:
+        cache.put(ElfFile.from_path(path), path.stat())
+        shutil.copy("/bin/true", path)
+        assert cache.get(path, path.stat()) is None
+
+
+def test_elf_cache_schema_version(mocker, tmp_path, cache_file):
+    path = tmp_path / "gzip"
+    shutil.copy("/bin/gzip", path)
+
+    with ElfCache(cache_file) as cache:
+        cache.put(ElfFile.from_path(path), path.stat())
+
+    new_version = elf_cache.SCHEMA_VERSION + 1
+    mocker.patch.object(elf_cache, "SCHEMA_VERSION", new_version)
+    with ElfCache(cache_file) as cache:
+        assert cache.get(path, path.stat()) is None
+
+    with sqlite3.connect(cache_file) as conn:
+        (version,) = conn.execute("PRAGMA user_version").fetchone()
+    assert version == new_version
+
+
+def test_elf_cache_invalid_file(tmp_path, cache_file):
+    cache_file.parent.mkdir()
+    cache_file.write_text("not a database" * 100)
+    path = tmp_path / "gzip"
+    shutil.copy("/bin/gzip", path)
+
+    with ElfCache(cache_file) as cache:
+        assert cache.get(path, path.stat()) is None
+
+
+def test_get_elf_files_cached(mocker, tmp_path, cache_file):
+    shutil.copy("/bin/gzip", tmp_path)
+    shutil.copy("/etc/issue", tmp_path)
+
+    with ElfCache(cache_file) as cache:
+        elf_files = get_elf_files(tmp_path, cache=cache)
+
+    spy = mocker.spy(ElfFile, "from_path")
+    with ElfCache(cache_file) as cache:
+        assert get_elf_files(tmp_path, cache=cache) == elf_files
+    spy.assert_not_called()
+    assert elf_files[0].read_symbols()
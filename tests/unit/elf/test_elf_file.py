@@ -17,13 +17,16 @@
 """Tests for ELF file helpers."""
 
 import pathlib
+import pickle
 import platform
+import shutil
+import subprocess
 
 import pytest
 import pytest_mock
 from craft_application.util import get_host_architecture
 from debcraft import errors, util
-from debcraft.elf import ElfFile, ElfLibrary, elf_file
+from debcraft.elf import ElfFile, ElfLibrary
 from debcraft.elf.elf_file import _get_elf_debian_arch
 from elftools.elf import elffile
 
@@ -128,27 +131,78 @@ def test_get_elf_debian_arch(
     assert debian_arch == arch
 
 
-@pytest.fixture
-def fake_nm_output() -> str:
-    return (
-        "                 U LZ4_versionString\n"
-        "                 w _ITM_deregisterTMCloneTable\n"
-        "                 w _ITM_registerTMCloneTable\n"
-        "                 U __assert_fail@GLIBC_2.2.5\n"
-        "                 w __cxa_finalize@GLIBC_2.2.5\n"
+def test_read_symbols():
+    elf_file = ElfFile.from_path(pathlib.Path("/bin/gzip"))
+
+    symbols = elf_file.read_symbols()
+    assert "getenv@GLIBC_2.2.5" in symbols or "getenv@GLIBC_2.17" in symbols
+    assert any(s.startswith("__libc_start_main@GLIBC_") for s in symbols)
+    # Weak undefined symbols are not included.
+    assert not any(s.startswith("__gmon_start__") for s in symbols)
+    # Defined symbols are not included.
+    assert all("@" in s for s in symbols)
+
+
+def test_symbol_libraries():
+    elf_file = ElfFile.from_path(pathlib.Path("/bin/gzip"))
+
+    assert elf_file.symbol_libraries.keys() == elf_file.undefined_symbols
+    assert set(elf_file.symbol_libraries.values()) == {"libc.so.6"}
+
+
+def test_strippable(tmp_path):
+    path = tmp_path / "gzip"
+    shutil.copy("/bin/gzip", path)
+    subprocess.run(["strip", "--strip-unneeded", path], check=True)
+
+    assert not ElfFile.from_path(path).strippable
+    assert not ElfFile._from_elftools(path).strippable
+
+    subprocess.run(
+        ["objcopy", "--add-section", f".debug_info={path}", path], check=True
     )
 
+    assert ElfFile.from_path(path).strippable
+    assert ElfFile._from_elftools(path).strippable
+
+
+def test_build_id(tmp_path):
+    path = tmp_path / "gzip"
+    shutil.copy("/bin/gzip", path)
+    notes = subprocess.run(
+        ["readelf", "--notes", path], check=True, capture_output=True, text=True
+    ).stdout
+    build_id = notes.split("Build ID: ", 1)[1].split()[0]
+
+    assert ElfFile.from_path(path).build_id == build_id
+    assert ElfFile._from_elftools(path).build_id == build_id
+
+
+def test_elf_library_shared():
+    library = ElfLibrary.from_name("libfoo.so.1")
+
+    assert ElfLibrary.from_name("libfoo.so.1") is library
+    assert pickle.loads(pickle.dumps(library)) is library  # noqa: S301
+
+
+def test_elf_file_interned(tmp_path):
+    # Build the strings at runtime so they are distinct objects.
+    name = "foo"
+    symbol = f"{name}@LIBFOO_1"
+    elf_file = ElfFile(
+        path=tmp_path / "foo",
+        undefined_symbols={symbol},
+        symbol_libraries={symbol: f"lib{name}.so.1"},
+    )
+    other = pickle.loads(pickle.dumps(elf_file))  # noqa: S301
 
-def test_read_undefined_symbols(mocker, fake_nm_output):
-    mock_res = mocker.MagicMock()
-    mock_res.returncode = 0
-    mock_res.stdout = fake_nm_output
+    assert other == elf_file
+    assert isinstance(other.undefined_symbols, frozenset)
+    assert next(iter(other.undefined_symbols)) is next(iter(elf_file.undefined_symbols))
+    (soname,) = other.symbol_libraries.values()
+    assert soname is next(iter(elf_file.symbol_libraries.values()))
 
-    mock_run = mocker.patch("debcraft.elf.elf_file.subprocess.run")
-    mock_run.return_value = mock_res
 
-    symbols = elf_file._read_undefined_symbols(pathlib.Path("/some/path"))
-    assert sorted(symbols) == [
-        "LZ4_versionString",
-        "__assert_fail@GLIBC_2.2.5",
-    ]
+def test_read_symbols_not_dynamic(tmp_path):
+    elf_file = ElfFile(path=tmp_path / "static")
+    assert elf_file.read_symbols() == set()
@@ -0,0 +1,99 @@
+#  This file is part of debcraft.
+#
+#  Copyright 2026 Canonical Ltd.
+#
+#  This program is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranties of MERCHANTABILITY,
+#  SATISFACTORY QUALITY, or FITNESS FOR A PARTICULAR PURPOSE.
+#  See the GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along
+#  with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Tests for the build-scoped ELF index."""
+
+import os
+import shutil
+
+import pytest
+from debcraft.elf import ElfCache, ElfFile, ElfIndex, elf_index, get_elf_files
+
+
+@pytest.fixture
+def installed(tmp_path):
+    path = tmp_path / "install" / "gzip"
+    path.parent.mkdir()
+    shutil.copy("/bin/gzip", path)
+    return path
+
+
+@pytest.fixture
+def index(installed):
+    index = ElfIndex()
+    index.put(ElfFile.from_path(installed), installed.stat())
+    return index
+
+
+def test_elf_index_hardlink(mocker, tmp_path, installed, index):
+    spy = mocker.spy(elf_index, "_digest")
+    primed = tmp_path / "gzip"
+    primed.hardlink_to(installed)
+
+    elf_file = index.get(primed, primed.stat())
+
+    assert elf_file == ElfFile.from_path(primed)
+    assert elf_file.path == primed
+    spy.assert_not_called()
+
+
+def test_elf_index_copy(tmp_path, installed, index):
+    primed = tmp_path / "gzip"
+    shutil.copy2(installed, primed)
+
+    assert index.get(primed, primed.stat()) == ElfFile.from_path(primed)
+
+
+def test_elf_index_copy_different_contents(tmp_path, installed, index):
+    primed = tmp_path / "gzip"
+    data = bytearray(installed.read_bytes())
+    data[-1] ^= 0xFF
+    primed.write_bytes(data)
+    stat = installed.stat()
+    os.utime(primed, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    assert index.get(primed, primed.stat()) is None
+
+
+def test_elf_index_changed(installed, index):
+    shutil.copy("/bin/true", installed)
+
+    assert index.get(installed, installed.stat()) is None
+
+
+def test_elf_index_persistent_cache(tmp_path, installed):
+    cache_file = tmp_path / "elf-cache.db"
+    with ElfCache(cache_file) as cache:
+        ElfIndex(cache).put(ElfFile.from_path(installed), installed.stat())
+
+    with ElfCache(cache_file) as cache:
+        index = ElfIndex(cache)
+        assert index.get(installed, installed.stat()) == ElfFile.from_path(installed)
+
+
+def test_get_elf_files_index(mocker, tmp_path, installed):
+    index = ElfIndex()
+    get_elf_files(installed.parent, cache=index)
+
+    prime_dir = tmp_path / "prime"
+    prime_dir.mkdir()
+    (prime_dir / "gzip").hardlink_to(installed)
+    spy = mocker.spy(ElfFile, "from_path")
+
+    elf_files = get_elf_files(prime_dir, cache=index)
+
+    spy.assert_not_called()
+    assert elf_files == [ElfFile.from_path(prime_dir / "gzip")]
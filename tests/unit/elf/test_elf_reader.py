@@ -0,0 +1,93 @@
+#  This file is part of debcraft.
+#
+#  Copyright 2026 Canonical Ltd.
+#
+#  This program is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranties of MERCHANTABILITY,
+#  SATISFACTORY QUALITY, or FITNESS FOR A PARTICULAR PURPOSE.
+#  See the GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along
+#  with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Tests for the lightweight ELF reader."""
+
+import pathlib
+import shutil
+
+import pytest
+from debcraft import util
+from debcraft.elf import ElfFile, elf_reader
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        pytest.param(pathlib.Path("/bin/gzip"), id="executable"),
+        pytest.param(
+            pathlib.Path("/usr/lib") / util.get_arch_triplet() / "libdl.so.2",
+            id="library",
+        ),
+    ],
+)
+def test_read_elf_info(path):
+    info = elf_reader.read_elf_info(path)
+    expected = ElfFile._from_elftools(path)
+
+    assert info.is_dynamic
+    assert "libc.so.6" in info.needed
+    assert info.undefined_symbols == expected.undefined_symbols
+    assert info.symbol_libraries == expected.symbol_libraries
+    assert ElfFile.from_path(path) == expected
+
+
+def test_read_elf_info_soname():
+    path = pathlib.Path("/usr/lib") / util.get_arch_triplet() / "libdl.so.2"
+
+    assert elf_reader.read_elf_info(path).soname == "libdl.so.2"
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        pytest.param(b"", id="empty"),
+        pytest.param(b"not an ELF file", id="not_elf"),
+        pytest.param(b"\x7fELF\x02\x01\x01", id="truncated_header"),
+        pytest.param(b"\x7fELF\x03\x01\x01" + bytes(64), id="bad_class"),
+    ],
+)
+def test_read_elf_info_unsupported(tmp_path, data):
+    path = tmp_path / "file"
+    path.write_bytes(data)
+
+    with pytest.raises(elf_reader.UnsupportedLayoutError):
+        elf_reader.read_elf_info(path)
+
+
+def test_read_elf_info_truncated(tmp_path):
+    path = tmp_path / "gzip"
+    path.write_bytes(pathlib.Path("/bin/gzip").read_bytes()[:4096])
+
+    with pytest.raises(elf_reader.UnsupportedLayoutError):
+        elf_reader.read_elf_info(path)
+
+
+def test_from_path_fallback(mocker, tmp_path):
+    path = tmp_path / "gzip"
+    shutil.copy("/bin/gzip", path)
+    mocker.patch.object(
+        elf_reader,
+        "read_elf_info",
+        side_effect=elf_reader.UnsupportedLayoutError("unusual layout"),
+    )
+    spy = mocker.spy(ElfFile, "_from_elftools")
+
+    elf_file = ElfFile.from_path(path)
+
+    spy.assert_called_once_with(path)
+    assert elf_file.is_dynamic
+    assert elf_file.read_symbols()
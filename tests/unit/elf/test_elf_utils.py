@@ -16,9 +16,12 @@
 
 """Tests for ELF file helpers."""
 
+import pathlib
 import shutil
 
-from debcraft.elf import elf_utils
+from craft_application.util import get_host_architecture
+from debcraft import util
+from debcraft.elf import ElfFile, elf_utils
 
 
 def test_get_elf_files_recursive(tmp_path):
@@ -44,3 +47,60 @@ def test_get_elf_files_non_recursive(tmp_path):
     elf_files = elf_utils.get_elf_files(tmp_path, recursive=False)
     assert len(elf_files) == 1
     assert elf_files[0].path == tmp_path / "true"
+
+
+def test_get_elf_files_parallel(mocker, tmp_path):
+    mocker.patch.object(elf_utils, "_MIN_PARALLEL_FILES", 0)
+    for name in ("true", "false", "gzip", "ls"):
+        shutil.copy(f"/bin/{name}", tmp_path / name)
+        shutil.copy("/etc/issue", tmp_path / f"{name}.txt")
+
+    serial = elf_utils.get_elf_files(tmp_path, max_workers=1)
+    parallel = elf_utils.get_elf_files(tmp_path, max_workers=2)
+
+    assert len(parallel) == 4
+    assert parallel == serial
+
+
+def test_iter_elf_files_filters(tmp_path):
+    lib_dir = tmp_path / "lib"
+    lib_dir.mkdir()
+    libdl = pathlib.Path("/usr/lib") / util.get_arch_triplet() / "libdl.so.2"
+    shutil.copy(libdl, lib_dir / "libdl.so.2")
+    shutil.copy("/bin/true", lib_dir / "true")
+    (lib_dir / "small").write_bytes(b"\x7fELF")
+
+    def names(**kwargs):
+        return [elf.path.name for elf in elf_utils.iter_elf_files(tmp_path, **kwargs)]
+
+    assert sorted(names()) == ["libdl.so.2", "true"]
+    assert names(patterns=["*.so.*"]) == ["libdl.so.2"]
+    assert names(patterns=["lib/t*"]) == ["true"]
+    assert names(with_soname=True) == ["libdl.so.2"]
+    assert sorted(names(arch=get_host_architecture())) == ["libdl.so.2", "true"]
+    assert names(arch="s390x") == []
+    sizes = {name: (lib_dir / name).stat().st_size for name in ("libdl.so.2", "true")}
+    largest = max(sizes, key=lambda name: sizes[name])
+    assert names(min_size=sizes[largest]) == [largest]
+    assert names(min_size=sizes[largest] + 1) == []
+
+
+def test_iter_elf_files_lazy(mocker, tmp_path):
+    shutil.copy("/bin/true", tmp_path / "true")
+    shutil.copy("/bin/false", tmp_path / "false")
+    spy = mocker.spy(ElfFile, "from_path")
+
+    elf_files = elf_utils.iter_elf_files(tmp_path)
+    spy.assert_not_called()
+    next(elf_files)
+    elf_files.close()
+
+
+def test_iter_elf_files_skips_symlinked_dirs(tmp_path):
+    (tmp_path / "bin").mkdir()
+    shutil.copy("/bin/true", tmp_path / "bin" / "true")
+    (tmp_path / "link").symlink_to("bin")
+
+    elf_files = list(elf_utils.iter_elf_files(tmp_path))
+
+    assert [elf.path for elf in elf_files] == [tmp_path / "bin" / "true"]
@@ -0,0 +1,208 @@
+#  This file is part of debcraft.
+#
+#  Copyright 2026 Canonical Ltd.
+#
+#  This program is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranties of MERCHANTABILITY,
+#  SATISFACTORY QUALITY, or FITNESS FOR A PARTICULAR PURPOSE.
+#  See the GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along
+#  with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Tests for the dynamic linker cache reader."""
+
+import shutil
+import struct
+import subprocess
+
+import pytest
+from debcraft.elf import ld_cache
+
+_X86_64 = 0x0303
+_I386 = 0x0003
+_HWCAPS = 1 << 62
+
+
+def _make_cache(entries, *, hwcaps=(), old_format=False):
+    """Build a cache file with (soname, path, flags, hwcap) entries."""
+    header_size = 48
+    strings = bytearray()
+    # Entries in the legacy format, ignored by the reader, come first.
+    old = b""
+    if old_format:
+        old = struct.pack("=11sxI", b"ld.so-1.7.0", 1) + struct.pack("=iII", 3, 0, 0)
+        old += bytes(-len(old) % 8)
+
+    def add_string(value):
+        offset = header_size + len(entries) * 24 + len(strings)
+        strings.extend(value.encode() + b"\0")
+        return offset
+
+    table = b"".join(
+        struct.pack("=iIIIQ", flags, add_string(soname), add_string(path), 0, hwcap)
+        for soname, path, flags, hwcap in entries
+    )
+    hwcaps_offsets = [add_string(name) for name in hwcaps]
+    extension_offset = 0
+    if hwcaps:
+        strings.extend(bytes(-len(strings) % 8))
+        # Extension offsets are relative to the start of the file.
+        extension_offset = len(old) + header_size + len(table) + len(strings)
+        data_offset = extension_offset + 8 + 16
+        strings.extend(struct.pack("=II", 0xEAA42174, 1))
+        strings.extend(struct.pack("=IIII", 1, 0, data_offset, 4 * len(hwcaps)))
+        strings.extend(struct.pack(f"={len(hwcaps)}I", *hwcaps_offsets))
+
+    header = struct.pack(
+        "=20sII4xI12x",
+        b"glibc-ld.so.cache1.1",
+        len(entries),
+        len(strings),
+        extension_offset,
+    )
+    return old + header + table + bytes(strings)
+
+
+@pytest.fixture
+def cache_file(tmp_path):
+    path = tmp_path / "ld.so.cache"
+    path.write_bytes(
+        _make_cache(
+            [
+                (
+                    "libfoo.so.1",
+                    "/usr/lib/x86_64-linux-gnu/glibc-hwcaps/x86-64-v3/libfoo.so.1",
+                    _X86_64,
+                    _HWCAPS,
+                ),
+                ("libfoo.so.1", "/usr/lib/x86_64-linux-gnu/libfoo.so.1", _X86_64, 0),
+                ("libfoo.so.1", "/usr/lib/i386-linux-gnu/libfoo.so.1", _I386, 0),
+                (
+                    "libbar.so.2",
+                    "/usr/lib/x86_64-linux-gnu/glibc-hwcaps/x86-64-v3/libbar.so.2",
+                    _X86_64,
+                    _HWCAPS,
+                ),
+                (
+                    "libbar.so.2",
+                    "/usr/lib/x86_64-linux-gnu/tls/libbar.so.2",
+                    _X86_64,
+                    1,
+                ),
+                ("libbaz.so.3", "/lib/i386-linux-gnu/libbaz.so.3", _I386, 0),
+            ],
+            hwcaps=["x86-64-v3"],
+        )
+    )
+    return path
+
+
+def test_read_ld_cache(cache_file):
+    entries = ld_cache.read_ld_cache(cache_file)
+
+    assert entries[:3] == [
+        ld_cache.LdCacheEntry(
+            soname="libfoo.so.1",
+            path="/usr/lib/x86_64-linux-gnu/glibc-hwcaps/x86-64-v3/libfoo.so.1",
+            flags=_X86_64,
+            hwcaps="x86-64-v3",
+        ),
+        ld_cache.LdCacheEntry(
+            soname="libfoo.so.1",
+            path="/usr/lib/x86_64-linux-gnu/libfoo.so.1",
+            flags=_X86_64,
+        ),
+        ld_cache.LdCacheEntry(
+            soname="libfoo.so.1",
+            path="/usr/lib/i386-linux-gnu/libfoo.so.1",
+            flags=_I386,
+        ),
+    ]
+    # Entries for legacy hardware capabilities are skipped.
+    assert len(entries) == 5
+
+
+@pytest.mark.parametrize(
+    ("arch", "expected"),
+    [
+        pytest.param(
+            "amd64",
+            {
+                "libfoo.so.1": "/usr/lib/x86_64-linux-gnu/libfoo.so.1",
+                "libbar.so.2": "/usr/lib/x86_64-linux-gnu/glibc-hwcaps/x86-64-v3/libbar.so.2",
+            },
+            id="amd64",
+        ),
+        pytest.param(
+            "i386",
+            {
+                "libfoo.so.1": "/usr/lib/i386-linux-gnu/libfoo.so.1",
+                "libbaz.so.3": "/lib/i386-linux-gnu/libbaz.so.3",
+            },
+            id="i386",
+        ),
+        pytest.param("arm64", {}, id="other-arch"),
+    ],
+)
+def test_get_soname_paths(cache_file, arch, expected):
+    assert ld_cache.get_soname_paths(arch, cache_file) == expected
+
+
+def test_get_soname_paths_all_archs(cache_file):
+    assert ld_cache.get_soname_paths(path=cache_file) == {
+        "libfoo.so.1": "/usr/lib/x86_64-linux-gnu/libfoo.so.1",
+        "libbar.so.2": "/usr/lib/x86_64-linux-gnu/glibc-hwcaps/x86-64-v3/libbar.so.2",
+        "libbaz.so.3": "/lib/i386-linux-gnu/libbaz.so.3",
+    }
+
+
+def test_read_ld_cache_old_format(tmp_path):
+    path = tmp_path / "ld.so.cache"
+    entries = [
+        ("libfoo.so.1", "/usr/lib/libfoo.so.1", _I386, 0),
+        ("libfoo.so.1", "/usr/lib/glibc-hwcaps/i686/libfoo.so.1", _I386, _HWCAPS),
+    ]
+    path.write_bytes(_make_cache(entries, hwcaps=["i686"], old_format=True))
+
+    assert ld_cache.get_soname_paths(path=path) == {
+        "libfoo.so.1": "/usr/lib/libfoo.so.1"
+    }
+    assert ld_cache.read_ld_cache(path)[1].hwcaps == "i686"
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        pytest.param(b"", id="empty"),
+        pytest.param(b"ld.so-1.7.0" + bytes(5), id="old-format-only"),
+        pytest.param(
+            _make_cache([("libfoo.so.1", "/usr/lib/libfoo.so.1", _I386, 0)])[:60],
+            id="truncated",
+        ),
+    ],
+)
+def test_read_ld_cache_unsupported(tmp_path, data):
+    path = tmp_path / "ld.so.cache"
+    path.write_bytes(data)
+
+    with pytest.raises(ld_cache.UnsupportedCacheError):
+        ld_cache.read_ld_cache(path)
+
+
+@pytest.mark.skipif(not shutil.which("ldconfig"), reason="ldconfig not available")
+def test_get_soname_paths_ldconfig():
+    output = subprocess.run(
+        ["ldconfig", "-p"], check=True, capture_output=True, text=True
+    ).stdout
+    expected = {}
+    for line in output.splitlines():
+        if " => " in line:
+            soname, path = line.strip().split(" => ")
+            expected.setdefault(soname.split(" ", 1)[0], path)
+
+    assert ld_cache.get_soname_paths() == expected
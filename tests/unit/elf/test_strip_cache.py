@@ -0,0 +1,132 @@
+#  This file is part of debcraft.
+#
+#  Copyright 2026 Canonical Ltd.
+#
+#  This program is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranties of MERCHANTABILITY,
+#  SATISFACTORY QUALITY, or FITNESS FOR A PARTICULAR PURPOSE.
+#  See the GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along
+#  with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Tests for the cache of stripped ELF files."""
+
+import fcntl
+import os
+import platform
+
+import pytest
+from debcraft.elf import StripCache, strip_cache
+
+
+@pytest.fixture
+def unstripped(tmp_path):
+    path = tmp_path / "foo"
+    path.write_bytes(b"unstripped")
+    return path
+
+
+def test_key(unstripped):
+    cache = StripCache(unstripped.parent / "cache", max_size=1024)
+
+    key = cache.key(unstripped, ["--strip-unneeded"])
+
+    assert key == cache.key(unstripped, ["--strip-unneeded"])
+    assert key != cache.key(unstripped, ["--strip-all"])
+    unstripped.write_bytes(b"changed")
+    assert key != cache.key(unstripped, ["--strip-unneeded"])
+
+
+def test_get_miss(tmp_path, unstripped):
+    cache = StripCache(tmp_path / "cache", max_size=1024)
+
+    assert not cache.get("0123", unstripped)
+    assert unstripped.read_bytes() == b"unstripped"
+
+
+def test_put_get(tmp_path, unstripped):
+    cache = StripCache(tmp_path / "cache", max_size=1024)
+    stripped = tmp_path / "stripped"
+    stripped.write_bytes(b"stripped")
+    unstripped.chmod(0o755)
+
+    cache.put("0123", stripped)
+
+    assert cache.get("0123", unstripped)
+    assert unstripped.read_bytes() == b"stripped"
+    assert unstripped.stat().st_mode & 0o777 == 0o755
+    # No temporary files are left behind.
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["cache", "foo", "stripped"]
+
+
+def test_get_hard_links(tmp_path, unstripped):
+    cache = StripCache(tmp_path / "cache", max_size=1024)
+    stripped = tmp_path / "stripped"
+    stripped.write_bytes(b"stripped")
+    link = tmp_path / "link"
+    link.hardlink_to(unstripped)
+
+    cache.put("0123", stripped)
+
+    assert cache.get("0123", unstripped, links=[link])
+    assert link.read_bytes() == b"stripped"
+    assert link.stat().st_ino == unstripped.stat().st_ino
+    assert unstripped.stat().st_nlink == 2
+
+
+def test_put_get_debug_file(tmp_path, unstripped):
+    cache = StripCache(tmp_path / "cache", max_size=1024)
+    stripped = tmp_path / "stripped"
+    stripped.write_bytes(b"stripped")
+    debug_file = tmp_path / "debug" / "foo.debug"
+
+    cache.put("0123", stripped)
+    # The entry is incomplete if the debug file is needed.
+    assert not cache.get("0123", unstripped, debug_file)
+
+    debug_file.parent.mkdir()
+    debug_file.write_bytes(b"debug")
+    cache.put("0123", stripped, debug_file)
+    debug_file.unlink()
+
+    assert cache.get("0123", unstripped, debug_file)
+    assert unstripped.read_bytes() == b"stripped"
+    assert debug_file.read_bytes() == b"debug"
+
+
+def test_trim(tmp_path):
+    cache_dir = tmp_path / "cache"
+    cache = StripCache(cache_dir, max_size=20)
+    stripped = tmp_path / "stripped"
+    stripped.write_bytes(bytes(10))
+    for mtime, key in enumerate(["old", "used", "new"]):
+        cache.put(key, stripped, stripped if key == "used" else None)
+        os.utime(cache_dir / key, ns=(mtime, mtime))
+    (tmp_path / "file").write_bytes(b"")
+    cache.get("used", tmp_path / "file")
+
+    cache.trim()
+
+    assert sorted(path.name for path in cache_dir.iterdir()) == ["used", "used.debug"]
+
+
+@pytest.mark.parametrize(
+    ("machine", "request_"),
+    [
+        ("x86_64", 0x40049409),
+        ("aarch64", 0x40049409),
+        ("riscv64", 0x40049409),
+        ("ppc64le", 0x80049409),
+        ("mips64", 0x80049409),
+    ],
+)
+def test_get_ficlone_request(monkeypatch, machine, request_):
+    monkeypatch.delattr(fcntl, "FICLONE", raising=False)
+    monkeypatch.setattr(platform, "machine", lambda: machine)
+
+    assert strip_cache._get_ficlone_request() == request_
@@ -40,6 +40,7 @@ def test_run(tmp_path, default_project):
     package.breaks = ["package-2 (<= 1.2.0)", "package-3"]
     package.replaces = ["package-4"]
     package.conflicts = ["package-5"]
+    package.passthrough = {"Auto-Built-Package": "debug-symbols"}
 
     helper = gencontrol.Gencontrol()
     helper.run(
@@ -70,6 +71,7 @@ def test_run(tmp_path, default_project):
         Priority: optional
         Description: A package
          Really a package
+        Auto-Built-Package: debug-symbols
         """
     )
 
@@ -0,0 +1,116 @@
+#  This file is part of debcraft.
+#
+#  Copyright 2026 Canonical Ltd.
+#
+#  This program is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranties of MERCHANTABILITY,
+#  SATISFACTORY QUALITY, or FITNESS FOR A PARTICULAR PURPOSE.
+#  See the GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along
+#  with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Tests for debcraft's makedbgsym helper."""
+
+import pytest
+from debcraft import models
+from debcraft.elf import ElfFile
+from debcraft.helpers import makedbgsym
+
+
+@pytest.fixture
+def debug_dir(tmp_path):
+    build_id_dir = tmp_path / "debug/my-part/usr/lib/debug/.build-id/01"
+    build_id_dir.mkdir(parents=True)
+    (build_id_dir / "23abcd.debug").write_bytes(b"debug info")
+    return tmp_path / "debug"
+
+
+def test_run(mocker, tmp_path, default_project, debug_dir):
+    prime_dir = tmp_path / "prime"
+    state_dir = tmp_path / "state"
+    mocker.patch(
+        "debcraft.helpers.makedbgsym.iter_elf_files",
+        return_value=iter(
+            [
+                ElfFile(path=prime_dir / "foo", build_id="0123abcd"),
+                ElfFile(path=prime_dir / "bar", build_id="4567abcd"),
+                ElfFile(path=prime_dir / "baz"),
+                ElfFile(path=prime_dir / "qux", build_id="89abcdef"),
+            ]
+        ),
+    )
+    other_dir = debug_dir / "other-part/usr/lib/debug/.build-id/89"
+    other_dir.mkdir(parents=True)
+    (other_dir / "abcdef.debug").write_bytes(b"other debug info")
+    dbgsym_packages = {}
+
+    helper = makedbgsym.Makedbgsym()
+    helper.run(
+        prime_dir=prime_dir,
+        state_dir=state_dir,
+        project=default_project,
+        package_name="package-1",
+        arch="amd64",
+        debug_dir=debug_dir,
+        dbgsym_packages=dbgsym_packages,
+    )
+
+    dbgsym_dir = state_dir / "dbgsym"
+    assert dbgsym_packages == {
+        "package-1-dbgsym": (
+            models.Package(
+                summary="debug symbols for package-1",
+                description="This package contains the debug symbols for package-1.",
+                version="2.0",
+                depends=["package-1 (= 2.0)"],
+                section="debug",
+                passthrough={
+                    "Auto-Built-Package": "debug-symbols",
+                    "Build-Ids": "0123abcd 89abcdef",
+                },
+            ),
+            dbgsym_dir,
+        )
+    }
+    debug_file = dbgsym_dir / "usr/lib/debug/.build-id/01/23abcd.debug"
+    other_file = dbgsym_dir / "usr/lib/debug/.build-id/89/abcdef.debug"
+    assert debug_file.read_bytes() == b"debug info"
+    assert other_file.read_bytes() == b"other debug info"
+    assert sorted(p for p in dbgsym_dir.rglob("*") if p.is_file()) == [
+        debug_file,
+        other_file,
+    ]
+
+
+@pytest.mark.parametrize(
+    ("arch", "build_id"),
+    [
+        pytest.param("all", "0123abcd", id="arch-all"),
+        pytest.param("amd64", "4567abcd", id="no-debug-file"),
+    ],
+)
+def test_run_no_dbgsym(mocker, tmp_path, default_project, debug_dir, arch, build_id):
+    mocker.patch(
+        "debcraft.helpers.makedbgsym.iter_elf_files",
+        return_value=iter([ElfFile(path=tmp_path / "foo", build_id=build_id)]),
+    )
+    dbgsym_packages = {}
+
+    helper = makedbgsym.Makedbgsym()
+    helper.run(
+        prime_dir=tmp_path / "prime",
+        state_dir=tmp_path / "state",
+        project=default_project,
+        package_name="package-1",
+        arch=arch,
+        debug_dir=debug_dir,
+        dbgsym_packages=dbgsym_packages,
+    )
+
+    assert dbgsym_packages == {}
+    assert not (tmp_path / "state").exists()
@@ -0,0 +1,285 @@
+#  This file is part of debcraft.
+#
+#  Copyright 2026 Canonical Ltd.
+#
+#  This program is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranties of MERCHANTABILITY,
+#  SATISFACTORY QUALITY, or FITNESS FOR A PARTICULAR PURPOSE.
+#  See the GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along
+#  with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Tests for debcraft's makedeb helper."""
+
+import io
+import os
+import subprocess
+import tarfile
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pytest
+import zstandard as zstd
+from debcraft import errors
+from debcraft.archive import SeekableZstdReader, read_seek_table
+from debcraft.helpers import makedeb
+
+
+@pytest.fixture
+def package_dirs(tmp_path):
+    prime_dir = tmp_path / "prime"
+    control_dir = tmp_path / "control"
+    deb_dir = tmp_path / "deb"
+    output_dir = tmp_path / "output"
+    for directory in (prime_dir, control_dir, deb_dir, output_dir):
+        directory.mkdir()
+
+    (prime_dir / "usr" / "bin").mkdir(parents=True)
+    (prime_dir / "usr" / "bin" / "foo").write_text("foo content")
+    (control_dir / "control").write_text("Package: package-1\n")
+
+    return prime_dir, control_dir, deb_dir, output_dir
+
+
+def _list_ar_members(ar_path):
+    result = subprocess.run(
+        ["ar", "t", str(ar_path)], check=True, capture_output=True, text=True
+    )
+    return result.stdout.strip().splitlines()
+
+
+def _list_tarball(path):
+    with path.open("rb") as f:
+        with zstd.ZstdDecompressor().stream_reader(f) as reader:
+            with tarfile.open(fileobj=reader, mode="r|") as tar:
+                return [member.name for member in tar]
+
+
+def _run_makedeb(project, package_dirs, **kwargs):
+    prime_dir, control_dir, deb_dir, output_dir = package_dirs
+    deb_list = []
+    helper = makedeb.Makedeb()
+    helper.run(
+        project=project,
+        package_name="package-1",
+        arch="amd64",
+        prime_dir=prime_dir,
+        control_dir=control_dir,
+        deb_dir=deb_dir,
+        output_dir=output_dir,
+        deb_list=deb_list,
+        **kwargs,
+    )
+    return deb_list
+
+
+def test_run(default_project, package_dirs):
+    _, _, deb_dir, output_dir = package_dirs
+
+    deb_list = _run_makedeb(default_project, package_dirs)
+
+    deb_file = output_dir / "package-1_2.0_amd64.deb"
+    assert deb_list == [deb_file]
+    assert _list_ar_members(deb_file) == [
+        "debian-binary",
+        "control.tar.zst",
+        "data.tar.zst",
+    ]
+    assert (deb_dir / "debian-binary").read_text() == "2.0\n"
+    assert _list_tarball(deb_dir / "control.tar.zst") == ["control"]
+    assert _list_tarball(deb_dir / "data.tar.zst") == [
+        "usr",
+        "usr/bin",
+        "usr/bin/foo",
+    ]
+
+
+def test_run_with_scheduled_data_tarball(default_project, package_dirs):
+    prime_dir, _, deb_dir, output_dir = package_dirs
+    data_tarballs: dict[str, Future[None]] = {}
+
+    with ThreadPoolExecutor() as executor:
+        makedata_helper = makedeb.Makedata()
+        makedata_helper.run(
+            package_name="package-1",
+            prime_dir=prime_dir,
+            deb_dir=deb_dir,
+            executor=executor,
+            data_tarballs=data_tarballs,
+        )
+        assert list(data_tarballs) == ["package-1"]
+
+        # Changes made after the data tarball was created are not seen by makedeb.
+        data_tarballs["package-1"].result()
+        (prime_dir / "usr" / "bin" / "foo").unlink()
+
+        _run_makedeb(default_project, package_dirs, data_tarballs=data_tarballs)
+
+    assert _list_tarball(deb_dir / "data.tar.zst") == [
+        "usr",
+        "usr/bin",
+        "usr/bin/foo",
+    ]
+    assert _list_ar_members(output_dir / "package-1_2.0_amd64.deb") == [
+        "debian-binary",
+        "control.tar.zst",
+        "data.tar.zst",
+    ]
+
+
+def test_run_data_tarball_error(default_project, package_dirs):
+    future: Future[None] = Future()
+    future.set_exception(OSError("disk full"))
+
+    with pytest.raises(OSError, match="disk full"):
+        _run_makedeb(default_project, package_dirs, data_tarballs={"package-1": future})
+
+
+@pytest.mark.parametrize(
+    ("long_distance", "window_log", "tree_size", "expected"),
+    [
+        pytest.param(None, None, 100, (False, 21), id="auto_small"),
+        pytest.param(None, None, 2000, (True, 27), id="auto_large"),
+        pytest.param(False, None, 2000, (False, 21), id="disabled"),
+        pytest.param(True, None, 100, (True, 27), id="enabled"),
+        pytest.param(True, 24, 100, (True, 24), id="enabled_with_window"),
+        pytest.param(None, 23, 100, (False, 23), id="window_only"),
+    ],
+)
+def test_get_zstd_parameters(
+    mocker, tmp_path, long_distance, window_log, tree_size, expected
+):
+    mocker.patch.object(makedeb, "_ZSTD_LONG_DISTANCE_THRESHOLD", 1000)
+    (tmp_path / "file").write_bytes(b"x" * tree_size)
+
+    params = makedeb._get_zstd_parameters(
+        tmp_path, long_distance=long_distance, window_log=window_log
+    )
+
+    ldm, wlog = expected
+    assert bool(params.enable_ldm) == ldm
+    assert (params.window_log or 21) == wlog
+
+
+@pytest.mark.parametrize("window_log", [9, 28, 31])
+def test_get_zstd_parameters_invalid_window(tmp_path, window_log):
+    with pytest.raises(errors.DebcraftError, match="invalid zstd window log"):
+        makedeb._get_zstd_parameters(tmp_path, window_log=window_log)
+
+
+def test_run_long_distance(default_project, package_dirs):
+    _, _, deb_dir, _ = package_dirs
+
+    _run_makedeb(
+        default_project, package_dirs, zstd_long_distance=True, zstd_window_log=27
+    )
+
+    with (deb_dir / "data.tar.zst").open("rb") as f:
+        frame_params = zstd.get_frame_parameters(f.read(18))
+    assert frame_params.window_size == 1 << 27
+    assert _list_tarball(deb_dir / "data.tar.zst") == [
+        "usr",
+        "usr/bin",
+        "usr/bin/foo",
+    ]
+
+
+def test_run_seekable(mocker, default_project, package_dirs):
+    prime_dir, _, deb_dir, _ = package_dirs
+    mocker.patch.object(makedeb, "_SEEKABLE_FRAME_SIZE", 1024)
+    for i in range(10):
+        (prime_dir / "usr" / "bin" / f"file{i}").write_bytes(os.urandom(2000))
+
+    _run_makedeb(default_project, package_dirs, zstd_seekable=True)
+
+    data_tar = deb_dir / "data.tar.zst"
+    with data_tar.open("rb") as f:
+        frames = read_seek_table(f)
+        assert frames is not None
+        # Every file is larger than the frame size, so each starts a new frame.
+        assert len(frames) == 12
+
+        reader = io.BufferedReader(SeekableZstdReader(f, frames))
+        with tarfile.open(fileobj=reader, mode="r:") as tar:
+            member = tar.extractfile("usr/bin/file7")
+            assert member is not None
+            assert member.read() == (prime_dir / "usr" / "bin" / "file7").read_bytes()
+
+    assert sorted(_list_tarball(data_tar)) == sorted(
+        ["usr", "usr/bin", "usr/bin/foo"] + [f"usr/bin/file{i}" for i in range(10)]
+    )
+
+
+def test_run_long_path(default_project, package_dirs):
+    prime_dir, _, deb_dir, output_dir = package_dirs
+    long_dir = prime_dir / "usr" / ("d" * 120) / ("e" * 120)
+    long_dir.mkdir(parents=True)
+    (long_dir / ("f" * 100)).write_text("long path content")
+
+    _run_makedeb(default_project, package_dirs)
+
+    arcname = f"usr/{'d' * 120}/{'e' * 120}/{'f' * 100}"
+    assert arcname in _list_tarball(deb_dir / "data.tar.zst")
+
+
+def test_create_tarball_stable_order(tmp_path):
+    root = tmp_path / "root"
+    for name in ("b", "a/c", "a/b/d", "c"):
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(name)
+
+    dest = tmp_path / "data.tar.zst"
+    makedeb._create_tarball(root=root, dest_file=dest)
+
+    assert _list_tarball(dest) == ["a", "a/b", "a/b/d", "a/c", "b", "c"]
+
+
+@pytest.fixture
+def sparse_file(tmp_path):
+    path = tmp_path / "sparse.img"
+    with path.open("wb") as f:
+        f.truncate(8 * 1024 * 1024)
+        f.seek(1024 * 1024)
+        f.write(b"data" * 1024)
+        f.seek(6 * 1024 * 1024)
+        f.write(b"more" * 1024)
+
+    if path.stat().st_blocks * 512 >= path.stat().st_size:
+        pytest.skip("filesystem does not support sparse files")
+
+    return path
+
+
+def test_hole_skipping_reader(mocker, sparse_file):
+    spy = mocker.spy(makedeb.os, "pread")
+
+    with sparse_file.open("rb") as f:
+        reader = makedeb._HoleSkippingReader(f)
+        chunks = iter(lambda: reader.read(64 * 1024), b"")
+        content = b"".join(chunks)
+
+    assert content == sparse_file.read_bytes()
+    # Only the allocated data is read from disk.
+    assert sum(len(call.spy_return) for call in spy.mock_calls) < 1024 * 1024
+
+
+def test_run_sparse_file(default_project, package_dirs, sparse_file):
+    prime_dir, _, deb_dir, _ = package_dirs
+    sparse_file.rename(prime_dir / "sparse.img")
+
+    _run_makedeb(default_project, package_dirs)
+
+    with (deb_dir / "data.tar.zst").open("rb") as f:
+        with zstd.ZstdDecompressor().stream_reader(f) as reader:
+            with tarfile.open(fileobj=reader, mode="r|") as tar:
+                for member in tar:
+                    if member.name == "sparse.img":
+                        data = tar.extractfile(member).read()  # ty: ignore[possibly-missing-attribute]
+                        break
+
+    assert data == (prime_dir / "sparse.img").read_bytes()
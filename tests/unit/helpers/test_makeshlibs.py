@@ -42,13 +42,14 @@ def test_run(
     control_dir.mkdir()
     state_dir.mkdir()
 
-    mocker.patch(
-        "debcraft.helpers.makeshlibs.get_elf_files",
-        return_value=[
-            ElfFile(
-                path=prime_dir / "libfoo.so.5", libname="libfoo", ver="5", arch=arch
-            )
-        ],
+    elf_file = ElfFile(
+        path=prime_dir / "libfoo.so.5", libname="libfoo", ver="5", arch=arch
+    )
+    mock_iter = mocker.patch(
+        "debcraft.helpers.makeshlibs.iter_elf_files",
+        side_effect=lambda _, **kwargs: iter(
+            [elf_file] if kwargs["arch"] == elf_file.arch else []
+        ),
     )
     mocker.patch(
         "debcraft.models.project.Project.get_package",
@@ -67,6 +68,7 @@ def test_run(
 
     shlibs_file = control_dir / "shlibs"
     triggers_file = control_dir / "triggers"
+    assert mock_iter.call_args.kwargs["with_soname"]
 
     if create_files:
         assert (
@@ -16,6 +16,7 @@
 
 """Tests for debcraft's shlibdeps helper."""
 
+import os
 import pathlib
 import textwrap
 
@@ -67,6 +68,7 @@ def test_librarymap(mocker, tmp_path, fake_ldconfig_output):
     mock_res.stdout = fake_ldconfig_output
 
     mocker.patch("debcraft.helpers.shlibdeps._DPKG_INFO_DIR", tmp_path)
+    mocker.patch("debcraft.helpers.shlibdeps._LD_CACHE_FILE", tmp_path / "ld.so.cache")
     mock_run = mocker.patch("debcraft.helpers.shlibdeps.subprocess.run")
     mock_run.return_value = mock_res
 
@@ -79,6 +81,82 @@ def test_librarymap(mocker, tmp_path, fake_ldconfig_output):
     }
 
 
+def test_librarymap_ld_cache(mocker, tmp_path):
+    (tmp_path / "libfoo1:amd64.list").write_text(
+        "/usr/lib/x86_64-linux-gnu/libfoo.so.1.0\n"
+    )
+    (tmp_path / "libfoo1:i386.list").write_text(
+        "/usr/lib/i386-linux-gnu/libfoo.so.1.0\n"
+    )
+    mocker.patch("debcraft.helpers.shlibdeps._DPKG_INFO_DIR", tmp_path)
+    mock_run = mocker.patch("debcraft.helpers.shlibdeps.subprocess.run")
+    mock_paths = mocker.patch(
+        "debcraft.elf.ld_cache.get_soname_paths",
+        return_value={"libfoo.so.1": "/usr/lib/x86_64-linux-gnu/libfoo.so.1.0"},
+    )
+
+    libmap = shlibdeps._LibraryMap(arch="amd64")
+
+    assert libmap.soname_to_package == {"libfoo.so.1": "libfoo1"}
+    mock_paths.assert_called_once_with("amd64", shlibdeps._LD_CACHE_FILE)
+    mock_run.assert_not_called()
+
+
+def test_librarymap_path_index(mocker, tmp_path, fake_ldconfig_output):
+    info_dir = tmp_path / "dpkg" / "info"
+    info_dir.mkdir(parents=True)
+    (tmp_path / "dpkg" / "status").touch()
+    (info_dir / "libfoo1:amd64.list").write_text(
+        "/usr/lib/x86_64-linux-gnu/libfoo.so.1.0\n"
+    )
+    (info_dir / "libbar2:amd64.list").write_text(
+        "/bin/bar\n/usr/lib/x86_64-linux-gnu/libbar.so.2.0\n"
+    )
+    mocker.patch("debcraft.helpers.shlibdeps._DPKG_INFO_DIR", info_dir)
+    mocker.patch("debcraft.helpers.shlibdeps._LD_CACHE_FILE", tmp_path / "ld.so.cache")
+    mocker.patch(
+        "debcraft.helpers.shlibdeps.subprocess.run",
+        return_value=mocker.MagicMock(returncode=0, stdout=fake_ldconfig_output),
+    )
+    spy = mocker.spy(shlibdeps, "_read_library_paths")
+    cache_dir = tmp_path / "cache"
+
+    libmap = shlibdeps._LibraryMap(arch="amd64", cache_dir=cache_dir)
+    assert (cache_dir / "dpkg-paths-amd64.idx").is_file()
+
+    # The index is reused until the dpkg database changes.
+    assert shlibdeps._LibraryMap(
+        arch="amd64", cache_dir=cache_dir
+    ).soname_to_package == (libmap.soname_to_package)
+    assert spy.call_count == 1
+
+    (info_dir / "libbaz3-1t64:amd64.list").write_text("/usr/lib/libbaz.so.3\n")
+    os.utime(tmp_path / "dpkg" / "status", ns=(0, 0))
+    libmap = shlibdeps._LibraryMap(arch="amd64", cache_dir=cache_dir)
+
+    assert spy.call_count == 2
+    assert libmap.soname_to_package == {
+        "libfoo.so.1": "libfoo1",
+        "libbar.so.2": "libbar2",
+        "libbaz.so.3": "libbaz3-1t64",
+    }
+
+
+def test_path_index_get(tmp_path):
+    index_file = tmp_path / "index"
+    paths = {f"/usr/lib/lib{i}.so.1": f"pkg{i}" for i in range(100)}
+    shlibdeps._write_path_index(index_file, paths, (1, 2))
+
+    index = shlibdeps._PathIndex(index_file, "amd64", (1, 2))
+    try:
+        assert {path: index.get(path) for path in paths} == paths
+        assert index.get("/usr/lib/lib1.so") is None
+        assert index.get("/usr/lib/lib99.so.10") is None
+        assert index.get("") is None
+    finally:
+        index.close()
+
+
 def test_sonamemap_load_packaged_shlibs(mocker, tmp_path, fake_library_map):
     shlibs_file = tmp_path / "libssh2-1t64:amd64.shlibs"
     shlibs_file.write_text(_SHLIBS_CONTENT)
@@ -128,12 +206,9 @@ def test_run(mocker, tmp_path):
             ElfLibrary("libfoo.so.2", "libfoo", "2"),
             ElfLibrary("libbar.so.1", "libbar", "1"),
         ],
+        undefined_symbols={"foo_init@Base", "bar_init@Base", "bar_run@Base"},
     )
 
-    mocker.patch(
-        "debcraft.elf.elf_file._read_undefined_symbols",
-        return_value={"foo_init@Base", "bar_init@Base", "bar_run@Base"},
-    )
     mocker.patch("debcraft.helpers.shlibdeps._DPKG_INFO_DIR", tmp_path)
     mocker.patch("debcraft.helpers.shlibdeps.get_elf_files", return_value=[ef])
     fake_libmap = mocker.patch("debcraft.helpers.shlibdeps._LibraryMap")
@@ -178,6 +253,54 @@ def test_run(mocker, tmp_path):
     assert shlibs == "libbar1 (>= 1.0.5)\nlibfoo2-1t64 (>= 2.1.0)\n"
 
 
+def test_run_versioned_symbols(mocker, tmp_path):
+    # Both libraries export a symbol with the same name and version, but the
+    # ELF file requires the version from libbar.
+    ef = ElfFile(
+        path=pathlib.Path("/usr/bin/foo"),
+        is_dynamic=True,
+        arch="amd64",
+        needed=[
+            ElfLibrary("libfoo.so.2", "libfoo", "2"),
+            ElfLibrary("libbar.so.1", "libbar", "1"),
+        ],
+        undefined_symbols={"common@COMPAT_1", "bar_run"},
+        symbol_libraries={"common@COMPAT_1": "libbar.so.1"},
+    )
+
+    mocker.patch("debcraft.helpers.shlibdeps._DPKG_INFO_DIR", tmp_path)
+    mocker.patch("debcraft.helpers.shlibdeps.get_elf_files", return_value=[ef])
+    fake_libmap = mocker.patch("debcraft.helpers.shlibdeps._LibraryMap")
+    fake_libmap.return_value.soname_to_package = {
+        "libfoo.so.2": "libfoo2",
+        "libbar.so.1": "libbar1",
+    }
+
+    (tmp_path / "libfoo2:amd64.shlibs").write_text("libfoo 2 libfoo2 (>= 2.0)\n")
+    (tmp_path / "libfoo2:amd64.symbols").write_text(
+        "libfoo.so.2 libfoo2 #MINVER#\n common@COMPAT_1 2.5\n"
+    )
+    (tmp_path / "libbar1:amd64.shlibs").write_text("libbar 1 libbar1 (>= 1.0)\n")
+    (tmp_path / "libbar1:amd64.symbols").write_text(
+        "libbar.so.1 libbar1 #MINVER#\n common@COMPAT_1 1.2\n bar_run 1.3\n"
+    )
+
+    prime_dir = tmp_path / "prime"
+    prime_dir.mkdir()
+
+    helper = shlibdeps.Shlibdeps()
+    helper.run(
+        package_name="pkgname",
+        arch="amd64",
+        prime_dir=prime_dir,
+        state_dir=tmp_path,
+        state_dir_map={"pkgname": tmp_path},
+    )
+
+    shlibs = (tmp_path / "shlibdeps").read_text()
+    assert shlibs == "libbar1 (>= 1.3)\nlibfoo2 (>= 2.0)\n"
+
+
 @pytest.mark.parametrize(
     ("pkgname", "shlibs", "result", "deps"),
     [
@@ -244,5 +367,5 @@ def test_add_deb_info_symbol_deps(undefined, libsyms, versions):
     lib = ElfLibrary("libfoo.so.2", "libfoo", "2")
     pkg_versions: dict[str, set[str]] = {}
 
-    helper._add_deb_info_symbol_deps(lib, undefined, pkg_versions)
+    helper._add_deb_info_symbol_deps(lib, set(), undefined, pkg_versions)
     assert pkg_versions == versions
@@ -16,17 +16,42 @@
 
 """Tests for debcraft's strip helper."""
 
+import shutil
+import subprocess
 from unittest.mock import call
 
-from debcraft.elf import ElfFile
+import pytest
+from debcraft import errors
+from debcraft.elf import ElfFile, ElfIndex, StripCache
 from debcraft.helpers import strip
 
 
-def test_run(mocker, tmp_path):
-    fake_subprocess_run = mocker.patch("subprocess.run")
+@pytest.fixture
+def fake_subprocess_run(mocker):
+    return mocker.patch(
+        "subprocess.run", return_value=subprocess.CompletedProcess([], 0, "", "")
+    )
+
+
+@pytest.fixture(autouse=True)
+def clear_binutils_version():
+    yield
+    strip._get_binutils_version.cache_clear()
+
+
+def _strip_call(*paths):
+    return call(
+        ["strip", "--strip-unneeded", *paths],
+        check=False,
+        capture_output=True,
+        text=True,
+    )
 
+
+def test_run(mocker, tmp_path, fake_subprocess_run):
     install_dir = tmp_path / "install"
     install_dir.mkdir()
+    (install_dir / "foo").write_bytes(b"foo")
     mocker.patch(
         "debcraft.elf.elf_utils.get_elf_files",
         return_value=[ElfFile(path=install_dir / "foo")],
@@ -35,6 +60,415 @@ def test_run(mocker, tmp_path):
     helper = strip.Strip()
     helper.run(install_dir=install_dir)
 
+    assert fake_subprocess_run.mock_calls == [_strip_call(install_dir / "foo")]
+
+
+def test_run_largest_first(mocker, emitter, tmp_path, fake_subprocess_run):
+    install_dir = tmp_path / "install"
+    install_dir.mkdir()
+    for name, size in (("small", 1), ("large", 100), ("medium", 10)):
+        (install_dir / name).write_bytes(bytes(size))
+    mocker.patch(
+        "debcraft.elf.elf_utils.get_elf_files",
+        return_value=[
+            ElfFile(path=install_dir / name) for name in ("small", "large", "medium")
+        ],
+    )
+
+    helper = strip.Strip()
+    helper.run(install_dir=install_dir, max_workers=1)
+
+    # Small files are stripped together.
+    assert fake_subprocess_run.mock_calls == [
+        _strip_call(install_dir / "large"),
+        _strip_call(install_dir / "medium", install_dir / "small"),
+    ]
+    # Progress is reported in directory order.
+    assert [c.args[1] for c in emitter.interactions if c.args[0] == "progress"] == [
+        "Strip binary: small",
+        "Strip binary: large",
+        "Strip binary: medium",
+    ]
+
+
+def test_run_hard_links(mocker, tmp_path, fake_subprocess_run):
+    install_dir = tmp_path / "install"
+    install_dir.mkdir()
+    (install_dir / "foo").write_bytes(b"foo")
+    (install_dir / "link").hardlink_to(install_dir / "foo")
+    mocker.patch(
+        "debcraft.elf.elf_utils.get_elf_files",
+        return_value=[
+            ElfFile(path=install_dir / "foo"),
+            ElfFile(path=install_dir / "link"),
+        ],
+    )
+
+    helper = strip.Strip()
+    helper.run(install_dir=install_dir, max_workers=2)
+
+    # The file is stripped once, through its first path.
+    assert fake_subprocess_run.mock_calls == [_strip_call(install_dir / "foo")]
+
+
+def test_run_error(mocker, tmp_path):
+    def fake_run(cmd, **kwargs):
+        if any(path.name == "bad" for path in cmd[2:]):
+            return subprocess.CompletedProcess(cmd, 1, "", "file format not recognized")
+        return subprocess.CompletedProcess(cmd, 0, "", "")
+
+    fake_subprocess_run = mocker.patch("subprocess.run", side_effect=fake_run)
+
+    install_dir = tmp_path / "install"
+    (install_dir / "lib").mkdir(parents=True)
+    for name, size in (("big", 100), ("good", 1), ("lib/bad", 1)):
+        (install_dir / name).write_bytes(bytes(size))
+    mocker.patch(
+        "debcraft.elf.elf_utils.get_elf_files",
+        return_value=[
+            ElfFile(path=install_dir / name) for name in ("big", "good", "lib/bad")
+        ],
+    )
+
+    helper = strip.Strip()
+    with pytest.raises(errors.DebcraftError, match="cannot strip lib/bad") as raised:
+        helper.run(install_dir=install_dir, max_workers=1)
+
+    assert raised.value.details == "file format not recognized"
+    # The failed batch is stripped again one file at a time.
+    assert fake_subprocess_run.mock_calls == [
+        _strip_call(install_dir / "big"),
+        _strip_call(install_dir / "good", install_dir / "lib/bad"),
+        _strip_call(install_dir / "good"),
+        _strip_call(install_dir / "lib/bad"),
+    ]
+
+
+def test_run_missing_tool(mocker, tmp_path):
+    mocker.patch("subprocess.run", side_effect=FileNotFoundError)
+
+    install_dir = tmp_path / "install"
+    install_dir.mkdir()
+    (install_dir / "foo").write_bytes(b"foo")
+    mocker.patch(
+        "debcraft.elf.elf_utils.get_elf_files",
+        return_value=[ElfFile(path=install_dir / "foo")],
+    )
+
+    helper = strip.Strip()
+    with pytest.raises(errors.DebcraftError, match="tool 'strip' not found"):
+        helper.run(install_dir=install_dir)
+
+
+@pytest.mark.parametrize(
+    ("error", "message"),
+    [
+        (FileNotFoundError, "tool 'strip' not found"),
+        (
+            subprocess.CalledProcessError(1, ["strip"], stderr="bad"),
+            "error obtaining the strip version: bad",
+        ),
+    ],
+)
+def test_get_binutils_version_error(mocker, error, message):
+    mocker.patch("subprocess.run", side_effect=error)
+
+    with pytest.raises(errors.DebcraftError, match=message):
+        strip._get_binutils_version()
+
+
+def test_run_records_stripped_files(mocker, tmp_path, fake_subprocess_run):
+    install_dir = tmp_path / "install"
+    install_dir.mkdir()
+    elf_file = ElfFile(path=install_dir / "foo", is_dynamic=True)
+    elf_file.path.write_bytes(b"stripped")
+    mocker.patch("debcraft.elf.elf_utils.get_elf_files", return_value=[elf_file])
+    elf_index = ElfIndex()
+
+    helper = strip.Strip()
+    helper.run(install_dir=install_dir, elf_index=elf_index)
+
+    primed = tmp_path / "foo"
+    primed.hardlink_to(elf_file.path)
+    assert elf_index.get(primed, primed.stat()) == ElfFile(
+        path=primed, is_dynamic=True, strippable=False
+    )
+
+
+def test_run_already_stripped(mocker, tmp_path, fake_subprocess_run):
+    install_dir = tmp_path / "install"
+    install_dir.mkdir()
+    (install_dir / "bar").write_bytes(b"bar")
+    mocker.patch(
+        "debcraft.elf.elf_utils.get_elf_files",
+        return_value=[
+            ElfFile(path=install_dir / "foo", strippable=False),
+            ElfFile(path=install_dir / "bar"),
+        ],
+    )
+
+    helper = strip.Strip()
+    helper.run(install_dir=install_dir)
+
+    assert fake_subprocess_run.mock_calls == [_strip_call(install_dir / "bar")]
+
+
+def test_run_split_debug(mocker, tmp_path, fake_subprocess_run):
+    install_dir = tmp_path / "install"
+    install_dir.mkdir()
+    debug_dir = tmp_path / "debug"
+    for name in ("foo", "bar"):
+        (install_dir / name).write_bytes(b"foo")
+    mocker.patch(
+        "debcraft.elf.elf_utils.get_elf_files",
+        return_value=[
+            ElfFile(path=install_dir / "foo", build_id="0123abcd"),
+            ElfFile(path=install_dir / "bar"),
+        ],
+    )
+
+    helper = strip.Strip()
+    helper.run(
+        install_dir=install_dir,
+        debug_dir=debug_dir,
+        split_debug=True,
+        compress_debug=True,
+    )
+
+    debug_file = debug_dir / "usr/lib/debug/.build-id/01/23abcd.debug"
+    assert debug_file.parent.is_dir()
     assert fake_subprocess_run.mock_calls == [
-        call(["strip", "--strip-unneeded", install_dir / "foo"], check=True)
+        call(
+            [
+                "objcopy",
+                "--only-keep-debug",
+                "--compress-debug-sections=zlib",
+                install_dir / "foo",
+                debug_file,
+            ],
+            check=False,
+            capture_output=True,
+            text=True,
+        ),
+        call(
+            [
+                "objcopy",
+                "--strip-unneeded",
+                f"--add-gnu-debuglink={debug_file}",
+                install_dir / "foo",
+            ],
+            check=False,
+            capture_output=True,
+            text=True,
+        ),
+        # Files without a build ID are stripped without keeping debug files.
+        _strip_call(install_dir / "bar"),
     ]
+
+
+def test_run_split_debug_copies(mocker, tmp_path, fake_subprocess_run):
+    install_dir = tmp_path / "install"
+    install_dir.mkdir()
+    debug_dir = tmp_path / "debug"
+    for name in ("foo", "copy"):
+        (install_dir / name).write_bytes(b"foo")
+    mocker.patch(
+        "debcraft.elf.elf_utils.get_elf_files",
+        return_value=[
+            ElfFile(path=install_dir / "foo", build_id="0123abcd"),
+            ElfFile(path=install_dir / "copy", build_id="0123abcd"),
+        ],
+    )
+
+    helper = strip.Strip()
+    helper.run(
+        install_dir=install_dir, debug_dir=debug_dir, split_debug=True, max_workers=2
+    )
+
+    # The debug file is split once, and both copies are linked to it.
+    debug_file = debug_dir / "usr/lib/debug/.build-id/01/23abcd.debug"
+    assert [c.args[0][:2] for c in fake_subprocess_run.mock_calls] == [
+        ["objcopy", "--only-keep-debug"],
+        ["objcopy", "--strip-unneeded"],
+        ["objcopy", "--strip-unneeded"],
+    ]
+    assert {c.args[0][-1] for c in fake_subprocess_run.mock_calls[1:]} == {
+        install_dir / "foo",
+        install_dir / "copy",
+    }
+    assert fake_subprocess_run.mock_calls[0].args[0][-1] == debug_file
+
+
+def test_run_split_debug_hard_links(tmp_path):
+    install_dir = tmp_path / "install"
+    install_dir.mkdir()
+    source = tmp_path / "lib.c"
+    source.write_text("int answer(void) { return 42; }\n")
+    subprocess.run(
+        [
+            "gcc",
+            "-g",
+            "-shared",
+            "-fPIC",
+            "-Wl,--build-id",
+            "-o",
+            install_dir / "liba.so",
+            source,
+        ],
+        check=True,
+    )
+    (install_dir / "libb.so").hardlink_to(install_dir / "liba.so")
+    debug_dir = tmp_path / "debug"
+
+    helper = strip.Strip()
+    helper.run(
+        install_dir=install_dir, debug_dir=debug_dir, split_debug=True, max_workers=2
+    )
+
+    debug_files = list(debug_dir.glob("usr/lib/debug/.build-id/*/*.debug"))
+    assert len(debug_files) == 1
+    sections = subprocess.run(
+        ["readelf", "--section-headers", debug_files[0]],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    assert ".debug_info" in sections
+    assert (install_dir / "libb.so").samefile(install_dir / "liba.so")
+
+
+def test_run_split_debug_error(mocker, tmp_path):
+    mocker.patch(
+        "subprocess.run",
+        return_value=subprocess.CompletedProcess([], 1, "", "no build id"),
+    )
+    install_dir = tmp_path / "install"
+    install_dir.mkdir()
+    (install_dir / "foo").write_bytes(b"foo")
+    mocker.patch(
+        "debcraft.elf.elf_utils.get_elf_files",
+        return_value=[ElfFile(path=install_dir / "foo", build_id="0123abcd")],
+    )
+
+    helper = strip.Strip()
+    with pytest.raises(errors.DebcraftError, match="cannot strip foo") as raised:
+        helper.run(install_dir=install_dir, debug_dir=tmp_path, split_debug=True)
+
+    assert raised.value.details == "no build id"
+
+
+def test_run_cache(mocker, tmp_path, fake_subprocess_run):
+    install_dir = tmp_path / "install"
+    install_dir.mkdir()
+    for name in ("foo", "bar"):
+        (install_dir / name).write_bytes(name.encode())
+    mocker.patch(
+        "debcraft.elf.elf_utils.get_elf_files",
+        return_value=[
+            ElfFile(path=install_dir / "foo"),
+            ElfFile(path=install_dir / "bar"),
+        ],
+    )
+    strip_cache = StripCache(tmp_path / "cache", max_size=1024)
+    options = strip._get_cache_options(split_debug=False, compress_debug=False)
+    stripped = tmp_path / "stripped"
+    stripped.write_bytes(b"stripped foo")
+    strip_cache.put(strip_cache.key(install_dir / "foo", options), stripped)
+    bar_key = strip_cache.key(install_dir / "bar", options)
+    fake_subprocess_run.reset_mock()
+
+    helper = strip.Strip()
+    helper.run(install_dir=install_dir, strip_cache=strip_cache)
+
+    assert (install_dir / "foo").read_bytes() == b"stripped foo"
+    assert fake_subprocess_run.mock_calls == [_strip_call(install_dir / "bar")]
+    # The stripped file is added to the cache.
+    (tmp_path / "restored").write_bytes(b"")
+    assert strip_cache.get(bar_key, tmp_path / "restored")
+    assert (tmp_path / "restored").read_bytes() == b"bar"
+
+
+def test_run_cache_hard_links(mocker, tmp_path, fake_subprocess_run):
+    install_dir = tmp_path / "install"
+    install_dir.mkdir()
+    (install_dir / "foo").write_bytes(b"foo")
+    (install_dir / "link").hardlink_to(install_dir / "foo")
+    mocker.patch(
+        "debcraft.elf.elf_utils.get_elf_files",
+        return_value=[
+            ElfFile(path=install_dir / "foo"),
+            ElfFile(path=install_dir / "link"),
+        ],
+    )
+    strip_cache = StripCache(tmp_path / "cache", max_size=1024)
+    options = strip._get_cache_options(split_debug=False, compress_debug=False)
+    stripped = tmp_path / "stripped"
+    stripped.write_bytes(b"stripped foo")
+    strip_cache.put(strip_cache.key(install_dir / "foo", options), stripped)
+    fake_subprocess_run.reset_mock()
+    spy = mocker.spy(strip_cache, "get")
+
+    helper = strip.Strip()
+    helper.run(install_dir=install_dir, strip_cache=strip_cache)
+
+    # The file is restored once, and the paths are still linked.
+    assert spy.call_count == 1
+    assert (install_dir / "link").read_bytes() == b"stripped foo"
+    assert (install_dir / "link").samefile(install_dir / "foo")
+    assert fake_subprocess_run.mock_calls == []
+
+
+def test_run_cache_identical_output(tmp_path):
+    install_dir = tmp_path / "install"
+    install_dir.mkdir()
+    unstripped = tmp_path / "gzip"
+    shutil.copy("/bin/gzip", unstripped)
+    subprocess.run(
+        ["objcopy", "--add-section", f".debug_info={unstripped}", unstripped],
+        check=True,
+    )
+    strip_cache = StripCache(tmp_path / "cache", max_size=2**30)
+    helper = strip.Strip()
+
+    outputs = []
+    for cache in (None, strip_cache, strip_cache):
+        shutil.copy(unstripped, install_dir / "gzip")
+        helper.run(install_dir=install_dir, strip_cache=cache)
+        outputs.append((install_dir / "gzip").read_bytes())
+
+    assert outputs[0] != unstripped.read_bytes()
+    assert outputs[1] == outputs[0]
+    assert outputs[2] == outputs[0]
+
+
+def test_make_batches(tmp_path):
+    sizes = {tmp_path / f"lib{i}.so": size for i, size in enumerate([50, 20, 5, 3, 2])}
+
+    batches = strip._make_batches([[path] for path in sizes], sizes, workers=1)
+
+    assert batches == [
+        [tmp_path / "lib0.so"],
+        [tmp_path / "lib1.so"],
+        [tmp_path / "lib2.so", tmp_path / "lib3.so", tmp_path / "lib4.so"],
+    ]
+
+
+def test_make_batches_command_line_limit(mocker, tmp_path):
+    mocker.patch.object(strip, "_MAX_ARGS_SIZE", len(str(tmp_path)) * 3)
+    sizes = {tmp_path / f"{i}": 0 for i in range(5)}
+
+    batches = strip._make_batches([[path] for path in sizes], sizes, workers=1)
+
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+
+
+def test_make_batches_groups(tmp_path):
+    sizes = {tmp_path / f"lib{i}.so": size for i, size in enumerate([2, 40, 40, 2])}
+    paths = list(sizes)
+
+    batches = strip._make_batches(
+        [[paths[0]], paths[1:3], [paths[3]]], sizes, workers=1
+    )
+
+    # The copies are stripped together even if they exceed the batch size.
+    assert batches == [[paths[0]], paths[1:3], [paths[3]]]
@@ -0,0 +1,30 @@
+#  This file is part of debcraft.
+#
+#  Copyright 2026 Canonical Ltd.
+#
+#  This program is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranties of MERCHANTABILITY,
+#  SATISFACTORY QUALITY, or FITNESS FOR A PARTICULAR PURPOSE.
+#  See the GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along
+#  with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Tests for the ELF index service."""
+
+from debcraft.elf import ElfIndex
+
+
+def test_elf_index_service(default_factory, project_service):
+    project_service.configure(platform=None, build_for=None)
+    service = default_factory.get("elf_index")
+    index = service.get()
+
+    assert isinstance(index, ElfIndex)
+    assert service.get() is index
+    work_dir = default_factory.get("lifecycle").project_info.dirs.work_dir
+    assert (work_dir / "elf-cache.db").is_file()
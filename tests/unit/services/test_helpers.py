@@ -22,6 +22,7 @@ import craft_platforms
 import pytest
 from craft_parts import ProjectDirs, ProjectInfo
 from debcraft import models
+from debcraft.elf import ElfIndex
 from debcraft.helpers import md5sums, strip
 from debcraft.services import helper
 
@@ -43,6 +44,7 @@ def test_install_helpers_runner(
     mock_run = mocker.patch.object(strip.Strip, "run")
     lifecycle = mocker.MagicMock()
     lifecycle.get_prime_dir.return_value = tmp_path
+    elf_index = ElfIndex()
 
     step_info = mocker.MagicMock()
     step_info.part_build_dir = "build-dir"
@@ -50,6 +52,9 @@ def test_install_helpers_runner(
     step_info.part_name = "my-part"
     step_info.part_install_dirs = {"partition": "install-dir"}
     step_info.is_native = False
+    (tmp_path / "debug/my-part").mkdir(parents=True)
+    (tmp_path / "debug/my-part/stale.debug").touch()
+    (tmp_path / "debug/other-part").mkdir()
 
     my_runner = helper.InstallHelpersRunner(
         project=default_project,
@@ -57,6 +62,7 @@ def test_install_helpers_runner(
         build_info=build_plan_service.plan()[0],
         step_info=step_info,
         lifecycle=lifecycle,
+        elf_index=elf_index,
     )
     with my_runner as runner:
         runner.run("strip", arg="foo")
@@ -74,9 +80,14 @@ def test_install_helpers_runner(
             part_name="my-part",
             is_native=False,
             partition_dir=project_info.partition_dir,
+            elf_index=elf_index,
+            debug_dir=tmp_path / "debug/my-part",
             arg="foo",
         )
     ]
+    # Debug files from the previous build of the part are removed.
+    assert not (tmp_path / "debug/my-part").exists()
+    assert (tmp_path / "debug/other-part").is_dir()
 
 
 def test_packaging_helpers_runner(
@@ -86,12 +97,14 @@ def test_packaging_helpers_runner(
     mocker.patch("debcraft.services.helper._get_architecture", return_value="arm64")
     lifecycle = mocker.MagicMock()
     lifecycle.get_prime_dir.return_value = tmp_path
+    elf_index = ElfIndex()
 
     my_runner = helper.PackagingHelpersRunner(
         project=default_project,
         project_info=project_info,
         build_info=build_plan_service.plan()[0],
         lifecycle=lifecycle,
+        elf_index=elf_index,
     )
     with my_runner as runner:
         runner.run("md5sums", arg="foo")
@@ -109,11 +122,50 @@ def test_packaging_helpers_runner(
             project=default_project,
             package_name="package-1",
             state_dir_map={"package-1": runner_tmp_path / "package-1" / "state"},
+            elf_index=elf_index,
+            debug_dir=tmp_path / "debug",
             arg="foo",
         )
     ]
 
 
+def test_packaging_helpers_runner_add_package(
+    mocker, tmp_path, default_project, project_info, project_service, build_plan_service
+):
+    mock_run = mocker.patch.object(md5sums.Md5sums, "run")
+    mocker.patch("debcraft.services.helper._get_architecture", return_value="arm64")
+    lifecycle = mocker.MagicMock()
+    lifecycle.get_prime_dir.return_value = tmp_path / "prime"
+    dbgsym = models.Package(summary="debug symbols for package-1")
+
+    my_runner = helper.PackagingHelpersRunner(
+        project=default_project,
+        project_info=project_info,
+        build_info=build_plan_service.plan()[0],
+        lifecycle=lifecycle,
+        elf_index=ElfIndex(),
+    )
+    with my_runner as runner:
+        runner.add_package("package-1-dbgsym", dbgsym, tmp_path / "dbgsym")
+        runner.run("md5sums")
+        runner.run("md5sums", added_packages=False)
+
+    assert [c.kwargs["package_name"] for c in mock_run.mock_calls] == [
+        "package-1",
+        "package-1-dbgsym",
+        "package-1",
+    ]
+    assert [c.kwargs["prime_dir"] for c in mock_run.mock_calls] == [
+        tmp_path / "prime",
+        tmp_path / "dbgsym",
+        tmp_path / "prime",
+    ]
+    project = mock_run.mock_calls[1].kwargs["project"]
+    assert project.get_package("package-1-dbgsym") == dbgsym
+    # The project model of the application is not modified.
+    assert "package-1-dbgsym" not in default_project.packages
+
+
 def test_install_helpers_control_files(
     mocker, tmp_path, default_project, project_info, project_service, build_plan_service
 ):
@@ -121,6 +173,7 @@ def test_install_helpers_control_files(
     mocker.patch("debcraft.services.helper._get_architecture", return_value="arm64")
     lifecycle = mocker.MagicMock()
     lifecycle.get_prime_dir.return_value = tmp_path
+    elf_index = ElfIndex()
 
     partition_control_dir = (
         project_info.partition_dir / "package" / "package-1" / "debcraft_control"
@@ -133,6 +186,7 @@ def test_install_helpers_control_files(
         project_info=project_info,
         build_info=build_plan_service.plan()[0],
         lifecycle=lifecycle,
+        elf_index=elf_index,
     )
     with my_runner as runner:
         runner.run("md5sums")
@@ -20,6 +20,7 @@ from pathlib import Path
 
 import pytest
 from debcraft import models
+from debcraft.archive import apply_delta
 from debcraft.services import package
 
 
@@ -61,6 +62,57 @@ def test_pack(
     assert members == ["debian-binary", "control.tar.zst", "data.tar.zst"]
 
 
+def test_pack_update_index(
+    mocker,
+    monkeypatch,
+    package_service_with_configured_project: package.Package,
+    tmp_path,
+    host_architecture: str,
+):
+    mocker.patch("debcraft.helpers.fixperms.os.chown")
+    monkeypatch.setenv("DEBCRAFT_UPDATE_INDEX", "true")
+
+    prime_dir = tmp_path / "work" / "partitions" / "package" / "package-1" / "prime"
+    prime_dir.mkdir(exist_ok=True, parents=True)
+    (prime_dir / "foo.txt").touch()
+    package_service_with_configured_project.pack(prime_dir=prime_dir, dest=tmp_path)
+
+    packages = (tmp_path / "Packages").read_text()
+    assert "Package: package-1\n" in packages
+    assert f"Filename: package-1_2.0_{host_architecture}.deb\n" in packages
+    assert (tmp_path / "Packages.zst").exists()
+    assert (tmp_path / "Release").exists()
+
+
+def test_pack_delta(
+    mocker,
+    monkeypatch,
+    package_service_with_configured_project: package.Package,
+    tmp_path,
+    host_architecture: str,
+):
+    mocker.patch("debcraft.helpers.fixperms.os.chown")
+    prime_dir = tmp_path / "work" / "partitions" / "package" / "package-1" / "prime"
+    prime_dir.mkdir(exist_ok=True, parents=True)
+    (prime_dir / "foo.txt").write_text("foo")
+
+    # Use a copy of the package as the previous version.
+    previous_dir = tmp_path / "previous"
+    previous_dir.mkdir()
+    package_service_with_configured_project.pack(prime_dir=prime_dir, dest=tmp_path)
+    deb_name = f"package-1_2.0_{host_architecture}.deb"
+    old_deb = previous_dir / f"package-1_1.0_{host_architecture}.deb"
+    (tmp_path / deb_name).rename(old_deb)
+
+    monkeypatch.setenv("DEBCRAFT_DELTA_FROM", str(previous_dir))
+    package_service_with_configured_project.pack(prime_dir=prime_dir, dest=tmp_path)
+
+    delta_file = tmp_path / f"package-1_2.0_{host_architecture}.delta"
+    output = tmp_path / "output.deb"
+    apply_delta(old_deb, delta_file, output)
+    assert output.read_bytes() == (tmp_path / deb_name).read_bytes()
+
+
 def test_generate_metadata(
     package_service_with_configured_project: package.Package,
     host_architecture: str,
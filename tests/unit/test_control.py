@@ -0,0 +1,80 @@
+#  This file is part of debcraft.
+#
+#  Copyright 2026 Canonical Ltd.
+#
+#  This program is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but WITHOUT
+#  ANY WARRANTY; without even the implied warranties of MERCHANTABILITY,
+#  SATISFACTORY QUALITY, or FITNESS FOR A PARTICULAR PURPOSE.
+#  See the GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along
+#  with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Tests for the Debian control file encoder."""
+
+import io
+
+import pytest
+from debcraft import control, errors, models
+
+
+def test_encode():
+    model = models.DebianBinaryPackageControl(
+        package="hello",
+        source="hello-src",
+        version="1.0",
+        architecture="amd64",
+        maintainer="Someone <someone@example.com>",
+        installed_size=12,
+        depends=["libc6 (>= 2.34)", "libfoo1"],
+        provides=[],
+        description="A summary\nFirst paragraph.\n\nSecond paragraph.\n",
+    )
+    f = io.StringIO()
+    control.Encoder(f).encode(model)
+
+    assert f.getvalue() == (
+        "Package: hello\n"
+        "Source: hello-src\n"
+        "Version: 1.0\n"
+        "Architecture: amd64\n"
+        "Maintainer: Someone <someone@example.com>\n"
+        "Installed-Size: 12\n"
+        "Depends: libc6 (>= 2.34), libfoo1\n"
+        "Description: A summary\n"
+        " First paragraph.\n"
+        " .\n"
+        " Second paragraph.\n"
+    )
+
+
+def test_encode_fields_roundtrip():
+    fields = {
+        "Package": "hello",
+        "MD5Sum": "\nabc 1 Packages\ndef 2 Packages.zst",
+        "Description": "A summary\nFirst paragraph.\n\nSecond paragraph.",
+    }
+    f = io.StringIO()
+    control.Encoder(f).encode_fields(fields)
+
+    assert f.getvalue() == (
+        "Package: hello\n"
+        "MD5Sum:\n"
+        " abc 1 Packages\n"
+        " def 2 Packages.zst\n"
+        "Description: A summary\n"
+        " First paragraph.\n"
+        " .\n"
+        " Second paragraph.\n"
+    )
+    assert control.parse_fields(f.getvalue()) == fields
+
+
+@pytest.mark.parametrize("text", [" continuation first\n", "no separator\n"])
+def test_parse_fields_error(text):
+    with pytest.raises(errors.DebcraftError, match="invalid control data"):
+        control.parse_fields(text)
@@ -16,6 +16,8 @@
 
 """Tests for Debcraft helpers."""
 
+import os
+
 import pytest
 import pytest_mock
 from debcraft import errors, util
@@ -63,3 +65,56 @@ def test_get_arch_triplet_error():
 )
 def test_get_max_debian_version(versions, max_ver):
     assert util.get_max_debian_version(versions) == max_ver
+
+
+def test_iter_tree(tmp_path):
+    (tmp_path / "b/c").mkdir(parents=True)
+    (tmp_path / "b/c/file").touch()
+    (tmp_path / "a").touch()
+    (tmp_path / "b/link").symlink_to("c")
+
+    assert list(util.iter_tree(tmp_path)) == [
+        (str(tmp_path / "a"), "a"),
+        (str(tmp_path / "b"), "b"),
+        (str(tmp_path / "b/c"), "b/c"),
+        (str(tmp_path / "b/c/file"), "b/c/file"),
+        (str(tmp_path / "b/link"), "b/link"),
+    ]
+
+
+@pytest.mark.parametrize(
+    ("fsync", "calls"),
+    [
+        pytest.param("none", 0, id="none"),
+        pytest.param("file", 1, id="file"),
+        pytest.param("dir", 2, id="dir"),
+    ],
+)
+def test_atomic_write(mocker: pytest_mock.MockerFixture, tmp_path, fsync, calls):
+    spy_fsync = mocker.spy(os, "fsync")
+    path = tmp_path / "file"
+    path.write_bytes(b"old")
+
+    with util.atomic_write(path, fsync=fsync) as f:
+        f.write(b"new")
+        assert path.read_bytes() == b"old"
+
+    assert path.read_bytes() == b"new"
+    assert spy_fsync.call_count == calls
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_atomic_write_error(tmp_path):
+    path = tmp_path / "file"
+    path.write_bytes(b"old")
+
+    def write_and_fail():
+        with util.atomic_write(path) as f:
+            f.write(b"new")
+            raise RuntimeError("interrupted")
+
+    with pytest.raises(RuntimeError, match="interrupted"):
+        write_and_fail()
+
+    assert path.read_bytes() == b"old"
+    assert list(tmp_path.iterdir()) == [path]
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+#
+# Copyright 2026 Canonical Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Compare ELF parsing with pyelftools and the lightweight reader.
+
+Every ELF file in the corpus directory is parsed with both readers, and the
+results are checked to be identical.
+"""
+
+import argparse
+import pathlib
+import time
+from collections.abc import Callable
+
+from debcraft import util
+from debcraft.elf import ElfFile
+
+
+def _time_parser(
+    paths: list[pathlib.Path], parser: Callable[[pathlib.Path], ElfFile]
+) -> tuple[float, list[ElfFile]]:
+    start = time.monotonic()
+    results = [parser(path) for path in paths]
+    return time.monotonic() - start, results
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "corpus",
+        type=pathlib.Path,
+        nargs="?",
+        default=pathlib.Path("/usr/lib") / util.get_arch_triplet(),
+        help="directory containing ELF files (default: the system library dir)",
+    )
+    args = parser.parse_args()
+
+    paths = [
+        path
+        for path in sorted(args.corpus.rglob("*"))
+        if path.is_file()
+        and not path.is_symlink()
+        and path.suffix not in (".o", ".a")
+        and ElfFile.is_elf(path)
+    ]
+    print(f"Parsing {len(paths)} ELF files in {args.corpus}")
+
+    elftools_time, expected = _time_parser(
+        paths,
+        ElfFile._from_elftools,  # noqa: SLF001
+    )
+    reader_time, results = _time_parser(paths, ElfFile.from_path)
+
+    mismatches = [r.path for r, e in zip(results, expected) if r != e]
+    for path in mismatches:
+        print(f"Mismatch: {path}")
+
+    print(f"{'reader':<12}{'time (s)':>10}{'files/s':>10}")
+    for name, elapsed in (("pyelftools", elftools_time), ("mmap", reader_time)):
+        print(f"{name:<12}{elapsed:>10.2f}{len(paths) / elapsed:>10.0f}")
+    print(f"Speedup: {elftools_time / reader_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+#
+# Copyright 2026 Canonical Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Measure the memory used by the ELF metadata of a synthetic binary set.
+
+A set of binaries resembling a large C++ package is generated, with long
+mangled symbol names shared between many binaries. The metadata of every
+binary is held in memory, as with the interned ElfFile representation and
+with a plain representation that stores a copy of every string.
+"""
+
+import argparse
+import dataclasses
+import pathlib
+import random
+import time
+import tracemalloc
+from collections.abc import Callable
+
+from debcraft.elf import ElfFile, ElfLibrary
+
+
+@dataclasses.dataclass(frozen=True)
+class _PlainLibrary:
+    soname: str
+    libname: str
+    ver: str
+
+
+@dataclasses.dataclass
+class _PlainElfFile:
+    path: pathlib.Path
+    is_dynamic: bool = False
+    libname: str = ""
+    ver: str = ""
+    arch: str = ""
+    needed: list[_PlainLibrary] = dataclasses.field(default_factory=list)
+    undefined_symbols: set[str] = dataclasses.field(default_factory=set)
+    symbol_libraries: dict[str, str] = dataclasses.field(default_factory=dict)
+
+
+@dataclasses.dataclass(frozen=True)
+class _Binary:
+    """The raw strings of a binary, as read from its string tables."""
+
+    path: pathlib.Path
+    needed: list[bytes]
+    symbols: list[tuple[bytes, bytes]]
+
+
+def _generate(args: argparse.Namespace) -> list[_Binary]:
+    rng = random.Random(args.seed)  # noqa: S311
+    sonames = [f"libsynthetic{i}.so.{i % 7}".encode() for i in range(args.libraries)]
+    pool = [
+        (
+            f"_ZN9synthetic{i % 97}detail{i}14implementationINS_6traitsEE3runEv".encode(),
+            sonames[i % args.libraries],
+        )
+        for i in range(args.pool)
+    ]
+    return [
+        _Binary(
+            path=pathlib.Path(f"/usr/lib/synthetic/bin{i}"),
+            needed=rng.sample(sonames, 8),
+            symbols=rng.sample(pool, args.symbols),
+        )
+        for i in range(args.binaries)
+    ]
+
+
+def _load_plain(binary: _Binary) -> _PlainElfFile:
+    # Decoding creates new strings, like parsing each file does.
+    symbols = {f"{n.decode()}@V1": soname.decode() for n, soname in binary.symbols}
+    return _PlainElfFile(
+        path=binary.path,
+        is_dynamic=True,
+        arch="amd64",
+        needed=[
+            _PlainLibrary(n.decode(), *n.decode().split(".so.", maxsplit=1))
+            for n in binary.needed
+        ],
+        undefined_symbols=set(symbols),
+        symbol_libraries=symbols,
+    )
+
+
+def _load_interned(binary: _Binary) -> ElfFile:
+    symbols = {f"{n.decode()}@V1": soname.decode() for n, soname in binary.symbols}
+    return ElfFile(
+        path=binary.path,
+        is_dynamic=True,
+        arch="amd64",
+        needed=[ElfLibrary.from_name(n.decode()) for n in binary.needed],
+        undefined_symbols=frozenset(symbols),
+        symbol_libraries=symbols,
+    )
+
+
+def _measure(
+    binaries: list[_Binary], loader: Callable[[_Binary], object]
+) -> tuple[float, int]:
+    tracemalloc.start()
+    start = time.monotonic()
+    results = [loader(binary) for binary in binaries]
+    elapsed = time.monotonic() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del results
+    return elapsed, size
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--binaries", type=int, default=2000)
+    parser.add_argument("--symbols", type=int, default=1000, help="per binary")
+    parser.add_argument("--pool", type=int, default=50000, help="distinct symbols")
+    parser.add_argument("--libraries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    binaries = _generate(args)
+    print(
+        f"{args.binaries} binaries with {args.symbols} undefined symbols each, "
+        f"from {args.pool} distinct symbols"
+    )
+
+    results = {
+        "plain": _measure(binaries, _load_plain),
+        "interned": _measure(binaries, _load_interned),
+    }
+
+    print(f"{'representation':<16}{'time (s)':>10}{'memory (MiB)':>14}")
+    for name, (elapsed, size) in results.items():
+        print(f"{name:<16}{elapsed:>10.2f}{size / 2**20:>14.1f}")
+    print(f"Memory reduction: {results['plain'][1] / results['interned'][1]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
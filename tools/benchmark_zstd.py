@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+#
+# Copyright 2026 Canonical Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Compare data tarball zstd settings on a large synthetic tree.
+
+The synthetic tree contains blocks of random data that are repeated in
+files far apart from each other, which the default zstd window cannot see.
+"""
+
+import argparse
+import pathlib
+import random
+import tempfile
+import time
+
+from craft_cli import EmitterMode, emit
+from debcraft.helpers import makedeb
+
+_CONFIGURATIONS = {
+    "default": {"long_distance": False},
+    "window-27": {"long_distance": False, "window_log": 27},
+    "ldm": {"long_distance": True},
+    "ldm-window-24": {"long_distance": True, "window_log": 24},
+}
+
+
+def _create_tree(root: pathlib.Path, size_mb: int) -> None:
+    rng = random.Random(42)  # noqa: S311
+    blocks = [rng.randbytes(1024 * 1024) for _ in range(max(size_mb // 8, 1))]
+    for i in range(size_mb):
+        subdir = root / "usr" / "share" / "data" / f"{i % 16:02d}"
+        subdir.mkdir(parents=True, exist_ok=True)
+        # Half of the files repeat earlier blocks, half are unique.
+        block = blocks[i % len(blocks)] if i % 2 else rng.randbytes(1024 * 1024)
+        (subdir / f"file{i:05d}.bin").write_bytes(block)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=1024, help="tree size in MiB")
+    args = parser.parse_args()
+    emit.init(EmitterMode.QUIET, "benchmark-zstd", "")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = pathlib.Path(tmp) / "prime"
+        _create_tree(root, args.size)
+        print(f"{'configuration':<16}{'size (MiB)':>12}{'ratio':>8}{'time (s)':>10}")
+
+        for name, options in _CONFIGURATIONS.items():
+            dest = pathlib.Path(tmp) / f"{name}.tar.zst"
+            params = makedeb._get_zstd_parameters(root, **options)  # noqa: SLF001
+            start = time.monotonic()
+            makedeb._create_tarball(  # noqa: SLF001
+                root=root, dest_file=dest, params=params
+            )
+            elapsed = time.monotonic() - start
+            size = dest.stat().st_size
+            ratio = args.size * 1024 * 1024 / size
+            print(f"{name:<16}{size / 1024 / 1024:>12.1f}{ratio:>8.2f}{elapsed:>10.2f}")
+            dest.unlink()
+
+    emit.ended_ok()
+
+
+if __name__ == "__main__":
+    main()